@@ -27,12 +27,23 @@ import models  # asegura que models/__init__.py existe e importa user.py, produc
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Objetos de búsqueda creados con DDL propio (tabla FTS5 y sus tablas internas,
+    # columna search_vector e índice GIN): autogenerate no debe proponer borrarlos
+    if type_ == "table" and name.startswith("products_fts"):
+        return False
+    if name in ("search_vector", "ix_products_search_vector"):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -50,7 +61,8 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          include_object=include_object)
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,37 @@
+"""add version and updated_at to products
+
+Revision ID: 8c4e2b6f1a93
+Revises: 3f1c9a7d2e41
+Create Date: 2026-10-17 14:27:51.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e2b6f1a93'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7d2e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    # SQLite no admite ADD COLUMN con un default no constante: se rellena y luego
+    # se marca NOT NULL (batch recrea la tabla en SQLite y hace ALTER en Postgres)
+    op.add_column('products', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE products SET updated_at = CURRENT_TIMESTAMP")
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(timezone=True), nullable=False,
+                              server_default=sa.func.current_timestamp())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('version')
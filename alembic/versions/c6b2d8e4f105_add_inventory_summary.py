@@ -0,0 +1,111 @@
+"""add inventory_summary table maintained by triggers
+
+Revision ID: c6b2d8e4f105
+Revises: 9a4f6c2d8e17
+Create Date: 2026-10-17 21:15:42.690354
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6b2d8e4f105'
+down_revision: Union[str, Sequence[str], None] = '9a4f6c2d8e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SHARDS = 16
+
+
+def _delta(sign, row):
+    return f"""UPDATE inventory_summary SET
+            product_count = product_count {sign} 1,
+            units_on_hand = units_on_hand {sign} coalesce({row}.quantity, 0),
+            stock_value = stock_value {sign} coalesce({row}.price, 0) * coalesce({row}.quantity, 0),
+            out_of_stock_count = out_of_stock_count {sign} (CASE WHEN coalesce({row}.quantity, 0) <= 0 THEN 1 ELSE 0 END)
+        WHERE shard = {row}.id % {SHARDS}"""
+
+
+def _seed():
+    shards = " UNION ALL ".join(f"SELECT {i} AS shard" for i in range(SHARDS))
+    return f"""INSERT INTO inventory_summary (shard, product_count, units_on_hand, stock_value, out_of_stock_count)
+        SELECT s.shard, coalesce(a.product_count, 0), coalesce(a.units_on_hand, 0),
+               coalesce(a.stock_value, 0), coalesce(a.out_of_stock_count, 0)
+        FROM ({shards}) AS s
+        LEFT JOIN (
+            SELECT id % {SHARDS} AS shard,
+                   count(*) AS product_count,
+                   sum(coalesce(quantity, 0)) AS units_on_hand,
+                   sum(coalesce(price, 0) * coalesce(quantity, 0)) AS stock_value,
+                   sum(CASE WHEN coalesce(quantity, 0) <= 0 THEN 1 ELSE 0 END) AS out_of_stock_count
+            FROM products
+            GROUP BY id % {SHARDS}
+        ) AS a ON a.shard = s.shard"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('inventory_summary',
+    sa.Column('shard', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('product_count', sa.BigInteger(), nullable=False),
+    sa.Column('units_on_hand', sa.BigInteger(), nullable=False),
+    sa.Column('stock_value', sa.Float(), nullable=False),
+    sa.Column('out_of_stock_count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('shard')
+    )
+    # Los totales iniciales salen de los productos existentes
+    op.execute(sa.text(_seed()))
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(f"""
+            CREATE TRIGGER inventory_summary_ai AFTER INSERT ON products BEGIN
+                {_delta("+", "new")};
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER inventory_summary_ad AFTER DELETE ON products BEGIN
+                {_delta("-", "old")};
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER inventory_summary_au AFTER UPDATE OF price, quantity ON products BEGIN
+                {_delta("-", "old")};
+                {_delta("+", "new")};
+            END
+        """)
+    elif dialect == 'postgresql':
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION inventory_summary_apply() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    {_delta("-", "OLD")};
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    {_delta("+", "NEW")};
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER inventory_summary_sync
+            AFTER INSERT OR DELETE OR UPDATE OF price, quantity ON products
+            FOR EACH ROW EXECUTE FUNCTION inventory_summary_apply()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS inventory_summary_au")
+        op.execute("DROP TRIGGER IF EXISTS inventory_summary_ad")
+        op.execute("DROP TRIGGER IF EXISTS inventory_summary_ai")
+    elif dialect == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS inventory_summary_sync ON products")
+        op.execute("DROP FUNCTION IF EXISTS inventory_summary_apply()")
+    op.drop_table('inventory_summary')
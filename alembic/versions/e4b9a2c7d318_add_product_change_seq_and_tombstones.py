@@ -0,0 +1,48 @@
+"""add products.change_seq and product_tombstones for delta sync
+
+Revision ID: e4b9a2c7d318
+Revises: c6b2d8e4f105
+Create Date: 2026-10-17 22:03:18.417520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b9a2c7d318'
+down_revision: Union[str, Sequence[str], None] = 'c6b2d8e4f105'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    # ADD/DROP COLUMN directos y no batch_alter_table: en SQLite batch recrea products
+    # y se perderían los triggers de FTS y de inventory_summary
+    op.add_column('products', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    # Las filas existentes quedan ordenadas por id y los cambios nuevos van detrás: en
+    # PostgreSQL change_seq es el xid de la transacción, así que se usa el de esta
+    if dialect == 'postgresql':
+        op.execute("UPDATE products SET change_seq = CAST(CAST(pg_current_xact_id() AS text) AS bigint)")
+    else:
+        op.execute("UPDATE products SET change_seq = id")
+    op.create_index('ix_products_change_seq_id', 'products', ['change_seq', 'id'], unique=False)
+    op.create_table('product_tombstones',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_product_tombstones_change_seq_id', 'product_tombstones', ['change_seq', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_tombstones_change_seq_id', table_name='product_tombstones')
+    op.drop_table('product_tombstones')
+    op.drop_index('ix_products_change_seq_id', table_name='products')
+    op.drop_column('products', 'change_seq')
@@ -0,0 +1,102 @@
+"""Validadores HTTP (ETag / Last-Modified) y respuestas 304 para las rutas de lectura."""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+
+from core.compression import decoded_etag
+
+
+def product_etag(product, fields: tuple[str, ...] | None = None) -> str:
+    # version cambia en cada UPDATE, así que (id, version) identifica la representación;
+    # con ?fields= el cuerpo es otro y el ETag lleva además el conjunto de campos
+    if fields is None:
+        return f'"{product.id}-{product.version}"'
+    return f'"{product.id}-{product.version}-{_fields_tag(fields)}"'
+
+
+def list_etag(products, next_cursor: str | None = None, fields: tuple[str, ...] | None = None) -> str:
+    digest = hashlib.sha1()
+    for product in products:
+        digest.update(f"{product.id}:{product.version};".encode())
+    digest.update((next_cursor or "").encode())
+    if fields is not None:
+        digest.update(f"|{','.join(fields)}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def last_modified(*timestamps) -> datetime | None:
+    values = [_as_utc(ts) for ts in timestamps if ts is not None]
+    return max(values) if values else None
+
+
+def is_not_modified(request: Request, etag: str, modified: datetime | None = None) -> bool:
+    """Evalúa If-None-Match (prioritario) o If-Modified-Since según RFC 9110."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Comparación débil: W/"x" equivale a "x"
+        candidates = {_opaque(tag) for tag in if_none_match.split(",")}
+        return _opaque(etag) in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return modified.replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def if_match_versions(if_match: str, product_id: int) -> set[int] | None:
+    """Versiones aceptadas por If-Match para este producto; None si es "*".
+
+    If-Match usa comparación fuerte: los ETags débiles nunca coinciden. Se aceptan los
+    ETags de respuestas comprimidas ("1-3-gzip") y de proyecciones con ?fields=
+    ("1-3-<campos>"): solo cuentan el id y la versión.
+    """
+    if if_match.strip() == "*":
+        return None
+    versions = set()
+    for tag in if_match.split(","):
+        tag = decoded_etag(tag.strip())
+        if tag.startswith("W/") or len(tag) < 2 or tag[0] != '"' or tag[-1] != '"':
+            continue
+        tag_id, _, rest = tag[1:-1].partition("-")
+        tag_version = rest.partition("-")[0]
+        if tag_id == str(product_id) and tag_version.isdigit():
+            versions.add(int(tag_version))
+    return versions
+
+
+def set_validators(response: Response, etag: str, modified: datetime | None = None):
+    response.headers["ETag"] = etag
+    if modified is not None:
+        response.headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+    # Los clientes pueden guardar la respuesta pero deben revalidarla siempre
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def not_modified(etag: str, modified: datetime | None = None) -> Response:
+    response = Response(status_code=304)
+    set_validators(response, etag, modified)
+    return response
+
+
+def _fields_tag(fields: tuple[str, ...]) -> str:
+    # `fields` ya viene en el orden canónico de parse_fields
+    return hashlib.sha1(",".join(fields).encode()).hexdigest()[:8]
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return decoded_etag(tag[2:] if tag.startswith("W/") else tag)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite devuelve fechas sin zona horaria; se guardan siempre en UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -1 +1,49 @@
-from db.session import get_db
+import hmac
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from core.security import InvalidTokenError, TokenClaims, token_verifier
+from db.session import get_db, get_async_db
+from repositories.revoked_token_repo import AsyncRevokedTokenRepository
+from services.token_revocation import token_revocation
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail,
+                         headers={"WWW-Authenticate": "Bearer"})
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> TokenClaims:
+    """Usuario del token Bearer, resuelto a partir de los claims.
+
+    La BD solo se consulta si el filtro de revocaciones da un positivo.
+    """
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    try:
+        claims = token_verifier.verify(credentials.credentials)
+    except InvalidTokenError:
+        raise _unauthorized("Invalid or expired token")
+    if claims.jti and await token_revocation.is_revoked(AsyncRevokedTokenRepository(db), claims.jti):
+        raise _unauthorized("Token has been revoked")
+    return claims
+
+
+async def require_internal_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+) -> None:
+    """Acceso a /internal/*: el token de operación configurado, no el JWT de un usuario.
+
+    El registro es abierto, así que un usuario autenticado cualquiera no basta.
+    """
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected or not hmac.compare_digest(credentials.credentials.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
@@ -0,0 +1,21 @@
+"""Respuestas JSON serializadas directamente con pydantic-core."""
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+class ModelResponse(Response):
+    """Cuerpo JSON generado con un TypeAdapter precompilado (dump_json, en Rust).
+
+    Devolver esta respuesta desde la ruta evita el camino de response_model (volver a
+    validar el resultado, jsonable_encoder y json.dumps). La ruta conserva
+    response_model solo para documentar el esquema en OpenAPI.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content, adapter: TypeAdapter, status_code: int = 200, headers=None):
+        self.adapter = adapter
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content) -> bytes:
+        return self.adapter.dump_json(content)
@@ -1,18 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from schemas.user import UserCreate, UserLogin, UserRead, Token, TokenWithUser
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.rate_limit import login_email_limit, login_ip_limit
+from core.security import InvalidTokenError, TokenClaims, decode_access_token
+from schemas.user import UserCreate, UserLogin, UserRead, Token, TokenWithUser, CurrentUser, TokenRevoke
 from models.user import User
-from services.auth_service import AuthService
-from repositories.user_repo import UserRepository
-from api.deps import get_db
+from services.auth_service import AsyncAuthService
+from repositories.user_repo import AsyncUserRepository
+from repositories.revoked_token_repo import AsyncRevokedTokenRepository
+from services.token_revocation import token_revocation
+from api.deps import get_async_db, get_current_user
 
 router = APIRouter()
 
 @router.post("/register", response_model=TokenWithUser)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    repo = UserRepository(db)
-    service = AuthService(repo)
-    user = service.register_user(user_data)
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncUserRepository(db)
+    service = AsyncAuthService(repo)
+    user = await service.register_user(user_data)
     token = service.create_token(user)
     return {
         "access_token": token,
@@ -20,11 +24,25 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         "user": UserRead.model_validate(user)
     }
 
-@router.post("/login", response_model=TokenWithUser)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    repo = UserRepository(db)
-    service = AuthService(repo)
-    user = service.authenticate_user(credentials.email, credentials.password)
+async def limit_login_attempts(credentials: UserLogin, request: Request):
+    """429 antes de tocar la BD o bcrypt si la IP o el email superan su cuota.
+
+    El email solo se cobra si la IP pasa: una IP ya frenada no puede seguir gastando
+    la cuota de la cuenta de otro.
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = login_ip_limit.hit(client_ip) or login_email_limit.hit(credentials.email.strip().lower())
+    if retry_after:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail="Too many login attempts",
+                            headers={"Retry-After": str(retry_after)})
+
+@router.post("/login", response_model=TokenWithUser, dependencies=[Depends(limit_login_attempts)],
+             responses={429: {"description": "Too many login attempts"}})
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncUserRepository(db)
+    service = AsyncAuthService(repo)
+    user = await service.authenticate_user(credentials.email, credentials.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     token = service.create_token(user)
@@ -33,3 +51,33 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
         "token_type": "bearer",
         "user": UserRead.model_validate(user)
     }
+
+@router.get("/me", response_model=CurrentUser)
+async def me(user: TokenClaims = Depends(get_current_user)):
+    return {"id": user.user_id, "username": user.username}
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(user: TokenClaims = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    if not user.jti:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token cannot be revoked")
+    await token_revocation.revoke(AsyncRevokedTokenRepository(db), user)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke(
+    payload: TokenRevoke,
+    user: TokenClaims = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Revoca otro token del mismo usuario (p. ej. el de otro dispositivo)."""
+    try:
+        claims = decode_access_token(payload.token)
+    except InvalidTokenError:
+        # Un token inválido o caducado ya no sirve: no hay nada que revocar
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    if (claims.user_id, claims.username) != (user.user_id, user.username):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token belongs to another user")
+    if not claims.jti:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token cannot be revoked")
+    await token_revocation.revoke(AsyncRevokedTokenRepository(db), claims)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
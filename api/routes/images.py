@@ -0,0 +1,25 @@
+import re
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from services.image_variants import image_variants, ImageVariantError, VARIANTS
+
+router = APIRouter()
+
+DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+# Las variantes se direccionan por el hash del original: nunca cambian
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+@router.get("/{variant}/{filename}", response_class=FileResponse, responses={
+    404: {"description": "Unknown variant or image"}
+})
+async def get_image_variant(variant: str, filename: str):
+    digest, _, extension = filename.partition(".")
+    if variant not in VARIANTS or not DIGEST.match(digest) or f".{extension}" != image_variants.extension:
+        raise HTTPException(status_code=404, detail="Image not found")
+    try:
+        path = await image_variants.ensure(digest, variant)
+    except ImageVariantError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return FileResponse(path, media_type=image_variants.media_type,
+                        headers={"Cache-Control": IMMUTABLE_CACHE})
@@ -0,0 +1,40 @@
+"""Métricas de operación (pool, caché, revocaciones, rate limit, stream).
+
+Exigen el token de operación (INTERNAL_API_TOKEN) como Bearer y no aparecen en el
+esquema OpenAPI; aun así no deberían exponerse fuera de la red interna (bloquear
+/internal en el proxy).
+"""
+from fastapi import APIRouter, Depends
+from api.deps import require_internal_token
+from core.rate_limit import rate_limit_backend
+from db.session import pool_metrics
+from services.product_cache import product_cache
+from services.product_events import product_events
+from services.product_name_index import product_name_index
+from services.token_revocation import token_revocation
+
+router = APIRouter(dependencies=[Depends(require_internal_token)], include_in_schema=False)
+
+@router.get("/cache")
+async def cache_stats():
+    return product_cache.stats()
+
+@router.get("/db/pool")
+async def db_pool_stats():
+    return {name: metrics.stats() for name, metrics in pool_metrics.items()}
+
+@router.get("/revocations")
+async def revocation_stats():
+    return token_revocation.stats()
+
+@router.get("/rate-limit")
+async def rate_limit_stats():
+    return rate_limit_backend.stats()
+
+@router.get("/autocomplete")
+async def autocomplete_stats():
+    return product_name_index.stats()
+
+@router.get("/stream")
+async def stream_stats():
+    return product_events.stats()
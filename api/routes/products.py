@@ -1,35 +1,63 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
-from sqlalchemy.orm import Session
-from api.deps import get_db
-from schemas.product import ProductCreate, ProductUpdate, ProductOut
-from services.product_service import ProductService
-from repositories.product_repo import ProductRepository
-import shutil
-from pathlib import Path
+import asyncio
+from typing import Annotated, Any, Literal, Optional
+from fastapi import (
+    APIRouter, Body, Depends, UploadFile, File, Form, Header, HTTPException, Query, Request, Response,
+    WebSocket, WebSocketDisconnect,
+)
+from starlette.websockets import WebSocketState
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.deps import get_async_db
+from api.conditional import (
+    product_etag, list_etag, last_modified, is_not_modified, set_validators, not_modified, if_match_versions,
+)
+from core.pagination import InvalidCursorError
+from core.prefix_index import normalize
+from schemas.product import (
+    ProductCreate, ProductUpdate, ProductOut, ProductListParams,
+    ProductBatchDelete, ProductBatchResult, MAX_BATCH_SIZE, DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT,
+    DEFAULT_AUTOCOMPLETE_LIMIT, MAX_AUTOCOMPLETE_LIMIT, ProductStats, ProductSuggestion, StockAdjustment, StockLevel,
+    ProductChanges, DEFAULT_CHANGES_LIMIT, MAX_CHANGES_LIMIT,
+    product_adapter, product_list_adapter, product_changes_adapter, parse_fields, product_field_set,
+    ProductLookup, ProductLookupResult, product_lookup_adapter,
+)
+from api.responses import ModelResponse
+from services.product_service import AsyncProductService, VersionConflictError, InsufficientStockError
+from repositories.product_repo import AsyncProductRepository
+from repositories.inventory_summary_repo import AsyncInventorySummaryRepository
+from services.inventory_service import AsyncInventoryService
+from services.image_storage import image_storage, ImageStorageError
+from services.image_variants import image_variants
+from services.product_name_index import product_name_index
+from services.product_events import product_events, sse_stream
+from core.broadcast import SlowConsumerError, SubscriptionClosed
 
 router = APIRouter()
 
-UPLOAD_DIR = Path("static/images")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+async def _store_image(image: UploadFile) -> str:
+    try:
+        image_url = await image_storage.save(image)
+    except ImageStorageError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    # Miniaturas en segundo plano; si aún no están se generan al pedirlas
+    image_variants.schedule(image_url)
+    return image_url
 
 @router.post("/", response_model=ProductOut)
-def create_product(
+async def create_product(
     name: str = Form(...),
     description: str = Form(...),
     price: float = Form(...),
     quantity: int = Form(...),
     image: UploadFile = File(None),
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     image_url = None
     if image:
-        # guardas en static/images
-        file_path = UPLOAD_DIR / image.filename
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-        image_url = f"/static/images/{image.filename}"
-    
-    service = ProductService(ProductRepository(db))
-    return service.create_product(ProductCreate(
+        # guardas en static/images/ab/cd/<sha256>.<ext>
+        image_url = await _store_image(image)
+
+    service = AsyncProductService(AsyncProductRepository(db))
+    return await service.create_product(ProductCreate(
         name=name,
         description=description,
         price=price,
@@ -37,37 +65,237 @@ def create_product(
         image_url=image_url
     ))
 
-@router.get("/", response_model=list[ProductOut])
-def list_products(db: Session = Depends(get_db)):
-    service = ProductService(ProductRepository(db))
-    return service.get_products()
+BatchItems = Annotated[list[dict[str, Any]], Body(min_length=1, max_length=MAX_BATCH_SIZE)]
+
+@router.post("/batch", response_model=ProductBatchResult)
+async def create_products_batch(items: BatchItems, db: AsyncSession = Depends(get_async_db)):
+    service = AsyncProductService(AsyncProductRepository(db))
+    return await service.create_products_batch(items)
+
+@router.patch("/batch", response_model=ProductBatchResult)
+async def update_products_batch(items: BatchItems, db: AsyncSession = Depends(get_async_db)):
+    service = AsyncProductService(AsyncProductRepository(db))
+    return await service.update_products_batch(items)
+
+@router.delete("/batch", response_model=ProductBatchResult)
+async def delete_products_batch(payload: ProductBatchDelete, db: AsyncSession = Depends(get_async_db)):
+    service = AsyncProductService(AsyncProductRepository(db))
+    return await service.delete_products_batch(payload.ids)
+
+@router.post("/lookup", response_model=ProductLookupResult)
+async def lookup_products(payload: ProductLookup, db: AsyncSession = Depends(get_async_db)):
+    """Varios productos por id en una petición; los ids inexistentes van en `missing`."""
+    service = AsyncProductService(AsyncProductRepository(db))
+    return ModelResponse(await service.lookup_products(payload.ids), product_lookup_adapter)
+
+@router.get("/", response_model=list[ProductOut], responses={
+    304: {"description": "Not modified"},
+    400: {"description": "Invalid cursor"}
+})
+async def list_products(
+    request: Request,
+    params: Annotated[ProductListParams, Query()],
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncProductService(AsyncProductRepository(db))
+    try:
+        items, next_cursor = await service.get_products_page(params)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Solo ETag: el updated_at máximo de la página no cambia cuando una fila se borra
+    # o deja de cumplir el filtro, así que no sirve como Last-Modified del listado
+    fields = parse_fields(params.fields) if params.fields else None
+    etag = list_etag(items, next_cursor, fields)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    adapter = product_field_set(fields).list_adapter if fields else product_list_adapter
+    response = ModelResponse(items, adapter)
+    set_validators(response, etag)
+
+    # El cuerpo sigue siendo una lista; el cursor de la siguiente página va en cabeceras
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+@router.get("/export", response_class=StreamingResponse, responses={
+    200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}
+})
+async def export_products(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncProductService(AsyncProductRepository(db))
+
+    async def stream():
+        # La dependencia get_async_db ya terminó cuando se envía el cuerpo,
+        # así que el generador se encarga de cerrar la sesión
+        try:
+            async for chunk in service.export_products(format):
+                yield chunk
+        finally:
+            await db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+@router.get("/stats", response_model=ProductStats)
+async def product_stats(db: AsyncSession = Depends(get_async_db)):
+    # Lee el resumen mantenido por triggers: no recorre products
+    return await AsyncInventoryService(AsyncInventorySummaryRepository(db)).get_stats()
+
+@router.get("/autocomplete", response_model=list[ProductSuggestion])
+async def autocomplete_products(
+    prefix: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=MAX_AUTOCOMPLETE_LIMIT)] = DEFAULT_AUTOCOMPLETE_LIMIT,
+):
+    # Solo lee el índice en memoria: ni sesión ni consulta a la BD
+    if not normalize(prefix):
+        raise HTTPException(status_code=422, detail="prefix must contain at least one character besides spaces")
+    return [{"id": product_id, "name": name} for product_id, name in product_name_index.search(prefix, limit)]
+
+@router.get("/search", response_model=list[ProductOut])
+async def search_products(
+    q: Annotated[str, Query(min_length=1, max_length=200, description="Words to search in name and description")],
+    limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_LIMIT)] = DEFAULT_SEARCH_LIMIT,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Productos que contienen todas las palabras (la última como prefijo), por relevancia.
+
+    Si el servidor define SEARCH_RANK_WINDOW = N, solo se puntúan las N coincidencias
+    más recientes: con términos muy comunes los productos más antiguos no aparecen.
+    """
+    service = AsyncProductService(AsyncProductRepository(db))
+    return ModelResponse(await service.search_products(q, limit), product_list_adapter)
+
+@router.get("/changes", response_model=ProductChanges, responses={400: {"description": "Invalid token"}})
+async def product_changes(
+    since: Annotated[Optional[str], Query(max_length=512, description="next_token from the previous sync")] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_CHANGES_LIMIT)] = DEFAULT_CHANGES_LIMIT,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Productos creados/modificados e ids borrados desde `since` (sin token: todo el catálogo).
+
+    Si has_more es true hay que volver a pedir con next_token hasta agotarlo.
+    """
+    service = AsyncProductService(AsyncProductRepository(db))
+    try:
+        changes = await service.get_changes(since, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ModelResponse(changes, product_changes_adapter)
+
+@router.get("/stream", response_class=StreamingResponse, responses={
+    200: {"content": {"text/event-stream": {}}}
+})
+async def product_stream_sse():
+    """Cambios de productos (created, updated, deleted, stock) como Server-Sent Events."""
+    return StreamingResponse(
+        sse_stream(product_events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/stream")
+async def product_stream_ws(websocket: WebSocket):
+    """Los mismos eventos que /products/stream, un mensaje JSON por evento."""
+    await websocket.accept()
+    subscription = product_events.subscribe()
+
+    async def watch_disconnect():
+        # Un cliente inactivo solo se detecta leyendo: al desconectar se cierra la suscripción
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        async with subscription:
+            while True:
+                try:
+                    message = await subscription.get()
+                except SlowConsumerError:
+                    # 1013 "Try Again Later": el cliente debe reconectar
+                    await websocket.close(code=1013, reason="slow consumer")
+                    return
+                except SubscriptionClosed:
+                    if websocket.client_state == WebSocketState.CONNECTED:
+                        await websocket.close(code=1001)
+                    return
+                await websocket.send_text(message.data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+
+@router.get("/{product_id}", response_model=ProductOut, responses={
+    304: {"description": "Not modified"},
+    404: {"description": "Product not found"}
+})
+async def get_product(
+    product_id: int,
+    request: Request,
+    fields: Annotated[Optional[str], Query(max_length=200, description="Comma-separated ProductOut fields to return")] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        field_set = product_field_set(parse_fields(fields)) if fields is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    service = AsyncProductService(AsyncProductRepository(db))
+    product = await service.get_product(product_id, field_set.fields if field_set else None)
+    if product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
 
-@router.get("/{product_id}", response_model=ProductOut)
-def get_product(product_id: int, db: Session = Depends(get_db)):
-    service = ProductService(ProductRepository(db))
-    return service.get_product(product_id)
+    # Si el cliente ya tiene esta versión no se serializa nada
+    etag = product_etag(product, field_set.fields if field_set else None)
+    modified = last_modified(product.updated_at)
+    if is_not_modified(request, etag, modified):
+        return not_modified(etag, modified)
+    response = ModelResponse(product, field_set.adapter if field_set else product_adapter)
+    set_validators(response, etag, modified)
+    return response
 
 @router.put("/{product_id}", response_model=ProductOut, responses={
     404: {"description": "Product not found"},
+    412: {"description": "If-Match does not match the current version"},
     422: {"description": "Validation error"}
 })
 async def update_product(
     product_id: int,
+    response: Response,
     name: str = Form(None, min_length=1, max_length=100),
     description: str = Form(None, min_length=1, max_length=500),
     price: float = Form(None, gt=0),
     quantity: int = Form(None, ge=0),
     image: UploadFile = File(None),
-    db: Session = Depends(get_db)
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    service = ProductService(ProductRepository(db))
+    service = AsyncProductService(AsyncProductRepository(db))
     
     # Verificar si el producto existe
-    existing_product = service.get_product(product_id)
+    existing_product = await service.get_product(product_id)
     if not existing_product:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Product not found")
 
+    # Control de concurrencia optimista: If-Match lleva el ETag que leyó el cliente
+    expected_versions = if_match_versions(if_match, product_id) if if_match is not None else None
+    if expected_versions is not None and not expected_versions:
+        raise HTTPException(status_code=412, detail="If-Match does not match this product")
+
     update_data = {}
 
     # Solo agregar los campos que no son None
@@ -82,57 +310,55 @@ async def update_product(
 
     # Validar que al menos un campo fue proporcionado
     if not update_data and not image:
+        if expected_versions is not None and existing_product.version not in expected_versions:
+            raise HTTPException(status_code=412, detail="Product was modified by another request")
+        response.headers["ETag"] = product_etag(existing_product)
         return existing_product
 
-    # Manejar la imagen si se proporciona
+    # Manejar la imagen si se proporciona. La anterior no se borra aquí: otro producto
+    # puede estar guardando ese mismo fichero; lo recoge scripts.image_gc
     if image:
-        try:
-            # Validar tipo de archivo
-            if not image.content_type.startswith('image/'):
-                raise HTTPException(status_code=400, detail="File must be an image")
-                
-            # Crear un nombre de archivo único para evitar colisiones
-            import uuid
-            file_extension = Path(image.filename).suffix.lower()
-            if not file_extension:
-                file_extension = ".jpg"
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            file_path = UPLOAD_DIR / unique_filename
-            
-            # Guardar el archivo
-            with file_path.open("wb") as buffer:
-                shutil.copyfileobj(image.file, buffer)
-            
-            # Actualizar la URL de la imagen
-            update_data["image_url"] = f"/static/images/{unique_filename}"
-            
-            # Limpiar la imagen anterior si existe
-            if existing_product.image_url:
-                old_image_path = Path(".") / existing_product.image_url.lstrip("/")
-                if old_image_path.exists() and old_image_path.is_file():
-                    try:
-                        old_image_path.unlink()
-                    except Exception as e:
-                        # Si falla al eliminar la imagen anterior, registrar el error pero continuar
-                        print(f"Warning: Could not delete old image: {e}")
-                        
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error processing image: {str(e)}")
+        update_data["image_url"] = await _store_image(image)
 
     # Actualizar el producto con los datos validados
     try:
-        updated_product = service.update_product(product_id, update_data)
+        updated_product = await service.update_product(product_id, update_data, expected_versions)
         if not updated_product:
             raise HTTPException(status_code=404, detail="Product not found")
-        return updated_product
+    except VersionConflictError as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         # Capturar errores de validación del modelo
         raise HTTPException(status_code=422, detail=str(e))
 
+    response.headers["ETag"] = product_etag(updated_product)
+    return updated_product
+
+
+@router.post("/{product_id}/stock/adjust", response_model=StockLevel, responses={
+    404: {"description": "Product not found"},
+    409: {"description": "Insufficient stock"}
+})
+async def adjust_stock(
+    product_id: int,
+    adjustment: StockAdjustment,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncProductService(AsyncProductRepository(db))
+    try:
+        level = await service.adjust_stock(product_id, adjustment.delta)
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if level is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    response.headers["ETag"] = product_etag(level)
+    return level
+
 
 @router.delete("/{product_id}")
-def delete_product(product_id: int, db: Session = Depends(get_db)):
-    service = ProductService(ProductRepository(db))
-    if not service.delete_product(product_id):
+async def delete_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    service = AsyncProductService(AsyncProductRepository(db))
+    if not await service.delete_product(product_id):
         raise HTTPException(status_code=404, detail="Product not found")
     return {"message": "Product deleted"}
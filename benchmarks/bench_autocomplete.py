@@ -0,0 +1,49 @@
+"""Latencia y memoria del índice de prefijos del autocompletado.
+
+Uso:
+    python -m benchmarks.bench_autocomplete --rows 1000000 [--queries 10000]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from core.prefix_index import PrefixIndex
+
+ADJECTIVES = ["red", "blue", "green", "black", "white", "steel", "wooden", "compact", "deluxe", "portable"]
+NOUNS = ["lamp", "chair", "desk", "backpack", "bottle", "kettle", "speaker", "drill", "mug", "jacket"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    names = [(i, f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.randrange(10**6)}") for i in range(args.rows)]
+
+    index = PrefixIndex()
+    start = time.perf_counter()
+    index.load(names)
+    print(f"load {args.rows:,} names: {time.perf_counter() - start:.2f}s  "
+          f"memory={index.memory_bytes() / 2**20:.1f} MiB")
+
+    prefixes = [name[:rng.randint(1, 12)] for _, name in rng.sample(names, min(args.queries, args.rows))]
+    latencies = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        index.search(prefix, args.limit)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    latencies.sort()
+    print(f"search  p50={statistics.median(latencies):.1f}us  p99={latencies[int(len(latencies) * 0.99)]:.1f}us")
+
+    start = time.perf_counter()
+    for i in range(1000):
+        index.set(rng.randrange(args.rows), f"renamed {i}")
+    print(f"rename  {(time.perf_counter() - start) / 1000 * 1e6:.1f}us per update")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compara filas/segundo entre el camino fila a fila y los métodos batch del repositorio.
+
+Uso:
+    python -m benchmarks.bench_batch --rows 2000 [--url sqlite:///./bench.db]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.base import Base
+from models.product import Product
+from repositories.product_repo import ProductRepository
+
+BATCH = 1000
+
+
+def _rows(n, offset=0):
+    return [
+        {"name": f"Product {offset + i}", "description": "benchmark row",
+         "price": 1.0 + i % 100, "quantity": i % 50}
+        for i in range(n)
+    ]
+
+
+def _timed(label, rows, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {rows:>8} rows  {elapsed:8.3f}s  {rows / elapsed:12,.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL (por defecto un SQLite temporal)")
+    args = parser.parse_args()
+
+    tmp = None
+    url = args.url
+    if url is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite:///{tmp.name}"
+
+    engine = create_engine(url)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    n = args.rows
+
+    try:
+        with Session() as db:
+            repo = ProductRepository(db)
+            single = _timed("create (per row)", n, lambda: [repo.create(Product(**row)) for row in _rows(n)])
+            batch = _timed("bulk_create", n, lambda: [
+                repo.bulk_create(_rows(min(BATCH, n - i), offset=i)) for i in range(0, n, BATCH)
+            ])
+            print(f"{'speedup':<28} {single / batch:8.1f}x\n")
+
+            products = db.query(Product).limit(n).all()
+
+            def update_each():
+                for product in products:
+                    product.quantity += 1
+                    repo.update(product)
+
+            ids = [p.id for p in products]
+            single = _timed("update (per row)", n, update_each)
+            batch = _timed("bulk_update", n, lambda: [
+                repo.bulk_update([{"id": i, "quantity": 7} for i in ids[j:j + BATCH]])
+                for j in range(0, n, BATCH)
+            ])
+            print(f"{'speedup':<28} {single / batch:8.1f}x")
+    finally:
+        engine.dispose()
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
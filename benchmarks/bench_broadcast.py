@@ -0,0 +1,81 @@
+"""Rendimiento del fan-out del hub de eventos a miles de suscriptores inactivos.
+
+Cada suscriptor es una tarea esperando en su cola, como un cliente de /products/stream
+sin tráfico de entrada. Mide cuánto tarda en llegar cada evento a todos ellos.
+
+Uso:
+    python -m benchmarks.bench_broadcast --subscribers 5000 [--events 200] [--from-thread]
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from core.broadcast import BroadcastHub
+
+EVENT = {"type": "stock", "id": 1, "data": {"id": 1, "quantity": 10, "version": 2}}
+
+
+async def run(subscribers: int, events: int, from_thread: bool, queue_size: int):
+    hub = BroadcastHub(queue_size=queue_size)
+    done = asyncio.Event()
+    pending = subscribers
+
+    async def consume(subscription):
+        nonlocal pending
+        for _ in range(events):
+            await subscription.get()
+        pending -= 1
+        if not pending:
+            done.set()
+
+    tasks = [asyncio.create_task(consume(hub.subscribe())) for _ in range(subscribers)]
+    await asyncio.sleep(0)  # todas las tareas quedan esperando en su cola
+
+    publish_time = 0.0
+
+    def publish():
+        nonlocal publish_time
+        for _ in range(events):
+            began = time.perf_counter()
+            hub.publish(EVENT)
+            publish_time += time.perf_counter() - began
+
+    start = time.perf_counter()
+    if from_thread:
+        # Como un worker síncrono publicando en el loop de los suscriptores
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+    else:
+        for _ in range(events):
+            began = time.perf_counter()
+            hub.publish(EVENT)
+            publish_time += time.perf_counter() - began
+            await asyncio.sleep(0)
+    await done.wait()
+    total = time.perf_counter() - start
+    if from_thread:
+        publisher.join()
+    await asyncio.gather(*tasks)
+
+    deliveries = subscribers * events
+    stats = hub.stats()
+    print(f"{subscribers:,} subscribers x {events} events ({'thread' if from_thread else 'loop'} publisher)")
+    print(f"  publish() {publish_time / events * 1e3:.2f} ms/event  "
+          f"all delivered in {total * 1e3:.1f} ms")
+    print(f"  {events / total:,.0f} events/s  {deliveries / total:,.0f} deliveries/s  "
+          f"slow consumers={stats['slow_consumers']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--from-thread", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.subscribers, args.events, args.from_thread, args.queue_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""CPU frente a bytes de la compresión de respuestas a distintos niveles.
+
+Comprime con los mismos encoders del middleware una página de GET /products/ y una
+exportación NDJSON sintéticas, y muestra tamaño, ratio, tiempo por respuesta y MB/s
+por codificación y nivel (zstd solo si el paquete zstandard está instalado).
+
+Uso:
+    python -m benchmarks.bench_compression [--page 500] [--export 20000]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+from core.compression import ENCODERS
+from schemas.product import ProductOut, product_list_adapter
+
+LEVELS = {"gzip": (1, 3, 5, 6, 9), "zstd": (1, 3, 6, 12, 19)}
+WORDS = ["steel", "wooden", "compact", "deluxe", "portable", "lamp", "chair", "desk", "bottle", "kettle",
+         "speaker", "drill", "mug", "jacket", "with", "for", "and", "extra", "durable", "finish"]
+
+
+def _products(n):
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    return [
+        ProductOut(id=i, name=f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+                   description=" ".join(rng.choices(WORDS, k=rng.randint(10, 40))),
+                   price=round(rng.uniform(1, 500), 2), quantity=rng.randint(0, 500),
+                   image_url=None, version=rng.randint(1, 5), updated_at=now)
+        for i in range(1, n + 1)
+    ]
+
+
+def _measure(payload: bytes, encoding: str, level: int, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        size = len(ENCODERS[encoding](level).finish(payload))
+    return size, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page", type=int, default=500, help="productos en la página JSON")
+    parser.add_argument("--export", type=int, default=20_000, help="filas de la exportación NDJSON")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page = product_list_adapter.dump_json(_products(args.page))
+    export = b"".join(
+        json.dumps(p.model_dump(mode="json", include={"id", "name", "description", "price", "quantity"})).encode() + b"\n"
+        for p in _products(args.export)
+    )
+    for title, payload in ((f"page of {args.page} products", page), (f"export of {args.export:,} rows", export)):
+        print(f"{title}: {len(payload) / 1024:,.0f} KiB")
+        for encoding in ENCODERS:
+            for level in LEVELS[encoding]:
+                size, seconds = _measure(payload, encoding, level, args.repeat)
+                print(f"  {encoding:<4} level {level:>2}: {size / 1024:>8,.1f} KiB  ratio {len(payload) / size:>5.1f}x  "
+                      f"{seconds * 1e3:>7.2f} ms  {len(payload) / seconds / 2**20:>7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Latencia de lecturas de productos durante una avalancha de logins.
+
+Lanza lectores de GET /products/{id} en paralelo con clientes que hacen login sin parar
+y compara p50/p99 de las lecturas sin logins, con bcrypt en el threadpool y con bcrypt
+en el pool de procesos.
+
+Uso:
+    python -m benchmarks.bench_login_storm --seconds 5 --readers 8 --logins 16 [--rounds 12] [--workers 2]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def _percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * q), len(samples) - 1)] if samples else 0.0
+
+
+async def _scenario(app, label, seconds, readers, logins, product_ids, credentials):
+    import httpx
+
+    read_latencies = []
+    login_count = 0
+    deadline = time.perf_counter() + seconds
+
+    async def reader(client):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(f"/products/{random.choice(product_ids)}")
+            response.raise_for_status()
+            read_latencies.append(time.perf_counter() - start)
+
+    async def login(client):
+        nonlocal login_count
+        while time.perf_counter() < deadline:
+            response = await client.post("/auth/login", json=credentials)
+            response.raise_for_status()
+            login_count += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(*[reader(client) for _ in range(readers)],
+                             *[login(client) for _ in range(logins)])
+
+    ms = [latency * 1000 for latency in read_latencies]
+    print(f"{label:<18} reads={len(ms):>7}  p50={statistics.median(ms):8.2f}ms  "
+          f"p99={_percentile(ms, 0.99):8.2f}ms  max={max(ms):8.2f}ms  logins/s={login_count / seconds:7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=16, help="clientes haciendo login en bucle")
+    parser.add_argument("--rounds", type=int, default=12, help="coste bcrypt")
+    parser.add_argument("--workers", type=int, default=2, help="procesos del pool de bcrypt")
+    parser.add_argument("--products", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Settings se lee al importar: la configuración va antes de cargar la app
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp.name}"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    # Se mide el coste de bcrypt, no el limitador de login: todos los logins son iguales
+    for name in ("LOGIN_RATE_PER_IP", "LOGIN_BURST_PER_IP", "LOGIN_RATE_PER_EMAIL", "LOGIN_BURST_PER_EMAIL"):
+        os.environ[name] = str(10 ** 9)
+
+    from db.base import Base
+    from db.session import SessionLocal, async_engine, engine
+    from main import app
+    from repositories.product_repo import ProductRepository
+    from services.password_hasher import password_hasher, pwd_context
+    from models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    credentials = {"email": "storm@example.com", "password": "storm-pass"}
+    with SessionLocal() as db:
+        product_ids = ProductRepository(db).bulk_create([
+            {"name": f"Product {i}", "description": "benchmark row", "price": 1.0 + i % 100, "quantity": i % 50}
+            for i in range(args.products)
+        ])
+        db.add(User(username="storm", email=credentials["email"],
+                    hashed_password=pwd_context.hash(credentials["password"])))
+        db.commit()
+
+    async def run():
+        try:
+            await _scenario(app, "no logins", args.seconds, args.readers, 0, product_ids, credentials)
+            for label, workers in (("bcrypt threadpool", 0), (f"bcrypt {args.workers} procs", args.workers)):
+                password_hasher.shutdown()
+                password_hasher.workers = workers
+                password_hasher.start()
+                await _scenario(app, label, args.seconds, args.readers, args.logins, product_ids, credentials)
+        finally:
+            password_hasher.shutdown()
+            await async_engine.dispose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        engine.dispose()
+        os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Memoria pico y CPU por fila al listar el catálogo: objetos ORM vs filas Core.
+
+Carga N productos en un SQLite temporal y, en un proceso nuevo para cada camino
+(para que el pico de RSS de uno no contamine al otro), lee todo el catálogo y lo
+convierte a ProductOut:
+
+- orm:  ProductRepository.get_all() -> instancias Product en el identity map
+- rows: ProductRepository.get_rows() -> filas Core con READ_COLUMNS
+
+Uso:
+    python -m benchmarks.bench_read_rows --rows 500000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from db.base import Base
+import models  # noqa: F401  registra todas las tablas y triggers
+from models.product import Product
+
+BATCH = 10_000
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss va en KiB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(url: str, mode: str, results):
+    from repositories.product_repo import ProductRepository
+    from schemas.product import ProductOut
+
+    engine = create_engine(url)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        repo = ProductRepository(db)
+        repo.get_row(1)  # conexión e imports antes de medir
+        baseline = _peak_rss_mib()
+        cpu, wall = time.process_time(), time.perf_counter()
+        if mode == "orm":
+            rows = repo.get_all()
+            fetched = time.process_time()
+            items = [ProductOut.model_validate(row) for row in rows]
+        else:
+            rows = repo.get_rows()
+            fetched = time.process_time()
+            items = [ProductOut.model_validate(row._asdict()) for row in rows]
+        done = time.process_time()
+        results.put({
+            "mode": mode,
+            "rows": len(items),
+            "fetch_us": (fetched - cpu) / len(items) * 1e6,
+            "total_us": (done - cpu) / len(items) * 1e6,
+            "wall_s": time.perf_counter() - wall,
+            "peak_mib": _peak_rss_mib() - baseline,
+        })
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    url = f"sqlite:///{tmp.name}"
+    try:
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            for offset in range(0, args.rows, BATCH):
+                conn.execute(insert(Product), [
+                    {"name": f"product {i}", "description": "lorem ipsum dolor sit amet " * 4,
+                     "price": 1.0 + i % 100, "quantity": i % 50}
+                    for i in range(offset, min(offset + BATCH, args.rows))
+                ])
+        engine.dispose()
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        print(f"{args.rows:,} rows -> ProductOut")
+        for mode in ("orm", "rows"):
+            process = context.Process(target=_measure, args=(url, mode, results))
+            process.start()
+            r = results.get()
+            process.join()
+            print(f"  {r['mode']:<5} fetch {r['fetch_us']:.2f} us/row  total {r['total_us']:.2f} us/row  "
+                  f"wall {r['wall_s']:.1f}s  peak RSS +{r['peak_mib']:.0f} MiB")
+    finally:
+        os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Latencia de GET /products/search a nivel de repositorio sobre un catálogo grande.
+
+Carga N productos con nombres y descripciones sintéticos (el índice FTS se mantiene
+con los triggers, como en producción) y mide p50/p99 de consultas de 1-2 términos.
+
+Uso:
+    python -m benchmarks.bench_search --rows 1000000 [--queries 500] [--window 2000] [--url ...]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.base import Base
+import models  # noqa: F401  registra el DDL de búsqueda
+from repositories.product_repo import ProductRepository, search_terms
+
+BATCH = 5000
+ADJECTIVES = ["red", "blue", "green", "black", "white", "steel", "wooden", "compact", "deluxe", "portable",
+              "wireless", "classic", "modern", "rugged", "vintage", "smart", "mini", "heavy", "light", "eco"]
+NOUNS = ["lamp", "chair", "desk", "backpack", "bottle", "kettle", "speaker", "drill", "mug", "jacket",
+         "lantern", "wallet", "router", "monitor", "keyboard", "blender", "tent", "helmet", "scale", "clock"]
+WORDS = [f"{a}{n}" for a in ("al", "bo", "ca", "de", "fi", "go", "hu", "ki") for n in range(250)]
+
+
+def _rows(rng, n, offset):
+    return [
+        {"name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {offset + i}",
+         "description": " ".join(rng.choices(WORDS, k=12)),
+         "price": 1.0 + i % 100, "quantity": i % 50}
+        for i in range(n)
+    ]
+
+
+def _queries(rng, n):
+    queries = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(rng.choice(NOUNS))
+        elif kind < 0.7:
+            queries.append(f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}")
+        elif kind < 0.9:
+            queries.append(rng.choice(WORDS))
+        else:
+            queries.append(rng.choice(NOUNS)[:3])
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--window", type=int, default=0, help="SEARCH_RANK_WINDOW (0 = puntuar todo)")
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL (por defecto un SQLite temporal)")
+    args = parser.parse_args()
+
+    tmp = None
+    url = args.url
+    if url is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite:///{tmp.name}"
+
+    engine = create_engine(url)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+
+    try:
+        with Session() as db:
+            repo = ProductRepository(db)
+            start = time.perf_counter()
+            for offset in range(0, args.rows, BATCH):
+                repo.bulk_create(_rows(rng, min(BATCH, args.rows - offset), offset))
+            print(f"loaded {args.rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+            latencies, hits = [], 0
+            for query in _queries(rng, args.queries):
+                start = time.perf_counter()
+                hits += len(repo.search(search_terms(query), args.limit, args.window))
+                latencies.append((time.perf_counter() - start) * 1000)
+                db.expunge_all()
+
+        latencies.sort()
+        print(f"{args.queries} queries  p50={statistics.median(latencies):.2f}ms  "
+              f"p99={latencies[int(len(latencies) * 0.99) - 1]:.2f}ms  max={latencies[-1]:.2f}ms  "
+              f"avg results={hits / args.queries:.1f}")
+    finally:
+        engine.dispose()
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
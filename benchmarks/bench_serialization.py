@@ -0,0 +1,76 @@
+"""Filas por segundo al serializar una página de GET /products/.
+
+Compara el camino de response_model de FastAPI (validar el resultado otra vez,
+jsonable_encoder y json.dumps) con ModelResponse (TypeAdapter.dump_json) en dos casos:
+
+- página en caché: la lista de ProductOut ya está construida, solo se serializa;
+- página de la BD: además se hace el ProductOut.model_validate del servicio.
+
+Uso:
+    python -m benchmarks.bench_serialization [--rows 500] [--seconds 3]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from api.responses import ModelResponse
+from models.product import Product
+from schemas.product import ProductOut, product_list_adapter
+
+
+def _rows(n):
+    now = datetime.now(timezone.utc)
+    return [
+        Product(id=i, name=f"product {i}", description="lorem ipsum " * 16, price=1.0 + i % 100,
+                quantity=i % 50, image_url=f"/static/images/{i:08x}.jpg" if i % 2 else None,
+                version=1, updated_at=now)
+        for i in range(1, n + 1)
+    ]
+
+
+async def _response_model(items, field):
+    content = await serialize_response(field=field, response_content=items)
+    return JSONResponse(content).body
+
+
+async def _fast(items, field):
+    return ModelResponse(items, product_list_adapter).body
+
+
+async def _measure(label, render, rows, field, seconds, from_db):
+    count, start = 0, time.perf_counter()
+    items = [ProductOut.model_validate(row) for row in rows]
+    while time.perf_counter() - start < seconds:
+        if from_db:
+            items = [ProductOut.model_validate(row) for row in rows]
+        body = await render(items, field)
+        count += len(rows)
+    rate = count / (time.perf_counter() - start)
+    print(f"  {label:<16} {rate:>12,.0f} rows/s  ({len(body) / len(rows):.0f} bytes/row)")
+    return rate
+
+
+async def run(rows, seconds):
+    field = create_model_field("Response", list[ProductOut])
+    for title, from_db in (("cached page", False), ("page from the DB", True)):
+        print(title)
+        slow = await _measure("response_model", _response_model, rows, field, seconds, from_db)
+        fast = await _measure("ModelResponse", _fast, rows, field, seconds, from_db)
+        print(f"  speed-up x{fast / slow:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(_rows(args.rows), args.seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Ajustes de stock concurrentes sobre un único SKU "caliente".
+
+Compara el UPDATE condicional del repositorio (`atomic`) con un leer-modificar-escribir
+ingenuo (`naive`) y comprueba que no se pierde ninguna actualización.
+
+Uso:
+    python -m benchmarks.bench_stock_adjust --workers 16 --ops 200 [--mode atomic|naive|both] [--url ...]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.base import Base
+from models.product import Product
+from repositories.product_repo import ProductRepository
+
+INITIAL_STOCK = 1000
+
+
+def _atomic(repo, product_id, delta):
+    return repo.adjust_quantity(product_id, delta) is not None
+
+
+def _naive(repo, product_id, delta):
+    product = repo.get_by_id(product_id)
+    if product.quantity + delta < 0:
+        repo.db.rollback()
+        return False
+    product.quantity = product.quantity + delta
+    repo.update(product)
+    return True
+
+
+def _run(mode, Session, product_id, workers, ops):
+    adjust = _atomic if mode == "atomic" else _naive
+    lock = threading.Lock()
+    totals = {"applied": 0, "rejected": 0, "net": 0}
+
+    def worker(seed):
+        rng = random.Random(seed)
+        applied = rejected = net = 0
+        with Session() as db:
+            repo = ProductRepository(db)
+            for _ in range(ops):
+                delta = rng.choice((-3, -2, -1, 1, 2))
+                if adjust(repo, product_id, delta):
+                    applied += 1
+                    net += delta
+                else:
+                    rejected += 1
+        with lock:
+            totals["applied"] += applied
+            totals["rejected"] += rejected
+            totals["net"] += net
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, range(workers)))
+    elapsed = time.perf_counter() - start
+
+    with Session() as db:
+        final = db.get(Product, product_id).quantity
+    expected = INITIAL_STOCK + totals["net"]
+    total = workers * ops
+    print(f"{mode:<8} {total:>7} ops  {elapsed:8.3f}s  {total / elapsed:10,.0f} ops/s  "
+          f"applied={totals['applied']} rejected={totals['rejected']}  "
+          f"final={final} expected={expected}  lost={abs(expected - final)}")
+    return final == expected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200, help="ajustes por worker")
+    parser.add_argument("--mode", choices=("atomic", "naive", "both"), default="both")
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL (por defecto un SQLite temporal)")
+    args = parser.parse_args()
+
+    tmp = None
+    url = args.url
+    if url is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite:///{tmp.name}"
+
+    connect_args = {"timeout": 60} if url.startswith("sqlite") else {}
+    engine = create_engine(url, pool_size=args.workers, connect_args=connect_args)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    modes = ("atomic", "naive") if args.mode == "both" else (args.mode,)
+    try:
+        for mode in modes:
+            with Session() as db:
+                product = ProductRepository(db).create(
+                    Product(name=f"Hot SKU ({mode})", price=1.0, quantity=INITIAL_STOCK)
+                )
+                product_id = product.id
+            consistent = _run(mode, Session, product_id, args.workers, args.ops)
+            if mode == "atomic" and not consistent:
+                raise SystemExit("lost updates in atomic mode")
+    finally:
+        engine.dispose()
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import asyncio
+import itertools
+import json
+import threading
+from typing import NamedTuple
+
+# Políticas ante un suscriptor cuya cola está llena
+DISCONNECT = "disconnect"    # se le cierra la suscripción (el cliente debe reconectar)
+DROP_OLDEST = "drop_oldest"  # se descarta su evento más antiguo y sigue suscrito
+
+POLICIES = (DISCONNECT, DROP_OLDEST)
+
+
+class Message(NamedTuple):
+    seq: int
+    type: str
+    data: str  # evento completo ya serializado a JSON
+
+
+class SubscriptionClosed(Exception):
+    """La suscripción fue cerrada por el hub."""
+
+
+class SlowConsumerError(SubscriptionClosed):
+    """La suscripción se cerró porque el cliente no consumía los eventos a tiempo."""
+
+
+class _Closed:
+    def __init__(self, reason):
+        self.reason = reason
+
+
+class Subscription:
+    """Cola acotada de un suscriptor, ligada al event loop en el que se creó."""
+
+    def __init__(self, hub, subscriber_id: int, maxsize: int):
+        self.hub = hub
+        self.id = subscriber_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+        self.dropped = 0
+
+    def _offer(self, message):
+        # Siempre se ejecuta en self.loop
+        if self.closed:
+            return
+        if self.queue.full():
+            if self.hub.policy == DROP_OLDEST:
+                self.queue.get_nowait()
+                self.dropped += 1
+            else:
+                self._close(SlowConsumerError("Subscriber queue is full"))
+                self.hub._slow_consumer()
+                return
+        self.queue.put_nowait(message)
+
+    def _close(self, reason=None):
+        if self.closed:
+            return
+        self.closed = True
+        self.hub._remove(self)
+        # Vacía la cola para que el cierre se entregue aunque estuviera llena
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_Closed(reason))
+
+    async def get(self, timeout: float | None = None) -> Message | None:
+        """Siguiente mensaje; None si vence `timeout`.
+
+        Lanza SubscriptionClosed (SlowConsumerError si fue por lentitud) al cerrarse.
+        """
+        try:
+            message = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if isinstance(message, _Closed):
+            raise message.reason or SubscriptionClosed("Subscription closed")
+        return message
+
+    def close(self):
+        if self.loop.is_closed():
+            self.closed = True
+            self.hub._remove(self)
+        else:
+            self.loop.call_soon_threadsafe(self._close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+        self.hub._remove(self)
+
+
+def _deliver(subscriptions, message):
+    for subscription in subscriptions:
+        subscription._offer(message)
+
+
+class BroadcastHub:
+    """Difusión en proceso de eventos a muchos suscriptores.
+
+    Cada evento se serializa a JSON una única vez y se reparte a las colas acotadas de
+    los suscriptores; `publish` nunca espera por un cliente lento (se le aplica la
+    política configurada). Se puede publicar desde cualquier hilo o event loop: la
+    entrega se hace en el loop de cada suscriptor (call_soon / call_soon_threadsafe).
+    """
+
+    def __init__(self, queue_size: int = 256, policy: str = DISCONNECT):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown slow consumer policy {policy!r}")
+        self.queue_size = queue_size
+        self.policy = policy
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._seq = itertools.count(1)
+        self.published = 0
+        self.slow_consumers = 0
+
+    def subscribe(self, queue_size: int | None = None) -> Subscription:
+        """Nueva suscripción; hay que llamarlo desde el event loop que la consumirá."""
+        subscription = Subscription(self, next(self._ids), queue_size or self.queue_size)
+        with self._lock:
+            self._subscribers[subscription.id] = subscription
+        return subscription
+
+    def publish(self, event: dict) -> int:
+        """Añade `seq` al evento, lo serializa y lo encola para cada suscriptor."""
+        with self._lock:
+            seq = next(self._seq)
+            subscribers = list(self._subscribers.values())
+            self.published += 1
+        message = Message(seq, event.get("type", "message"),
+                          json.dumps({"seq": seq, **event}, default=str, separators=(",", ":")))
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        # La entrega se programa en el loop de cada grupo de suscriptores (una llamada
+        # por loop, no por suscriptor): quien publica no espera a recorrer las colas
+        by_loop = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            if loop is current:
+                loop.call_soon(_deliver, group, message)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(_deliver, group, message)
+        return seq
+
+    def _remove(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.pop(subscription.id, None)
+
+    def _slow_consumer(self):
+        with self._lock:
+            self.slow_consumers += 1
+
+    def close_all(self):
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for subscription in subscribers:
+            subscription.close()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "slow_consumers": self.slow_consumers,
+                "queue_size": self.queue_size,
+                "policy": self.policy,
+            }
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheBackend:
+    """Interfaz mínima de caché clave/valor.
+
+    La implementación por defecto vive en el proceso (LRUCache); una caché compartida
+    (Redis, memcached...) solo necesita implementar estos métodos.
+    """
+
+    def get(self, key):
+        """Devuelve el valor o None si no está (o ha caducado)."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl: float | None = None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def get_meta(self, key):
+        """Claves de control (p. ej. generaciones): sin caducidad y fuera de las estadísticas."""
+        return self.get(key)
+
+    def set_meta(self, key, value):
+        self.set(key, value, ttl=float("inf"))
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LRUCache(CacheBackend):
+    """LRU en memoria con TTL por entrada, límite de tamaño y contadores."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        # Fuera de la LRU: no se expulsan ni cuentan como aciertos o fallos
+        self._meta = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float | None = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def get_meta(self, key):
+        with self._lock:
+            return self._meta.get(key)
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self._meta[key] = value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._meta.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
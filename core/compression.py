@@ -0,0 +1,211 @@
+"""Compresión de respuestas negociada con Accept-Encoding (zstd si está instalado, gzip).
+
+Middleware ASGI puro: funciona igual con respuestas completas y con StreamingResponse
+(cada trozo se comprime y se vacía al momento, así que la exportación sigue saliendo
+por partes). No toca Server-Sent Events, respuestas que ya traen Content-Encoding ni
+tipos que no comprimen (imágenes, etc.).
+"""
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import zstandard
+except ImportError:  # dependencia opcional: sin ella solo se ofrece gzip
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript", "application/xml",
+    "image/svg+xml",
+)
+EXCLUDED_TYPES = ("text/event-stream",)
+DEFAULT_LEVELS = {"gzip": 5, "zstd": 3}
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits=31: formato gzip (cabecera y CRC), no zlib a secas
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # SYNC_FLUSH: lo comprimido hasta aquí sale ya, sin esperar al resto del stream
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+def available_encodings(preferred) -> tuple[str, ...]:
+    """Codificaciones configuradas que se pueden usar aquí, en orden de preferencia."""
+    return tuple(name for name in preferred if name in ENCODERS)
+
+
+def negotiate(accept_encoding: str, encodings) -> str | None:
+    """La codificación con mayor q del cliente; a igual q, la primera de `encodings`."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name] = q
+    best, best_q = None, 0.0
+    for name in encodings:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag de la representación comprimida: "x" pasa a "x-gzip" (los débiles no cambian)."""
+    if etag.startswith("W/") or len(etag) < 2 or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def decoded_etag(etag: str) -> str:
+    """Quita el sufijo de encoded_etag para comparar con el ETag de la representación original."""
+    for encoding in DEFAULT_LEVELS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in EXCLUDED_TYPES:
+        return False
+    return media_type.startswith("text/") or media_type.endswith("+json") or media_type in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    """Comprime respuestas de al menos `minimum_size` bytes (o en streaming).
+
+    Un ETag fuerte sigue siendo fuerte pero lleva la codificación ("1-3" pasa a
+    "1-3-gzip"): los bytes ya no son los de la representación original. api.conditional
+    quita el sufijo al evaluar If-None-Match e If-Match, así que un cliente puede
+    devolver tal cual el ETag que recibió comprimido.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, encodings=("zstd", "gzip"), levels: dict | None = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings(encodings)
+        self.levels = levels or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(send, encoding, self.levels.get(encoding, DEFAULT_LEVELS[encoding]), self.minimum_size,
+                               Headers(scope=scope).get("if-none-match", ""))
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    def __init__(self, send, encoding: str, level: int, minimum_size: int, if_none_match: str = ""):
+        self._send = send
+        self.if_none_match = if_none_match
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # La cabecera se retiene hasta ver el primer trozo del cuerpo
+            self.start_message = message
+            if message["status"] == 304:
+                self._not_modified(MutableHeaders(raw=message["headers"]))
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers or not is_compressible(headers.get("content-type", ""))
+            )
+            return
+        if message_type != "http.response.body":
+            # http.response.pathsend (FileResponse) y otros: sin comprimir
+            await self._start()
+            await self._send(message)
+            return
+        if self.passthrough:
+            await self._start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._start()
+                await self._send(message)
+                return
+            self.encoder = ENCODERS[self.encoding](self.level)
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag:
+                headers["ETag"] = encoded_etag(etag, self.encoding)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.encoder.finish(body)
+                headers["Content-Length"] = str(len(body))
+                await self._start()
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._start()
+        body = self.encoder.compress(body) if more_body else self.encoder.finish(body)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _not_modified(self, headers: MutableHeaders):
+        # Un 304 no trae cuerpo ni Content-Type, pero debe repetir los validadores de la
+        # respuesta que revalida: si el cliente guardó la comprimida, su ETag con sufijo
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag:
+            encoded = encoded_etag(etag, self.encoding)
+            if encoded in (tag.strip() for tag in self.if_none_match.split(",")):
+                headers["ETag"] = encoded
+
+    async def _start(self):
+        if self.start_message is not None:
+            message, self.start_message = self.start_message, None
+            await self._send(message)
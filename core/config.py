@@ -5,8 +5,58 @@ load_dotenv()
 
 class Settings:
     DATABASE_URL = os.getenv("DATABASE_URL")
+    # Opcional: si no se define se deriva de DATABASE_URL (aiosqlite / asyncpg)
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+    # Búsqueda: 0 puntúa todas las coincidencias. Con N > 0 solo se puntúan las N más
+    # recientes y las anteriores nunca salen, aunque sean más relevantes
+    SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", 0))
+    # Pool de conexiones (se ignora con SQLite en memoria)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # segundos; -1 lo desactiva
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    DB_POOL_USE_LIFO = os.getenv("DB_POOL_USE_LIFO", "false").lower() in ("1", "true", "yes")
     SECRET_KEY = os.getenv("SECRET_KEY", "default-secret")
+    # Token Bearer compartido para /internal/*; sin definir, esas rutas responden 403
+    INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN", "")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
+    # Tokens ya verificados que get_current_user no vuelve a decodificar
+    TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", 10_000))
+    TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", 300))
+    # Lista de tokens revocados en memoria (Bloom) y cada cuánto se relee la tabla
+    REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", 100_000))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", 0.001))
+    REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", 10))
+    # Intentos de login por minuto y ráfaga permitida, por IP y por email
+    LOGIN_RATE_PER_IP = float(os.getenv("LOGIN_RATE_PER_IP", 30))
+    LOGIN_BURST_PER_IP = int(os.getenv("LOGIN_BURST_PER_IP", 10))
+    LOGIN_RATE_PER_EMAIL = float(os.getenv("LOGIN_RATE_PER_EMAIL", 6))
+    LOGIN_BURST_PER_EMAIL = int(os.getenv("LOGIN_BURST_PER_EMAIL", 5))
+    RATE_LIMIT_SWEEP_SECONDS = float(os.getenv("RATE_LIMIT_SWEEP_SECONDS", 60))
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100_000))
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+    # Procesos dedicados a bcrypt; 0 lo ejecuta en el threadpool
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", 5 * 1024 * 1024))
+    IMAGE_VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT", "webp")  # webp | jpeg
+    IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", 2))
+    # scripts.image_gc no borra imágenes subidas o deduplicadas hace menos de esto
+    IMAGE_GC_GRACE_SECONDS = int(os.getenv("IMAGE_GC_GRACE_SECONDS", 3600))
+    PRODUCT_CACHE_MAXSIZE = int(os.getenv("PRODUCT_CACHE_MAXSIZE", 10_000))
+    PRODUCT_CACHE_TTL = float(os.getenv("PRODUCT_CACHE_TTL", 30))
+    # Stream de cambios de productos: eventos pendientes por cliente y qué hacer si se llena
+    STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", 256))
+    STREAM_SLOW_CONSUMER_POLICY = os.getenv("STREAM_SLOW_CONSUMER_POLICY", "disconnect")  # disconnect | drop_oldest
+    STREAM_KEEPALIVE_SECONDS = float(os.getenv("STREAM_KEEPALIVE_SECONDS", 15))
+    # Compresión de respuestas: codificaciones en orden de preferencia ("" la desactiva),
+    # tamaño mínimo y nivel de cada una (zstd solo si el paquete zstandard está instalado)
+    COMPRESSION_ENCODINGS = tuple(
+        name.strip() for name in os.getenv("COMPRESSION_ENCODINGS", "zstd,gzip").split(",") if name.strip()
+    )
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 5))
+    COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
 
 settings = Settings()
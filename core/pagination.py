@@ -0,0 +1,25 @@
+import base64
+import json
+
+
+class InvalidCursorError(ValueError):
+    """El cursor recibido no es válido o no corresponde al orden pedido."""
+
+
+def encode_cursor(sort: str, value, last_id: int) -> str:
+    payload = json.dumps({"s": sort, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str):
+    """Devuelve (valor, id) de la última fila de la página anterior."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, last_id = payload["v"], int(payload["id"])
+        cursor_sort = payload["s"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if cursor_sort != sort:
+        raise InvalidCursorError("Cursor does not match the requested sort")
+    return value, last_id
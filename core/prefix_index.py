@@ -0,0 +1,149 @@
+import sys
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+# Separa el texto normalizado del id dentro de cada clave; no aparece en el texto
+_SEP = "\x00"
+# A partir de este tamaño un lote reconstruye las listas (timsort fusiona dos tramos
+# ordenados en O(n)) en lugar de hacer un memmove por elemento
+BULK_THRESHOLD = 64
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sin acentos y con los espacios colapsados ("  Café  X" -> "cafe x")."""
+    if text.isascii():
+        return " ".join(text.casefold().replace(_SEP, "").split())
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c) and c != _SEP)
+    return " ".join(stripped.split())
+
+
+class PrefixIndex:
+    """Índice de prefijos en memoria: array ordenado + bisect.
+
+    Cada entrada es una clave "texto normalizado\\0id" en una lista ordenada y su id en
+    un array paralelo (el texto original va en un dict por id); la búsqueda es un
+    bisect más un recorrido de `limit` elementos.
+    Las altas, bajas y renombrados insertan/borran en la posición exacta (memmove), así
+    que no hay que reordenar. `memory_bytes` se mantiene de forma incremental.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._keys = []
+        self._ids = array("q")
+        self._entries = {}
+        self._text_bytes = 0
+
+    @staticmethod
+    def _key(text: str, item_id: int) -> str:
+        # Id en hexadecimal de ancho fijo: a igual texto se ordena por id
+        return f"{normalize(text)}{_SEP}{item_id:012x}"
+
+    def load(self, items):
+        """Reemplaza el contenido con pares (id, texto); ordena una sola vez."""
+        entries = {item_id: text for item_id, text in items if text is not None}
+        keyed = sorted((self._key(text, item_id), item_id) for item_id, text in entries.items())
+        with self._lock:
+            self._keys = [key for key, _ in keyed]
+            self._ids = array("q", (item_id for _, item_id in keyed))
+            self._entries = entries
+            self._text_bytes = sum(sys.getsizeof(key) for key in self._keys) + \
+                sum(sys.getsizeof(text) for text in entries.values())
+
+    def set(self, item_id: int, text: str | None):
+        """Alta o renombrado de `item_id`; texto None equivale a borrarlo."""
+        with self._lock:
+            self._remove(item_id)
+            if text is None:
+                return
+            key = self._key(text, item_id)
+            pos = bisect_left(self._keys, key)
+            self._keys.insert(pos, key)
+            self._ids.insert(pos, item_id)
+            self._entries[item_id] = text
+            self._text_bytes += sys.getsizeof(key) + sys.getsizeof(text)
+
+    def set_many(self, items):
+        """Varias altas/renombrados (pares (id, texto)) de una vez."""
+        items = dict(items)
+        if len(items) < BULK_THRESHOLD:
+            for item_id, text in items.items():
+                self.set(item_id, text)
+            return
+        with self._lock:
+            kept = [(key, item_id) for key, item_id in zip(self._keys, self._ids) if item_id not in items]
+            for item_id in items:
+                text = self._entries.pop(item_id, None)
+                if text is not None:
+                    self._text_bytes -= sys.getsizeof(self._key(text, item_id)) + sys.getsizeof(text)
+            added = sorted((self._key(text, item_id), item_id) for item_id, text in items.items() if text is not None)
+            for key, item_id in added:
+                self._entries[item_id] = items[item_id]
+                self._text_bytes += sys.getsizeof(key) + sys.getsizeof(items[item_id])
+            kept.extend(added)
+            kept.sort()
+            self._keys = [key for key, _ in kept]
+            self._ids = array("q", (item_id for _, item_id in kept))
+
+    def remove(self, item_id: int):
+        with self._lock:
+            self._remove(item_id)
+
+    def remove_many(self, item_ids):
+        item_ids = set(item_ids)
+        if len(item_ids) < BULK_THRESHOLD:
+            for item_id in item_ids:
+                self.remove(item_id)
+            return
+        self.set_many((item_id, None) for item_id in item_ids)
+
+    def _remove(self, item_id: int):
+        text = self._entries.pop(item_id, None)
+        if text is None:
+            return
+        # La clave se recalcula en lugar de guardarla dos veces
+        key = self._key(text, item_id)
+        pos = bisect_left(self._keys, key)
+        del self._keys[pos]
+        del self._ids[pos]
+        self._text_bytes -= sys.getsizeof(key) + sys.getsizeof(text)
+
+    def search(self, prefix: str, limit: int) -> list[tuple[int, str]]:
+        """Hasta `limit` pares (id, texto) cuyo texto empieza por `prefix`, en orden alfabético.
+
+        Un prefijo vacío tras normalizar (" ", "\u0301") no busca nada.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        results = []
+        with self._lock:
+            pos = bisect_left(self._keys, prefix)
+            keys, ids, entries = self._keys, self._ids, self._entries
+            while pos < len(keys) and len(results) < limit and keys[pos].startswith(prefix):
+                item_id = ids[pos]
+                results.append((item_id, entries[item_id]))
+                pos += 1
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def memory_bytes(self) -> int:
+        """Tamaño aproximado: contenedores + cadenas (los ints de los ids no se cuentan)."""
+        with self._lock:
+            return (sys.getsizeof(self._keys) + sys.getsizeof(self._ids)
+                    + sys.getsizeof(self._entries) + self._text_bytes)
+
+    def stats(self) -> dict:
+        return {"entries": len(self), "memory_bytes": self.memory_bytes()}
@@ -0,0 +1,109 @@
+import math
+import threading
+import time
+from core.config import settings
+
+
+class RateLimitBackend:
+    """Estado compartido de los límites de peticiones.
+
+    La implementación por defecto vive en el proceso (MemoryRateLimitBackend); con
+    varios workers, un backend compartido (Redis con un script Lua, por ejemplo) solo
+    necesita implementar `acquire` con la misma semántica.
+    """
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Consume un permiso de `key`: 0.0 si se permite, o segundos hasta el siguiente."""
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Token bucket en memoria implementado como GCRA.
+
+    GCRA equivale a un token bucket de `burst` fichas que se rellena a `rate` por
+    segundo, pero el estado de cada clave es un único float (el instante teórico de
+    llegada), así que un dict con muchas IPs/emails ocupa poco. Las claves cuyo bucket
+    ya estaría lleno no aportan nada y se eliminan cada `sweep_interval` segundos.
+    """
+
+    def __init__(self, sweep_interval: float = 60.0, max_keys: int = 100_000):
+        self.sweep_interval = sweep_interval
+        self.max_keys = max_keys
+        self._tat = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        interval = 1.0 / rate
+        with self._lock:
+            if now >= self._next_sweep or len(self._tat) >= self.max_keys:
+                self._sweep(now)
+            tat = max(self._tat.get(key, now), now) + interval
+            # Con tat - now <= burst * interval quedan fichas en el bucket
+            wait = tat - now - burst * interval
+            if wait > 0:
+                self.rejected += 1
+                return wait
+            self._tat[key] = tat
+            self.allowed += 1
+            return 0.0
+
+    def _sweep(self, now: float):
+        before = len(self._tat)
+        self._tat = {key: tat for key, tat in self._tat.items() if tat > now}
+        # Si aun así no cabe (ataque con muchas claves) se descartan las más antiguas
+        if len(self._tat) >= self.max_keys:
+            for key in list(self._tat)[:len(self._tat) - self.max_keys // 2]:
+                del self._tat[key]
+        self.evictions += before - len(self._tat)
+        self._next_sweep = now + self.sweep_interval
+
+    def reset(self):
+        with self._lock:
+            self._tat.clear()
+            self.allowed = self.rejected = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "keys": len(self._tat),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evictions": self.evictions,
+            }
+
+
+class RateLimit:
+    """Límite `burst` peticiones seguidas y `per_minute` sostenidas por clave."""
+
+    def __init__(self, backend: RateLimitBackend, name: str, per_minute: float, burst: int):
+        self.backend = backend
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.burst = burst
+
+    def hit(self, key: str) -> int:
+        """0 si se permite; si no, segundos (redondeados hacia arriba) para Retry-After."""
+        wait = self.backend.acquire(f"{self.name}:{key}", self.rate, self.burst)
+        return math.ceil(wait) if wait > 0 else 0
+
+
+rate_limit_backend = MemoryRateLimitBackend(sweep_interval=settings.RATE_LIMIT_SWEEP_SECONDS,
+                                            max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+# Intentos de login por IP de origen y por email objetivo
+login_ip_limit = RateLimit(rate_limit_backend, "login:ip",
+                           settings.LOGIN_RATE_PER_IP, settings.LOGIN_BURST_PER_IP)
+login_email_limit = RateLimit(rate_limit_backend, "login:email",
+                              settings.LOGIN_RATE_PER_EMAIL, settings.LOGIN_BURST_PER_EMAIL)
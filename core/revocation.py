@@ -0,0 +1,109 @@
+import hashlib
+import math
+import threading
+import time
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre un bytearray.
+
+    `might_contain` nunca da falsos negativos; los falsos positivos rondan
+    `error_rate` mientras no se superen `capacity` elementos.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de un único digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def might_contain(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+class RevocationList:
+    """Lista de jti revocados: Bloom + conjunto exacto.
+
+    - El Bloom contiene todos los jti revocados conocidos (cargados al arrancar y los
+      añadidos después); si dice que no, el token no está revocado y no se toca la BD.
+    - El conjunto exacto guarda los revocados desde el último rebuild y los confirmados
+      por la BD (jti -> expiración epoch), así que esos tampoco llegan a la BD.
+    - Solo un positivo del Bloom que no está en el conjunto exacto necesita consultar la BD.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._exact = {}
+
+    def rebuild(self, entries):
+        """Reemplaza el contenido por `entries` (pares (jti, expiración epoch))."""
+        entries = list(entries)
+        bloom = BloomFilter(max(self.capacity, 2 * len(entries)), self.error_rate)
+        for jti, _ in entries:
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._exact = {}
+
+    def add(self, jti: str, expires_at: float):
+        with self._lock:
+            self._bloom.add(jti)
+            self._exact[jti] = expires_at
+
+    def check(self, jti: str) -> bool | None:
+        """True revocado, False no revocado, None hay que preguntar a la BD."""
+        with self._lock:
+            if jti in self._exact:
+                return True
+            if not self._bloom.might_contain(jti):
+                return False
+        return None
+
+    def confirm(self, jti: str, expires_at: float):
+        # Positivo confirmado por la BD (revocado por otro proceso)
+        with self._lock:
+            self._exact[jti] = expires_at
+
+    def prune(self, now: float | None = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._exact = {jti: exp for jti, exp in self._exact.items() if exp > now}
+
+    @property
+    def saturated(self) -> bool:
+        return self._bloom.saturated
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "bloom_items": self._bloom.count,
+                "bloom_capacity": self._bloom.capacity,
+                "bloom_bytes": self._bloom.size_bytes,
+                "bloom_hashes": self._bloom.num_hashes,
+                "exact_items": len(self._exact),
+            }
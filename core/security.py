@@ -1,12 +1,85 @@
-from datetime import datetime, timedelta
+import hashlib
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
+from core.cache import CacheBackend, LRUCache
+from core.config import settings
+
+SECRET_KEY = settings.SECRET_KEY
+ALGORITHM = settings.ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+
+
+class InvalidTokenError(ValueError):
+    """Token mal formado, con firma incorrecta, caducado o sin los claims esperados."""
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    username: str
+    user_id: int | None
+    expires_at: float
+    jti: str | None = None
 
-SECRET_KEY = "your-secret-key"
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    # Identificador único para poder revocar el token antes de exp
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def decode_access_token(token: str) -> TokenClaims:
+    """Verifica firma y caducidad; no consulta la base de datos."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError as e:
+        raise InvalidTokenError(str(e)) from e
+    username, user_id, exp, jti = payload.get("sub"), payload.get("uid"), payload.get("exp"), payload.get("jti")
+    if not isinstance(username, str) or not isinstance(exp, (int, float)):
+        raise InvalidTokenError("Token is missing required claims")
+    if user_id is not None and not isinstance(user_id, int):
+        raise InvalidTokenError("Invalid uid claim")
+    if jti is not None and not isinstance(jti, str):
+        raise InvalidTokenError("Invalid jti claim")
+    return TokenClaims(username=username, user_id=user_id, expires_at=float(exp), jti=jti)
+
+
+class TokenVerifier:
+    """decode_access_token con caché de tokens ya verificados.
+
+    La clave es el SHA-256 del token (no se guarda el token en claro) y cada entrada
+    caduca como muy tarde con el propio token, así que una petición repetida solo
+    paga un hash y una búsqueda en lugar de HMAC + base64 + JSON.
+    """
+
+    def __init__(self, cache: CacheBackend):
+        self.cache = cache
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def verify(self, token: str) -> TokenClaims:
+        key = self._key(token)
+        claims = self.cache.get(key)
+        if claims is not None:
+            return claims
+        claims = decode_access_token(token)
+        remaining = claims.expires_at - time.time()
+        if remaining > 0:
+            self.cache.set(key, claims, ttl=min(remaining, settings.TOKEN_CACHE_TTL))
+        return claims
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+token_verifier = TokenVerifier(LRUCache(maxsize=settings.TOKEN_CACHE_MAXSIZE, ttl=settings.TOKEN_CACHE_TTL))
@@ -1,13 +1,45 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
+from db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument, pool_options
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL,
+                       **pool_options(SQLALCHEMY_DATABASE_URL, InstrumentedQueuePool))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Drivers asíncronos equivalentes a los síncronos de DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()!r}")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL,
+                                   **pool_options(ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool))
+
+# Métricas por engine, expuestas en /internal/db/pool
+pool_metrics = {
+    "sync": instrument(engine),
+    "async": instrument(async_engine.sync_engine),
+}
+
+# expire_on_commit=False: tras el commit los objetos se siguen pudiendo leer sin otra consulta
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession,
+                                       autoflush=False, expire_on_commit=False)
+
 # Dependencia para FastAPI
 def get_db():
     db = SessionLocal()
@@ -15,3 +47,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependencia asíncrona para FastAPI
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
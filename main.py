@@ -1,23 +1,43 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from db.session import engine
+from core.compression import CompressionMiddleware
+from core.config import settings
+from db.session import async_engine, AsyncSessionLocal
 from db.base import Base
-from api.routes import auth, products
+from api.routes import auth, products, images, internal
+from services.image_variants import image_variants
+from services.password_hasher import password_hasher
+from services.token_revocation import token_revocation
+from repositories.revoked_token_repo import AsyncRevokedTokenRepository
+from repositories.product_repo import AsyncProductRepository
+from services.product_name_index import load_product_names
+from services.product_events import product_events
 from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 
 # Inicializa la base de datos
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+async def create_tables():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
 
 # Lifespan moderno
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Código que se ejecuta al arrancar
-    create_tables()
+    await create_tables()
+    # Carga los jti revocados en memoria antes de atender peticiones
+    async with AsyncSessionLocal() as db:
+        await token_revocation.load(AsyncRevokedTokenRepository(db))
+        # Índice de nombres para /products/autocomplete
+        await load_product_names(AsyncProductRepository(db))
+    await run_in_threadpool(password_hasher.start)
     yield
-    # Código que se ejecuta al cerrar (si quieres)
-    # Por ejemplo: cerrar conexiones, limpiar recursos, etc.
+    # Código que se ejecuta al cerrar
+    product_events.close_all()
+    password_hasher.shutdown()
+    image_variants.shutdown()
+    await async_engine.dispose()
 
 # Instancia de la app
 app = FastAPI(title="Inventory Management API", debug=True, lifespan=lifespan)
@@ -34,6 +54,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresión negociada con Accept-Encoding (listados y exportaciones grandes)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    encodings=settings.COMPRESSION_ENCODINGS,
+    levels={"gzip": settings.COMPRESSION_GZIP_LEVEL, "zstd": settings.COMPRESSION_ZSTD_LEVEL},
+)
+
 # Incluye las rutas
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(products.router, prefix="/products", tags=["Products"])
+app.include_router(images.router, prefix="/images", tags=["Images"])
+app.include_router(internal.router, prefix="/internal", tags=["Internal"])
@@ -1,2 +1,6 @@
 from .user import User
 from .product import Product
+from .product_change import ProductTombstone
+from .revoked_token import RevokedToken
+from .product_search import products_fts, search_vector
+from .inventory_summary import InventorySummary
@@ -0,0 +1,112 @@
+"""Resumen de inventario mantenido por triggers sobre products.
+
+Cada INSERT/DELETE de products, y cada UPDATE de price o quantity, suma o resta su
+contribución en la misma transacción, sea cual sea el camino de escritura (ORM, bulk,
+ajustes de stock, scripts). Los totales se reparten en SUMMARY_SHARDS filas (por
+id % SUMMARY_SHARDS) para que escrituras concurrentes de productos distintos no
+compitan por el bloqueo de una única fila; leer los totales es sumar esas filas.
+"""
+from sqlalchemy import BigInteger, Column, DDL, Float, Integer, event
+from db.base import Base
+
+SUMMARY_SHARDS = 16
+
+
+class InventorySummary(Base):
+    __tablename__ = "inventory_summary"
+
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    product_count = Column(BigInteger, nullable=False, default=0)
+    units_on_hand = Column(BigInteger, nullable=False, default=0)
+    stock_value = Column(Float, nullable=False, default=0)
+    out_of_stock_count = Column(BigInteger, nullable=False, default=0)
+
+
+def _delta(sign: str, row: str) -> str:
+    """SET que suma (+) o resta (-) la contribución de `row` (new/old)."""
+    return f"""UPDATE inventory_summary SET
+            product_count = product_count {sign} 1,
+            units_on_hand = units_on_hand {sign} coalesce({row}.quantity, 0),
+            stock_value = stock_value {sign} coalesce({row}.price, 0) * coalesce({row}.quantity, 0),
+            out_of_stock_count = out_of_stock_count {sign} (CASE WHEN coalesce({row}.quantity, 0) <= 0 THEN 1 ELSE 0 END)
+        WHERE shard = {row}.id % {SUMMARY_SHARDS}"""
+
+
+_SHARDS = " UNION ALL ".join(f"SELECT {i} AS shard" for i in range(SUMMARY_SHARDS))
+
+# Recalcula el resumen desde products (una pasada agrupada por shard)
+REBUILD_INSERT = f"""INSERT INTO inventory_summary (shard, product_count, units_on_hand, stock_value, out_of_stock_count)
+    SELECT s.shard, coalesce(a.product_count, 0), coalesce(a.units_on_hand, 0),
+           coalesce(a.stock_value, 0), coalesce(a.out_of_stock_count, 0)
+    FROM ({_SHARDS}) AS s
+    LEFT JOIN (
+        SELECT id % {SUMMARY_SHARDS} AS shard,
+               count(*) AS product_count,
+               sum(coalesce(quantity, 0)) AS units_on_hand,
+               sum(coalesce(price, 0) * coalesce(quantity, 0)) AS stock_value,
+               sum(CASE WHEN coalesce(quantity, 0) <= 0 THEN 1 ELSE 0 END) AS out_of_stock_count
+        FROM products
+        GROUP BY id % {SUMMARY_SHARDS}
+    ) AS a ON a.shard = s.shard"""
+
+# Al crear el esquema sobre una base con productos, el resumen parte de los datos reales
+SEED = REBUILD_INSERT + " WHERE NOT EXISTS (SELECT 1 FROM inventory_summary)"
+
+SQLITE_CREATE = [
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_summary_ai AFTER INSERT ON products BEGIN
+        {_delta("+", "new")};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_summary_ad AFTER DELETE ON products BEGIN
+        {_delta("-", "old")};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_summary_au AFTER UPDATE OF price, quantity ON products BEGIN
+        {_delta("-", "old")};
+        {_delta("+", "new")};
+    END""",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS inventory_summary_au",
+    "DROP TRIGGER IF EXISTS inventory_summary_ad",
+    "DROP TRIGGER IF EXISTS inventory_summary_ai",
+]
+
+POSTGRES_CREATE = [
+    f"""CREATE OR REPLACE FUNCTION inventory_summary_apply() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            {_delta("-", "OLD")};
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            {_delta("+", "NEW")};
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS inventory_summary_sync ON products",
+    """CREATE TRIGGER inventory_summary_sync
+        AFTER INSERT OR DELETE OR UPDATE OF price, quantity ON products
+        FOR EACH ROW EXECUTE FUNCTION inventory_summary_apply()""",
+]
+
+POSTGRES_DROP = [
+    "DROP TRIGGER IF EXISTS inventory_summary_sync ON products",
+    "DROP FUNCTION IF EXISTS inventory_summary_apply()",
+]
+
+
+def _ddl(statement: str, dialect: str) -> DDL:
+    # DDL aplica formateo con %: el módulo (%) de las sentencias hay que escaparlo
+    return DDL(statement.replace("%", "%%")).execute_if(dialect=dialect)
+
+
+# Sobre la metadata y no sobre una tabla: los triggers de products escriben en
+# inventory_summary, así que ambas tienen que existir ya
+for statement in [SEED, *SQLITE_CREATE]:
+    event.listen(Base.metadata, "after_create", _ddl(statement, "sqlite"))
+for statement in [SEED, *POSTGRES_CREATE]:
+    event.listen(Base.metadata, "after_create", _ddl(statement, "postgresql"))
+for statement in SQLITE_DROP:
+    event.listen(Base.metadata, "before_drop", _ddl(statement, "sqlite"))
+for statement in POSTGRES_DROP:
+    event.listen(Base.metadata, "before_drop", _ddl(statement, "postgresql"))
@@ -1,5 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, Column, Integer, String, Float, DateTime, Index, func, literal_column
 from db.base import Base
+from models.product_change import next_change_seq
+
+def _utcnow():
+    return datetime.now(timezone.utc)
 
 class Product(Base):
     __tablename__ = "products"
@@ -9,3 +14,19 @@ class Product(Base):
     price = Column(Float)
     quantity = Column(Integer)
     image_url = Column(String, nullable=True)
+    # Cualquier UPDATE (ORM, bulk o Core) incrementa version y renueva updated_at
+    version = Column(Integer, nullable=False, default=1, server_default="1",
+                     onupdate=literal_column("version") + 1)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow,
+                        server_default=func.current_timestamp(), onupdate=_utcnow)
+    # Orden de los cambios para GET /products/changes (ver models/product_change)
+    change_seq = Column(BigInteger, nullable=False, default=next_change_seq(),
+                        server_default="0", onupdate=next_change_seq())
+
+    # Índices compuestos (columna de orden, id) para la paginación por keyset
+    __table_args__ = (
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_quantity_id", "quantity", "id"),
+        Index("ix_products_change_seq_id", "change_seq", "id"),
+    )
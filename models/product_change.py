@@ -0,0 +1,72 @@
+"""Posición de cambio de products y lápidas de borrado para la sincronización delta.
+
+Cada INSERT/UPDATE de un producto le asigna un change_seq nuevo y cada borrado deja
+una fila en product_tombstones con su propio change_seq, del mismo espacio de valores.
+Un cliente que recuerda el último (change_seq, id) visto pide solo lo posterior.
+
+Un cliente no puede saltarse un cambio que se confirma después de que haya leído
+otro con un change_seq mayor. Ningún escritor se bloquea para garantizarlo:
+
+- SQLite: MAX + 1 sobre ambas tablas; solo hay un escritor a la vez, así que el
+  siguiente commit siempre ve el máximo del anterior.
+- PostgreSQL: change_seq es el xid (64 bits) de la transacción que escribe, sin locks
+  ni secuencias compartidas. Al leer solo se entregan cambios por debajo de
+  change_watermark(), el xid de la transacción más antigua aún en curso: todo lo
+  anterior ya terminó y lo que está en vuelo llega en una lectura posterior.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from db.base import Base
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class next_change_seq(FunctionElement):
+    """Siguiente change_seq; se usa como default/onupdate de Product.change_seq."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(next_change_seq)
+def _next_change_seq_max(element, compiler, **kw):
+    return (
+        "(SELECT coalesce(max(seq), 0) + 1 FROM ("
+        "SELECT max(change_seq) AS seq FROM products "
+        "UNION ALL SELECT max(change_seq) FROM product_tombstones))"
+    )
+
+
+@compiles(next_change_seq, "postgresql")
+def _next_change_seq_pg(element, compiler, **kw):
+    return "CAST(CAST(pg_current_xact_id() AS text) AS bigint)"
+
+
+class change_watermark(FunctionElement):
+    """Cota superior (exclusiva) de los change_seq que ya se pueden entregar; solo PostgreSQL."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(change_watermark, "postgresql")
+def _change_watermark_pg(element, compiler, **kw):
+    return "CAST(CAST(pg_snapshot_xmin(pg_current_snapshot()) AS text) AS bigint)"
+
+
+class ProductTombstone(Base):
+    __tablename__ = "product_tombstones"
+
+    # id del producto borrado (si SQLite reutiliza el id, el INSERT borra la lápida)
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    change_seq = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    __table_args__ = (
+        Index("ix_product_tombstones_change_seq_id", "change_seq", "id"),
+    )
+
@@ -0,0 +1,64 @@
+"""Índices de búsqueda de texto completo sobre products (name + description).
+
+- SQLite: tabla virtual FTS5 de contenido externo (products_fts) sincronizada con
+  triggers; el ranking es bm25 con más peso para el nombre.
+- PostgreSQL: columna generada search_vector (tsvector) con índice GIN.
+
+El DDL se engancha a la creación/borrado de la tabla products (create_all en los
+tests y en el arranque); en bases existentes lo crea la migración de Alembic.
+"""
+from sqlalchemy import DDL, column, event, literal_column, table
+from models.product import Product
+
+FTS_TABLE = "products_fts"
+# Configuración de texto de Postgres: 'simple' no aplica stemming de ningún idioma
+TS_CONFIG = "simple"
+
+products_fts = table(FTS_TABLE, column("rowid"))
+search_vector = literal_column("products.search_vector")
+
+SQLITE_CREATE = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    # Ranking por defecto (columna rank): bm25 con el nombre 10 veces más relevante
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    # Solo cuando cambia el texto: los ajustes de stock/precio no tocan el índice
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS products_fts_au",
+    "DROP TRIGGER IF EXISTS products_fts_ad",
+    "DROP TRIGGER IF EXISTS products_fts_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_CREATE = [
+    f"""ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{TS_CONFIG}', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('{TS_CONFIG}', coalesce(description, '')), 'B')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin (search_vector)",
+]
+
+for statement in SQLITE_CREATE:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_CREATE:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+# La tabla FTS no depende de products para SQLAlchemy: hay que borrarla a mano
+for statement in SQLITE_DROP:
+    event.listen(Product.__table__, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
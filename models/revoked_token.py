@@ -0,0 +1,15 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, Integer, String
+from db.base import Base
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(Integer, nullable=True)
+    # Pasada esta fecha el token ya no es válido de todos modos y la fila se puede purgar
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, index=True)
@@ -0,0 +1,52 @@
+from sqlalchemy import case, delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models.inventory_summary import InventorySummary, REBUILD_INSERT
+from models.product import Product
+
+SUMMARY_FIELDS = ("product_count", "units_on_hand", "stock_value", "out_of_stock_count")
+
+
+def _totals_statement():
+    # SUMMARY_SHARDS filas: coste constante sea cual sea el tamaño del catálogo
+    return select(*(func.coalesce(func.sum(getattr(InventorySummary, field)), 0).label(field)
+                    for field in SUMMARY_FIELDS))
+
+
+def _scan_statement():
+    """Los mismos agregados calculados recorriendo products (para comprobar el resumen)."""
+    quantity = func.coalesce(Product.quantity, 0)
+    return select(
+        func.count(Product.id).label("product_count"),
+        func.coalesce(func.sum(quantity), 0).label("units_on_hand"),
+        func.coalesce(func.sum(func.coalesce(Product.price, 0) * quantity), 0).label("stock_value"),
+        func.coalesce(func.sum(case((quantity <= 0, 1), else_=0)), 0).label("out_of_stock_count"),
+    )
+
+
+class InventorySummaryRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_totals(self) -> dict:
+        return dict(self.db.execute(_totals_statement()).one()._mapping)
+
+    def compute_from_products(self) -> dict:
+        return dict(self.db.execute(_scan_statement()).one()._mapping)
+
+    def rebuild(self):
+        """Recalcula el resumen desde cero en una sola transacción."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Bloquea escrituras en products mientras se recalcula (las lecturas siguen)
+            self.db.execute(text("LOCK TABLE products IN SHARE MODE"))
+        self.db.execute(delete(InventorySummary))
+        self.db.execute(text(REBUILD_INSERT))
+        self.db.commit()
+
+
+class AsyncInventorySummaryRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_totals(self) -> dict:
+        return dict((await self.db.execute(_totals_statement())).one()._mapping)
@@ -1,27 +1,389 @@
+import re
+from datetime import datetime, timezone
 from models.product import Product
+from models.product_change import ProductTombstone, change_watermark, next_change_seq
+from models.product_search import FTS_TABLE, TS_CONFIG, products_fts, search_vector
+from sqlalchemy import and_, delete, func, insert, literal, literal_column, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+EXPORT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.quantity,
+    Product.image_url,
+)
+
+# Columnas de ProductOut: las lecturas las piden como filas Core (tuplas con nombre),
+# sin instancias ORM, identity map ni estado por objeto que luego se tira
+READ_COLUMNS = EXPORT_COLUMNS + (Product.version, Product.updated_at)
+
+# Ids por consulta en get_rows_by_ids: lejos del límite de parámetros de SQLite (999 en
+# versiones antiguas) y de planes con listas IN enormes en Postgres
+LOOKUP_CHUNK_SIZE = 500
+
+SORT_COLUMNS = {
+    "id": Product.id,
+    "name": Product.name,
+    "price": Product.price,
+    "quantity": Product.quantity,
+}
+
+
+def search_terms(query: str) -> list[str]:
+    """Palabras de la consulta; el resto de caracteres se ignora (no se pasa sintaxis FTS del usuario)."""
+    return re.findall(r"\w+", query.lower())
+
+
+def _search_statement(dialect: str, terms: list[str], limit: int, window: int):
+    """Productos que contienen todos los términos, el último como prefijo, por relevancia.
+
+    Puntuar todas las coincidencias de un término muy común cuesta O(coincidencias);
+    con `window` > 0 solo se puntúan las `window` más recientes (mayor id), cuyo límite
+    inferior sale del índice sin calcular ningún ranking.
+    """
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        matches = literal_column(FTS_TABLE).op("MATCH")(match)
+        # rank usa bm25 con los pesos configurados al crear la tabla FTS
+        rank = literal_column(f"{FTS_TABLE}.rank").label("rank")
+        ranked = select(products_fts.c.rowid, rank).where(matches)
+        if window:
+            recent = (select(products_fts.c.rowid).where(matches)
+                      .order_by(products_fts.c.rowid.desc()).limit(window).subquery())
+            ranked = ranked.where(products_fts.c.rowid >= select(func.coalesce(func.min(recent.c.rowid), 0))
+                                  .scalar_subquery())
+        ranked = ranked.order_by(rank).limit(limit).subquery()
+        return (
+            select(Product)
+            .join(ranked, ranked.c.rowid == Product.id)
+            .order_by(ranked.c.rank, Product.id)
+        )
+    if dialect == "postgresql":
+        query = func.to_tsquery(TS_CONFIG, " & ".join(terms[:-1] + [f"{terms[-1]}:*"]))
+        matches = search_vector.op("@@")(query)
+        stmt = select(Product).where(matches)
+        if window:
+            recent = select(Product.id).where(matches).order_by(Product.id.desc()).limit(window).subquery()
+            stmt = stmt.where(Product.id >= select(func.coalesce(func.min(recent.c.id), 0)).scalar_subquery())
+        return stmt.order_by(func.ts_rank_cd(search_vector, query).desc(), Product.id).limit(limit)
+    # Sin índice de texto completo: LIKE sobre nombre y descripción
+    return (
+        select(Product)
+        .where(and_(*[
+            or_(Product.name.icontains(term, autoescape=True), Product.description.icontains(term, autoescape=True))
+            for term in terms
+        ]))
+        .order_by(Product.id.desc())
+        .limit(limit)
+    )
+
+
+def _page_statement(params, after, limit):
+    """Página ordenada por (columna, id) usando keyset en lugar de OFFSET.
+
+    `after` es el par (valor, id) de la última fila de la página anterior.
+    """
+    descending = params.sort.startswith("-")
+    column = SORT_COLUMNS[params.sort.lstrip("-")]
+
+    stmt = select(Product)
+    if params.name_prefix:
+        stmt = stmt.where(Product.name.startswith(params.name_prefix, autoescape=True))
+    if params.min_price is not None:
+        stmt = stmt.where(Product.price >= params.min_price)
+    if params.max_price is not None:
+        stmt = stmt.where(Product.price <= params.max_price)
+    if params.min_quantity is not None:
+        stmt = stmt.where(Product.quantity >= params.min_quantity)
+    if params.max_quantity is not None:
+        stmt = stmt.where(Product.quantity <= params.max_quantity)
+    if params.in_stock is not None:
+        stmt = stmt.where(Product.quantity > 0 if params.in_stock else Product.quantity <= 0)
+
+    if column is Product.id:
+        if after is not None:
+            stmt = stmt.where(Product.id < after[1] if descending else Product.id > after[1])
+        order = [Product.id.desc() if descending else Product.id.asc()]
+    else:
+        if after is not None:
+            key = tuple_(column, Product.id)
+            stmt = stmt.where(key < after if descending else key > after)
+        order = [column.desc(), Product.id.desc()] if descending else [column.asc(), Product.id.asc()]
+
+    return stmt.order_by(*order).limit(limit or params.limit)
+
+
+def _export_statement(batch_size, columns=EXPORT_COLUMNS):
+    # Filas Core (no instancias ORM) leídas con un cursor del lado del servidor
+    return (
+        select(*columns)
+        .order_by(Product.id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+
+
+def _read_columns(names=None, sort: str | None = None):
+    """READ_COLUMNS o solo las columnas `names` (más la de orden, que necesita el cursor)."""
+    if names is None:
+        return READ_COLUMNS
+    columns = [getattr(Product, name) for name in names]
+    if sort is not None and SORT_COLUMNS[sort.lstrip("-")] not in columns:
+        columns.append(SORT_COLUMNS[sort.lstrip("-")])
+    return tuple(columns)
+
+
+def _read_statement(stmt, columns=READ_COLUMNS):
+    """La misma consulta proyectada a `columns` (filtros, joins y orden se conservan)."""
+    return stmt.with_only_columns(*columns, maintain_column_froms=True)
+
+
+def _row_statement(product_id, columns=READ_COLUMNS):
+    return select(*columns).where(Product.id == product_id)
+
+
+def _id_chunks(product_ids, chunk_size):
+    ids = list(dict.fromkeys(product_ids))
+    return [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+
+def _rows_by_ids_statement(product_ids):
+    return select(*READ_COLUMNS).where(Product.id.in_(product_ids))
+
+
+def _bulk_insert_statement():
+    return insert(Product).returning(Product.id, sort_by_parameter_order=True)
+
+
+def _existing_ids_statement(product_ids):
+    return select(Product.id).where(Product.id.in_(set(product_ids)))
+
+
+def _conditional_update_statement(product_id, values, expected_versions=None):
+    """UPDATE ... WHERE id = :id [AND version IN (:v)] RETURNING; sin bloqueos de fila."""
+    stmt = update(Product).where(Product.id == product_id)
+    if expected_versions is not None:
+        stmt = stmt.where(Product.version.in_(expected_versions))
+    return stmt.values(**values).returning(Product)
+
+
+def _adjust_quantity_statement(product_id, delta):
+    # La comprobación de stock va en el propio UPDATE: atómico y sin leer antes
+    new_quantity = Product.quantity + delta
+    return (
+        update(Product)
+        .where(Product.id == product_id, new_quantity >= 0)
+        .values(quantity=new_quantity)
+        .returning(Product.id, Product.quantity, Product.version)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _image_urls_statement():
+    return select(Product.image_url).where(Product.image_url.is_not(None)).distinct()
+
+
+def _bulk_delete_statement(product_ids):
+    return delete(Product).where(Product.id.in_(set(product_ids)))
+
+
+def _tombstone_statements(product_ids):
+    """Lápidas de los productos que se van a borrar; hay que ejecutarlas antes del DELETE."""
+    ids = set(product_ids)
+    deleted_at = literal(datetime.now(timezone.utc), ProductTombstone.deleted_at.type)
+    return [
+        delete(ProductTombstone).where(ProductTombstone.id.in_(ids)),
+        insert(ProductTombstone).from_select(
+            ["id", "change_seq", "deleted_at"],
+            select(Product.id, next_change_seq(), deleted_at).where(Product.id.in_(ids)),
+        ),
+    ]
+
+
+def _clear_tombstones_statement(product_ids):
+    """Tras un INSERT: SQLite puede reutilizar el id de un producto borrado y su lápida
+    haría que /products/changes lo diera a la vez por vivo y por borrado."""
+    return delete(ProductTombstone).where(ProductTombstone.id.in_(set(product_ids)))
+
+
+def _changes_statements(after, limit, watermark=None):
+    """Productos y lápidas posteriores a `after` = (change_seq, id), por keyset.
+
+    Con `watermark` (PostgreSQL) se excluye lo que aún podría tener transacciones en curso.
+    """
+    products = select(*READ_COLUMNS, Product.change_seq).order_by(Product.change_seq, Product.id).limit(limit)
+    tombstones = (select(ProductTombstone.change_seq, ProductTombstone.id)
+                  .order_by(ProductTombstone.change_seq, ProductTombstone.id).limit(limit))
+    if after is not None:
+        products = products.where(tuple_(Product.change_seq, Product.id) > after)
+        tombstones = tombstones.where(tuple_(ProductTombstone.change_seq, ProductTombstone.id) > after)
+    if watermark is not None:
+        products = products.where(Product.change_seq < watermark)
+        tombstones = tombstones.where(ProductTombstone.change_seq < watermark)
+    return products, tombstones
+
+
 class ProductRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def create(self, product: Product):
         self.db.add(product)
+        self.db.flush()
+        self.db.execute(_clear_tombstones_statement([product.id]))
         self.db.commit()
         self.db.refresh(product)
         return product
 
+    def bulk_create(self, rows: list[dict]) -> list[int]:
+        """INSERT multi-fila en una sola transacción; devuelve los ids en el orden de `rows`."""
+        ids = self.db.scalars(_bulk_insert_statement(), rows).all()
+        self.db.execute(_clear_tombstones_statement(ids))
+        self.db.commit()
+        return ids
+
+    def bulk_update(self, rows: list[dict]):
+        """UPDATE por clave primaria (executemany); cada fila lleva su `id`."""
+        self.db.execute(update(Product), rows)
+        self.db.commit()
+
     def get_all(self):
         return self.db.query(Product).all()
 
+    def search(self, terms: list[str], limit: int, window: int = 0):
+        dialect = self.db.get_bind().dialect.name
+        return self.db.scalars(_search_statement(dialect, terms, limit, window)).all()
+
+    # Lecturas de solo lectura: filas Core con READ_COLUMNS en lugar de objetos Product
+
+    def get_rows(self):
+        return self.db.execute(select(*READ_COLUMNS)).all()
+
+    def get_row(self, product_id: int, fields=None):
+        """Fila del producto con todas las columnas de lectura o solo `fields`."""
+        return self.db.execute(_row_statement(product_id, _read_columns(fields))).first()
+
+    def get_page_rows(self, params, after=None, limit: int = None, fields=None):
+        columns = _read_columns(fields, params.sort)
+        return self.db.execute(_read_statement(_page_statement(params, after, limit), columns)).all()
+
+    def get_rows_by_ids(self, product_ids, chunk_size: int = LOOKUP_CHUNK_SIZE):
+        """Filas de los ids existentes, sin orden: un WHERE id IN (...) por cada `chunk_size` ids."""
+        rows = []
+        for chunk in _id_chunks(product_ids, chunk_size):
+            rows.extend(self.db.execute(_rows_by_ids_statement(chunk)))
+        return rows
+
     def get_by_id(self, product_id: int):
         return self.db.query(Product).filter(Product.id == product_id).first()
 
+    def get_image_urls(self) -> set[str]:
+        """image_url distintas en uso, para el recolector de imágenes."""
+        return set(self.db.scalars(_image_urls_statement()))
+
+    def adjust_quantity(self, product_id: int, delta: int):
+        """Suma `delta` al stock; devuelve (id, quantity, version) o None si no se aplicó."""
+        row = self.db.execute(_adjust_quantity_statement(product_id, delta)).first()
+        self.db.commit()
+        return row
+
     def update(self, product: Product):
         self.db.commit()
         self.db.refresh(product)
         return product
 
-    def delete(self, product: Product):
-        self.db.delete(product)
-        self.db.commit()
+
+class AsyncProductRepository:
+    """Repositorio de las rutas, sobre AsyncSession (aiosqlite / asyncpg).
+
+    ProductRepository (síncrono) queda para scripts y benchmarks.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, product: Product):
+        self.db.add(product)
+        await self.db.flush()
+        await self.db.execute(_clear_tombstones_statement([product.id]))
+        await self.db.commit()
+        await self.db.refresh(product)
+        return product
+
+    async def bulk_create(self, rows: list[dict]) -> list[int]:
+        ids = (await self.db.scalars(_bulk_insert_statement(), rows)).all()
+        await self.db.execute(_clear_tombstones_statement(ids))
+        await self.db.commit()
+        return ids
+
+    async def get_existing_ids(self, product_ids) -> set[int]:
+        return set(await self.db.scalars(_existing_ids_statement(product_ids)))
+
+    async def bulk_update(self, rows: list[dict]):
+        await self.db.execute(update(Product), rows)
+        await self.db.commit()
+
+    async def bulk_delete(self, product_ids):
+        for stmt in _tombstone_statements(product_ids):
+            await self.db.execute(stmt)
+        await self.db.execute(_bulk_delete_statement(product_ids))
+        await self.db.commit()
+
+    async def get_row(self, product_id: int, fields=None):
+        return (await self.db.execute(_row_statement(product_id, _read_columns(fields)))).first()
+
+    async def get_page_rows(self, params, after=None, limit: int = None, fields=None):
+        columns = _read_columns(fields, params.sort)
+        return (await self.db.execute(_read_statement(_page_statement(params, after, limit), columns))).all()
+
+    async def get_rows_by_ids(self, product_ids, chunk_size: int = LOOKUP_CHUNK_SIZE):
+        rows = []
+        for chunk in _id_chunks(product_ids, chunk_size):
+            rows.extend(await self.db.execute(_rows_by_ids_statement(chunk)))
+        return rows
+
+    async def search_rows(self, terms: list[str], limit: int, window: int = 0):
+        dialect = self.db.get_bind().dialect.name
+        return (await self.db.execute(_read_statement(_search_statement(dialect, terms, limit, window)))).all()
+
+    async def iter_export_rows(self, batch_size: int = 1000):
+        result = await self.db.stream(_export_statement(batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+    async def iter_name_rows(self, batch_size: int = 10_000):
+        result = await self.db.stream(_export_statement(batch_size, (Product.id, Product.name)))
+        async for partition in result.partitions():
+            yield partition
+
+    async def get_by_id(self, product_id: int):
+        return await self.db.get(Product, product_id)
+
+    async def adjust_quantity(self, product_id: int, delta: int):
+        row = (await self.db.execute(_adjust_quantity_statement(product_id, delta))).first()
+        await self.db.commit()
+        return row
+
+    async def update_fields(self, product_id: int, values: dict, expected_versions=None):
+        product = await self.db.scalar(_conditional_update_statement(product_id, values, expected_versions))
+        await self.db.commit()
+        return product
+
+    async def delete(self, product: Product):
+        for stmt in _tombstone_statements([product.id]):
+            await self.db.execute(stmt)
+        await self.db.delete(product)
+        await self.db.commit()
+
+    async def get_changes(self, after=None, limit: int = 500, include_deleted: bool = True):
+        """(productos, [(change_seq, id) borrados]) posteriores a `after`, hasta `limit` de cada."""
+        watermark = None
+        if self.db.get_bind().dialect.name == "postgresql":
+            # La cota se toma antes que las filas: todo lo que queda por debajo ya terminó
+            # y las consultas siguientes, con una instantánea posterior, lo ven entero
+            watermark = await self.db.scalar(select(change_watermark()))
+        products, tombstones = _changes_statements(after, limit, watermark)
+        deleted = (await self.db.execute(tombstones)).all() if include_deleted else []
+        return (await self.db.execute(products)).all(), deleted
@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.revoked_token import RevokedToken
+
+class AsyncRevokedTokenRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, jti: str, user_id: int | None, expires_at: datetime):
+        """Inserta el jti si no estaba ya revocado."""
+        if await self.db.get(RevokedToken, jti) is None:
+            self.db.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+            await self.db.commit()
+
+    async def get_expires_at(self, jti: str) -> datetime | None:
+        return await self.db.scalar(select(RevokedToken.expires_at).where(RevokedToken.jti == jti))
+
+    async def get_active(self, now: datetime):
+        """(jti, expires_at) de los tokens revocados que aún no han caducado."""
+        result = await self.db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+        )
+        return result.all()
+
+    async def get_revoked_since(self, since: datetime):
+        result = await self.db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.revoked_at >= since)
+        )
+        return result.all()
+
+    async def purge_expired(self, now: datetime) -> int:
+        result = await self.db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        await self.db.commit()
+        return result.rowcount
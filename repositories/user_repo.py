@@ -1,21 +1,27 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.user import User
 
-class UserRepository:
-    def __init__(self, db: Session):
+class AsyncUserRepository:
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create(self, user: User):
+    async def create(self, user: User):
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
 
-    def get_by_username(self, username: str):
-        return self.db.query(User).filter(User.username == username).first()
+    async def update_password(self, user: User, hashed_password: str):
+        user.hashed_password = hashed_password
+        await self.db.commit()
+        return user
+
+    async def get_by_username(self, username: str):
+        return await self.db.scalar(select(User).where(User.username == username))
 
-    def get_by_email(self, email: str):
-        return self.db.query(User).filter(User.email == email).first()
+    async def get_by_email(self, email: str):
+        return await self.db.scalar(select(User).where(User.email == email))
 
-    def get_by_id(self, user_id: int):
-        return self.db.query(User).filter(User.id == user_id).first()
+    async def get_by_id(self, user_id: int):
+        return await self.db.get(User, user_id)
@@ -1,5 +1,20 @@
-from pydantic import BaseModel, Field, model_validator
-from typing import Optional
+from datetime import datetime
+from functools import lru_cache
+from pydantic import BaseModel, Field, TypeAdapter, computed_field, field_validator, model_validator
+from typing import Any, Literal, NamedTuple, Optional
+from services.image_variants import image_variants
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 1000
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+DEFAULT_AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 50
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 5000
+
+ProductSort = Literal["id", "-id", "name", "-name", "price", "-price", "quantity", "-quantity"]
 
 class ProductBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -42,8 +57,171 @@ class ProductUpdate(BaseModel):
             raise ValueError('Quantity must be 0 or greater')
         return values
 
-class ProductOut(ProductBase):
+class ProductBatchUpdate(ProductUpdate):
+    id: int
+
+class ProductBatchDelete(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class ProductLookup(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class ProductBatchItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status: Literal["created", "updated", "deleted", "not_found", "invalid"]
+    detail: Optional[Any] = None
+
+class ProductBatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[ProductBatchItemResult]
+
+class ProductSuggestion(BaseModel):
+    id: int
+    name: str
+
+class ProductStats(BaseModel):
+    product_count: int
+    units_on_hand: int
+    stock_value: float
+    out_of_stock_count: int
+
+class StockAdjustment(BaseModel):
+    delta: int = Field(..., description="Signed change in units; negative values remove stock")
+
+    @model_validator(mode='after')
+    def validate_non_zero_delta(cls, values):
+        if values.delta == 0:
+            raise ValueError('Delta must not be 0')
+        return values
+
+class StockLevel(BaseModel):
     id: int
+    quantity: int
+    version: int
+
+class ProductOut(BaseModel):
+    """Salida de un producto.
+
+    No hereda de ProductBase: se construye desde filas que ya se validaron al
+    escribirlas, así que no repite sus restricciones ni sus model_validator.
+    """
+    name: str
+    description: str
+    price: float
+    quantity: int
+    image_url: Optional[str] = None
+    id: int
+    version: int = 1
+    updated_at: Optional[datetime] = None
+
+    @computed_field
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        return image_variants.url_for(self.image_url, "thumb")
+
+    @computed_field
+    @property
+    def medium_url(self) -> Optional[str]:
+        return image_variants.url_for(self.image_url, "medium")
 
     class Config:
         from_attributes = True
+
+# Serializadores precompilados para ModelResponse (api/responses.py)
+product_adapter = TypeAdapter(ProductOut)
+product_list_adapter = TypeAdapter(list[ProductOut])
+
+# Campos que admite ?fields=, en el orden de ProductOut
+PRODUCT_COLUMN_FIELDS = tuple(ProductOut.model_fields)
+PRODUCT_FIELDS = PRODUCT_COLUMN_FIELDS + tuple(ProductOut.model_computed_fields)
+# Se leen siempre aunque no se pidan: identifican la fila y dan el ETag / Last-Modified
+ALWAYS_LOADED_FIELDS = ("id", "version", "updated_at")
+
+
+def parse_fields(value: str) -> tuple[str, ...]:
+    """Lista separada por comas -> campos de ProductOut en su orden canónico."""
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    if not requested:
+        raise ValueError("fields must name at least one field")
+    unknown = requested.difference(PRODUCT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in PRODUCT_FIELDS if name in requested)
+
+
+class ProductFieldSet(NamedTuple):
+    fields: tuple[str, ...]
+    columns: tuple[str, ...]  # columnas de products que hay que leer
+    model: type[BaseModel]
+    adapter: TypeAdapter
+    list_adapter: TypeAdapter
+
+
+@lru_cache(maxsize=256)
+def product_field_set(fields: tuple[str, ...]) -> ProductFieldSet:
+    """Modelo de salida con solo `fields`, creado una vez por combinación de campos.
+
+    Las columnas leídas y no pedidas (ALWAYS_LOADED_FIELDS, o image_url para las URLs
+    de miniaturas) forman parte del modelo pero se excluyen al serializar.
+    """
+    needed = set(fields).union(ALWAYS_LOADED_FIELDS)
+    if needed.intersection(ProductOut.model_computed_fields):
+        needed.add("image_url")
+    columns = tuple(name for name in PRODUCT_COLUMN_FIELDS if name in needed)
+
+    namespace = {"__annotations__": {}, "__module__": __name__}
+    for name in columns:
+        info = ProductOut.model_fields[name]
+        namespace["__annotations__"][name] = info.annotation
+        namespace[name] = Field(... if info.is_required() else info.default, exclude=name not in fields)
+    for name, computed in ProductOut.model_computed_fields.items():
+        if name in fields:
+            namespace[name] = computed_field(computed.wrapped_property)
+    model = type(f"ProductOut_{'_'.join(fields)}", (BaseModel,), namespace)
+    return ProductFieldSet(fields, columns, model, TypeAdapter(model), TypeAdapter(list[model]))
+
+
+class ProductChanges(BaseModel):
+    """Cambios desde el token recibido: productos nuevos o modificados y ids borrados."""
+    items: list[ProductOut]
+    deleted: list[int]
+    next_token: str
+    has_more: bool
+
+product_changes_adapter = TypeAdapter(ProductChanges)
+
+class ProductLookupResult(BaseModel):
+    """Productos en el orden de los ids pedidos (sin repetir) y los ids que no existen."""
+    items: list[ProductOut]
+    missing: list[int]
+
+product_lookup_adapter = TypeAdapter(ProductLookupResult)
+
+class ProductListParams(BaseModel):
+    """Parámetros de query de GET /products/ (paginación, orden y filtros)."""
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = Field(None, max_length=512)
+    sort: ProductSort = "id"
+    name_prefix: Optional[str] = Field(None, min_length=1, max_length=100)
+    min_price: Optional[float] = Field(None, ge=0)
+    max_price: Optional[float] = Field(None, ge=0)
+    min_quantity: Optional[int] = Field(None, ge=0)
+    max_quantity: Optional[int] = Field(None, ge=0)
+    in_stock: Optional[bool] = None
+    fields: Optional[str] = Field(None, max_length=200, description="Comma-separated ProductOut fields to return")
+
+    @field_validator('fields')
+    @classmethod
+    def validate_fields(cls, value):
+        # Forma canónica: el mismo conjunto de campos comparte entrada en la caché de páginas
+        return ",".join(parse_fields(value)) if value is not None else None
+
+    @model_validator(mode='after')
+    def validate_ranges(cls, values):
+        if values.min_price is not None and values.max_price is not None and values.min_price > values.max_price:
+            raise ValueError('min_price must be less than or equal to max_price')
+        if values.min_quantity is not None and values.max_quantity is not None and values.min_quantity > values.max_quantity:
+            raise ValueError('min_quantity must be less than or equal to max_quantity')
+        return values
@@ -22,6 +22,13 @@ class UserRead(BaseModel):
     class Config:
         from_attributes = True  # Pydantic V2
 
+class CurrentUser(BaseModel):
+    id: int | None
+    username: str
+
+class TokenRevoke(BaseModel):
+    token: str
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -0,0 +1,45 @@
+"""Borra las imágenes del almacén que ningún producto referencia, y sus variantes.
+
+Las rutas no borran la imagen anterior al reemplazarla (otro producto puede estar
+guardando ese mismo fichero deduplicado), así que los huérfanos se recogen aquí.
+Solo se borran ficheros que nadie ha subido en el margen de gracia.
+
+Uso:
+    python -m scripts.image_gc [--dry-run] [--grace-seconds N]
+"""
+import argparse
+
+from core.config import settings
+from db.session import SessionLocal
+from repositories.product_repo import ProductRepository
+from services.image_storage import ImageStorage, image_storage
+from services.image_variants import ImageVariants, image_variants
+
+
+def collect(repo: ProductRepository, grace_seconds: float, dry_run: bool = False,
+            storage: ImageStorage = image_storage, variants: ImageVariants = image_variants) -> list[str]:
+    # Las referencias se leen antes de recorrer el disco (ver ImageStorage.collect_garbage)
+    referenced = repo.get_image_urls()
+    removed = storage.collect_garbage(referenced, grace_seconds, dry_run)
+    if not dry_run:
+        for digest in removed:
+            variants.remove(digest)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Solo muestra lo que se borraría")
+    parser.add_argument("--grace-seconds", type=float, default=settings.IMAGE_GC_GRACE_SECONDS,
+                        help="No borra ficheros subidos hace menos de esto")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        removed = collect(ProductRepository(db), args.grace_seconds, args.dry_run)
+    for digest in removed:
+        print(f"{'would remove' if args.dry_run else 'removed'} {digest}")
+    print(f"{len(removed)} unreferenced images {'to remove' if args.dry_run else 'removed'}")
+
+
+if __name__ == "__main__":
+    main()
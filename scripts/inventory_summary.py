@@ -0,0 +1,39 @@
+"""Comprueba el resumen de inventario (inventory_summary) contra products y lo reconstruye.
+
+Sin opciones compara los totales guardados con un recorrido completo de products y
+termina con código 1 si no cuadran; con --rebuild recalcula el resumen desde cero.
+
+Uso:
+    python -m scripts.inventory_summary [--rebuild]
+"""
+import argparse
+import sys
+
+from db.session import SessionLocal
+from repositories.inventory_summary_repo import InventorySummaryRepository
+from services.inventory_service import InventoryService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="Recalcula el resumen desde products")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        service = InventoryService(InventorySummaryRepository(db))
+        differences = service.check()
+        for field, values in differences.items():
+            print(f"{field}: stored={values['stored']} computed={values['computed']}")
+
+        if args.rebuild:
+            service.rebuild()
+            print(f"Summary rebuilt: {service.get_stats().model_dump()}")
+        elif differences:
+            print("Inventory summary is out of sync; run with --rebuild to fix it")
+            sys.exit(1)
+        else:
+            print(f"Inventory summary is consistent: {service.get_stats().model_dump()}")
+
+
+if __name__ == "__main__":
+    main()
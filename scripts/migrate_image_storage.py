@@ -0,0 +1,73 @@
+"""Mueve las imágenes del directorio plano static/images al almacén direccionado por contenido.
+
+Para cada producto cuya image_url apunte a static/images/<nombre>, calcula el SHA-256
+del fichero, lo copia a static/images/ab/cd/<sha256><ext> (salvo que ese contenido ya
+estuviera almacenado) y actualiza image_url. Los originales se borran solo después de
+confirmar las filas que apuntaban a ellos: si el script se interrumpe, ningún producto
+queda apuntando a un fichero que ya no existe.
+
+Uso:
+    python -m scripts.migrate_image_storage [--dry-run]
+"""
+import argparse
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from db.session import SessionLocal
+from models.product import Product
+from repositories.product_repo import ProductRepository
+from services.image_storage import image_storage
+
+BATCH = 500
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Solo muestra lo que se haría")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        repo = ProductRepository(db)
+        # Agrupamos por URL: varios productos pueden compartir el mismo fichero
+        products_by_url = defaultdict(list)
+        rows = db.execute(select(Product.id, Product.image_url).where(Product.image_url.is_not(None)))
+        for product_id, image_url in rows:
+            if image_storage.digest_from_url(image_url) is None:
+                products_by_url[image_url].append(product_id)
+
+        moved = missing = 0
+        updates, sources = [], []
+
+        def flush():
+            repo.bulk_update(updates)
+            for path in sources:
+                path.unlink(missing_ok=True)
+            updates.clear()
+            sources.clear()
+
+        for image_url, product_ids in products_by_url.items():
+            source = image_storage.path_from_url(image_url)
+            if source is None or not source.is_file():
+                print(f"missing  {image_url} (products {product_ids})")
+                missing += 1
+                continue
+            if args.dry_run:
+                print(f"would move {image_url}")
+                moved += 1
+                continue
+            new_url = image_storage.import_file(source)
+            print(f"moved    {image_url} -> {new_url}")
+            updates.extend({"id": product_id, "image_url": new_url} for product_id in product_ids)
+            sources.append(source)
+            moved += 1
+            if len(updates) >= BATCH:
+                flush()
+        if updates:
+            flush()
+
+    print(f"{moved} files {'to move' if args.dry_run else 'moved'}, {missing} missing")
+
+
+if __name__ == "__main__":
+    main()
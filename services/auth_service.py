@@ -1,33 +1,44 @@
-from passlib.context import CryptContext
 from core.security import create_access_token
 from models.user import User
-from repositories.user_repo import UserRepository
+from repositories.user_repo import AsyncUserRepository
 from schemas.user import UserCreate
+from services.password_hasher import PasswordHasher, password_hasher
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+class AsyncAuthService:
+    """Registro y login sobre AsyncUserRepository.
 
-class AuthService:
-    def __init__(self, repo: UserRepository):
+    bcrypt es CPU puro, así que se ejecuta en el pool de `PasswordHasher`.
+    """
+
+    def __init__(self, repo: AsyncUserRepository, hasher: PasswordHasher = password_hasher):
         self.repo = repo
+        self.hasher = hasher
 
-    def hash_password(self, password: str) -> str:
-        return pwd_context.hash(password)
+    async def hash_password(self, password: str) -> str:
+        return await self.hasher.hash(password)
 
-    def verify_password(self, plain: str, hashed: str) -> bool:
-        return pwd_context.verify(plain, hashed)
+    async def verify_password(self, plain: str, hashed: str) -> bool:
+        valid, _ = await self.hasher.verify_and_update(plain, hashed)
+        return valid
 
-    def register_user(self, user_data: UserCreate) -> User:
-        hashed = self.hash_password(user_data.password)
-        user = User(username=user_data.username, 
-                    email=user_data.email, 
+    async def register_user(self, user_data: UserCreate) -> User:
+        hashed = await self.hash_password(user_data.password)
+        user = User(username=user_data.username,
+                    email=user_data.email,
                     hashed_password=hashed)
-        return self.repo.create(user)
+        return await self.repo.create(user)
 
-    def authenticate_user(self, email: str, password: str) -> User | None:
-        user = self.repo.get_by_email(email)
-        if user and self.verify_password(password, user.hashed_password):
-            return user
-        return None
+    async def authenticate_user(self, email: str, password: str) -> User | None:
+        user = await self.repo.get_by_email(email)
+        if user is None:
+            return None
+        valid, new_hash = await self.hasher.verify_and_update(password, user.hashed_password)
+        if not valid:
+            return None
+        if new_hash:
+            # Hash con un coste antiguo: se reemplaza aprovechando que tenemos la contraseña
+            await self.repo.update_password(user, new_hash)
+        return user
 
     def create_token(self, user: User) -> str:
-        return create_access_token({"sub": user.username})
+        return create_access_token({"sub": user.username, "uid": user.id})
@@ -0,0 +1,207 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+from core.config import settings
+
+CHUNK_SIZE = 256 * 1024
+
+# Tipos aceptados y la extensión con la que se guardan (no se usa el nombre del cliente)
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+
+# Firmas de cada tipo al inicio del fichero: la extensión sale del contenido, no de la
+# cabecera Content-Type que declara el cliente
+def _sniff_type(head: bytes) -> str | None:
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.[a-z0-9]+$")
+
+
+class ImageStorageError(ValueError):
+    status_code = 400
+
+
+class ImageTooLargeError(ImageStorageError):
+    status_code = 413
+
+
+class UnsupportedImageTypeError(ImageStorageError):
+    status_code = 415
+
+
+class ImageStorage:
+    """Almacén de imágenes direccionado por contenido.
+
+    Cada fichero se guarda una sola vez en `<root>/ab/cd/<sha256><ext>`, de modo que
+    subidas idénticas se deduplican y ningún directorio acumula millones de entradas.
+    """
+
+    def __init__(self, root: Path, url_prefix: str, max_bytes: int):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.max_bytes = max_bytes
+
+    def path_for(self, digest: str, extension: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / f"{digest}{extension}"
+
+    def url_for(self, path: Path) -> str:
+        return f"{self.url_prefix}/{path.relative_to(self.root).as_posix()}"
+
+    def path_from_url(self, url: str) -> Path | None:
+        """Ruta en disco de una URL de este almacén, o None si no le pertenece."""
+        if not url or not url.startswith(self.url_prefix + "/"):
+            return None
+        relative = url[len(self.url_prefix) + 1:]
+        path = (self.root / relative).resolve()
+        if self.root.resolve() not in path.parents:
+            return None
+        return path
+
+    def digest_from_url(self, url: str) -> str | None:
+        if not url or not url.startswith(self.url_prefix + "/"):
+            return None
+        match = CONTENT_ADDRESSED_NAME.match(url[len(self.url_prefix) + 1:])
+        return match.group(1) if match else None
+
+    def find_by_digest(self, digest: str) -> Path | None:
+        """Original almacenado con ese hash (la extensión depende del tipo subido)."""
+        return next(self.path_for(digest, "").parent.glob(f"{digest}.*"), None)
+
+    def extension_for(self, content_type: str | None) -> str:
+        media_type = (content_type or "").split(";")[0].strip().lower()
+        try:
+            return CONTENT_TYPE_EXTENSIONS[media_type]
+        except KeyError:
+            raise UnsupportedImageTypeError(
+                f"Unsupported image type {media_type or 'unknown'!r}; "
+                f"allowed: {', '.join(CONTENT_TYPE_EXTENSIONS)}"
+            )
+
+    def extension_from_content(self, head: bytes) -> str:
+        media_type = _sniff_type(head)
+        if media_type is None:
+            raise UnsupportedImageTypeError("File content is not a supported image")
+        return CONTENT_TYPE_EXTENSIONS[media_type]
+
+    async def save(self, upload: UploadFile) -> str:
+        """Copia la subida por trozos calculando el SHA-256 y devuelve su URL."""
+        self.extension_for(upload.content_type)
+        extension = None
+        tmp_dir = self.root / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        buffer = os.fdopen(fd, "wb")
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise ImageTooLargeError(f"Image exceeds the {self.max_bytes} bytes limit")
+                if extension is None:
+                    extension = self.extension_from_content(chunk)
+                hasher.update(chunk)
+                await run_in_threadpool(buffer.write, chunk)
+            await run_in_threadpool(buffer.close)
+            if size == 0:
+                raise ImageStorageError("Empty image file")
+            final_path = self.path_for(hasher.hexdigest(), extension)
+            await run_in_threadpool(self._commit, Path(tmp_path), final_path)
+        except BaseException:
+            buffer.close()
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        return self.url_for(final_path)
+
+    def import_file(self, source: Path) -> str:
+        """Copia un fichero existente al esquema direccionado por contenido (versión síncrona).
+
+        El original no se toca: quien llama lo borra cuando ya nada apunta a él.
+        """
+        tmp_dir = self.root / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        hasher = hashlib.sha256()
+        try:
+            with source.open("rb") as f, os.fdopen(fd, "wb") as buffer:
+                while chunk := f.read(CHUNK_SIZE):
+                    hasher.update(chunk)
+                    buffer.write(chunk)
+            extension = source.suffix.lower() or ".jpg"
+            final_path = self.path_for(hasher.hexdigest(), extension)
+            self._commit(Path(tmp_path), final_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        return self.url_for(final_path)
+
+    def collect_garbage(self, referenced_urls, grace_seconds: float, dry_run: bool = False) -> list[str]:
+        """Borra los originales que no están en `referenced_urls`; devuelve sus digests.
+
+        Las imágenes no se borran al reemplazarlas: un fichero deduplicado puede estar a
+        punto de quedar referenciado por un producto que aún no se ha guardado. Solo se
+        borran ficheros que nadie ha subido en `grace_seconds` (_commit renueva la fecha
+        al deduplicar), y `referenced_urls` tiene que leerse antes de llamar aquí.
+        """
+        referenced = {self.digest_from_url(url) for url in referenced_urls} - {None}
+        cutoff = time.time() - grace_seconds
+        tmp_dir = self.root / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        removed = []
+        for path in self.root.glob("[0-9a-f][0-9a-f]/[0-9a-f][0-9a-f]/*"):
+            match = CONTENT_ADDRESSED_NAME.match(path.relative_to(self.root).as_posix())
+            if match is None or match.group(1) in referenced or path.stat().st_mtime > cutoff:
+                continue
+            if not dry_run:
+                # Se aparta antes de borrar: si una subida lo deduplicó entretanto (fecha
+                # renovada) vuelve a su sitio; si llegó después ya ha escrito su copia
+                trash = tmp_dir / f"gc-{path.name}"
+                try:
+                    os.replace(path, trash)
+                except FileNotFoundError:
+                    continue
+                if trash.stat().st_mtime > cutoff:
+                    os.replace(trash, path)
+                    continue
+                trash.unlink()
+            removed.append(match.group(1))
+        # Temporales de subidas interrumpidas
+        if not dry_run:
+            for path in tmp_dir.glob("*"):
+                if path.stat().st_mtime <= cutoff:
+                    path.unlink(missing_ok=True)
+        return removed
+
+    @staticmethod
+    def _commit(source: Path, final_path: Path):
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # Mismo contenido ya almacenado: deduplicamos y renovamos la fecha para
+            # que collect_garbage no lo borre antes de que se guarde el producto
+            os.utime(final_path)
+        except FileNotFoundError:
+            os.replace(source, final_path)
+        else:
+            source.unlink()
+
+image_storage = ImageStorage(Path("static/images"), "/static/images", settings.MAX_IMAGE_BYTES)
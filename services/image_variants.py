@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from PIL import Image, ImageOps, UnidentifiedImageError
+from core.config import settings
+from services.image_storage import ImageStorage, image_storage
+
+logger = logging.getLogger(__name__)
+
+# Lado máximo en píxeles de cada variante
+VARIANTS = {
+    "thumb": 128,
+    "medium": 512,
+}
+
+VARIANT_FORMATS = {
+    "webp": ("WEBP", ".webp", "image/webp"),
+    "jpeg": ("JPEG", ".jpg", "image/jpeg"),
+}
+
+
+class ImageVariantError(ValueError):
+    """No se puede generar la variante (original inexistente o no es una imagen)."""
+
+
+class ImageVariants:
+    """Miniaturas derivadas de las imágenes del almacén, cacheadas en disco.
+
+    Las variantes se generan en un pool de workers justo después de subir la imagen
+    y, si faltan, la primera petición las genera bajo demanda.
+    """
+
+    def __init__(self, storage: ImageStorage, root: Path, url_prefix: str, fmt: str, workers: int):
+        self.storage = storage
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+        self.pil_format, self.extension, self.media_type = VARIANT_FORMATS[fmt]
+        self.workers = workers
+        self._executor = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Pillow libera el GIL al redimensionar y codificar, así que bastan hilos
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image-variants")
+        return self._executor
+
+    def path_for(self, digest: str, variant: str) -> Path:
+        return self.root / variant / digest[:2] / digest[2:4] / f"{digest}{self.extension}"
+
+    def url_for(self, image_url: str | None, variant: str) -> str | None:
+        digest = self.storage.digest_from_url(image_url)
+        if digest is None:
+            return None
+        return f"{self.url_prefix}/{variant}/{digest}{self.extension}"
+
+    def generate(self, digest: str, variant: str) -> Path:
+        """Genera (si no existe) la variante en disco. Bloqueante: usar desde el pool."""
+        target = self.path_for(digest, variant)
+        if target.exists():
+            return target
+        source = self.storage.find_by_digest(digest)
+        if source is None:
+            raise ImageVariantError("Original image not found")
+
+        size = VARIANTS[variant]
+        try:
+            with Image.open(source) as image:
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((size, size), Image.Resampling.LANCZOS)
+                if self.pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=self.extension)
+                try:
+                    with os.fdopen(fd, "wb") as buffer:
+                        image.save(buffer, self.pil_format, quality=80)
+                    os.replace(tmp_path, target)
+                except BaseException:
+                    Path(tmp_path).unlink(missing_ok=True)
+                    raise
+        except (UnidentifiedImageError, OSError) as e:
+            raise ImageVariantError(f"Cannot build {variant} variant: {e}") from e
+        return target
+
+    def remove(self, digest: str):
+        """Borra las variantes de un original que ya no existe."""
+        for variant in VARIANTS:
+            self.path_for(digest, variant).unlink(missing_ok=True)
+
+    def schedule(self, image_url: str | None):
+        """Encola todas las variantes de una imagen recién guardada sin esperar el resultado."""
+        digest = self.storage.digest_from_url(image_url)
+        if digest is None:
+            return
+        for variant in VARIANTS:
+            future = self.executor.submit(self.generate, digest, variant)
+            future.add_done_callback(self._log_failure)
+
+    async def ensure(self, digest: str, variant: str) -> Path:
+        target = self.path_for(digest, variant)
+        if target.exists():
+            return target
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.generate, digest, variant)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @staticmethod
+    def _log_failure(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning("Image variant generation failed: %s", future.exception())
+
+
+image_variants = ImageVariants(
+    image_storage,
+    Path("static/variants"),
+    "/images",
+    settings.IMAGE_VARIANT_FORMAT,
+    settings.IMAGE_VARIANT_WORKERS,
+)
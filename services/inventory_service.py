@@ -0,0 +1,50 @@
+import math
+from repositories.inventory_summary_repo import (
+    AsyncInventorySummaryRepository, InventorySummaryRepository, SUMMARY_FIELDS,
+)
+from schemas.product import ProductStats
+
+
+def _stats(totals: dict) -> ProductStats:
+    return ProductStats(
+        product_count=totals["product_count"],
+        units_on_hand=totals["units_on_hand"],
+        # Suma incremental de floats: se redondea a céntimos al exponerla
+        stock_value=round(totals["stock_value"], 2),
+        out_of_stock_count=totals["out_of_stock_count"],
+    )
+
+
+def _differences(stored: dict, computed: dict) -> dict:
+    differences = {}
+    for field in SUMMARY_FIELDS:
+        if field == "stock_value":
+            equal = math.isclose(stored[field], computed[field], rel_tol=1e-9, abs_tol=1e-6)
+        else:
+            equal = stored[field] == computed[field]
+        if not equal:
+            differences[field] = {"stored": stored[field], "computed": computed[field]}
+    return differences
+
+
+class InventoryService:
+    def __init__(self, repo: InventorySummaryRepository):
+        self.repo = repo
+
+    def get_stats(self) -> ProductStats:
+        return _stats(self.repo.get_totals())
+
+    def check(self) -> dict:
+        """Diferencias entre el resumen y un recorrido completo de products ({} si cuadra)."""
+        return _differences(self.repo.get_totals(), self.repo.compute_from_products())
+
+    def rebuild(self):
+        self.repo.rebuild()
+
+
+class AsyncInventoryService:
+    def __init__(self, repo: AsyncInventorySummaryRepository):
+        self.repo = repo
+
+    async def get_stats(self) -> ProductStats:
+        return _stats(await self.repo.get_totals())
@@ -0,0 +1,66 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+from core.config import settings
+
+# Cambiar BCRYPT_ROUNDS hace que needs_update() marque los hashes antiguos,
+# que se rehashean al hacer login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+
+# Funciones de módulo: el pool de procesos solo puede enviar callables importables
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(plain: str, hashed: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain, hashed)
+
+
+class PasswordHasher:
+    """Hash y verificación bcrypt fuera del proceso de la API.
+
+    bcrypt consume ~250 ms de CPU por llamada; en un pool de procesos acotado un pico
+    de logins no compite por el GIL ni por los hilos que atienden el resto de rutas.
+    Con `workers=0` se usa el threadpool (tests, entornos sin multiprocessing).
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: el proceso de la API ya tiene hilos (aiosqlite, threadpool) y fork no es seguro
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.workers <= 0:
+            return await run_in_threadpool(fn, *args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify_and_update(self, plain: str, hashed: str) -> tuple[bool, str | None]:
+        """(válida, hash nuevo o None si el almacenado sigue vigente)."""
+        return await self._run(_verify_and_update, plain, hashed)
+
+    def start(self):
+        # Arranca los procesos ya, para que el primer login no pague el spawn
+        if self.workers > 0:
+            for future in [self.executor.submit(int) for _ in range(self.workers)]:
+                future.result()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS)
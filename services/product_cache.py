@@ -0,0 +1,70 @@
+import hashlib
+import uuid
+from core.cache import CacheBackend, LRUCache
+from core.config import settings
+from schemas.product import ProductOut
+
+GENERATION_KEY = "products:generation"
+
+
+class ProductCache:
+    """Caché read-through de productos sobre un CacheBackend intercambiable.
+
+    Los productos se guardan ya convertidos a ProductOut (nunca objetos ORM ligados a
+    una sesión). Las páginas de listado van bajo una "generación": cualquier escritura
+    la renueva y todas las páginas anteriores dejan de encontrarse.
+
+    Quien lee de la base de datos toma la generación *antes* de la consulta y la pasa
+    al guardar: si una escritura termina mientras tanto, lo leído no se sirve después.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def get_product(self, product_id: int) -> ProductOut | None:
+        return self.backend.get(f"product:{product_id}")
+
+    def set_product(self, product: ProductOut, generation: str | None = None):
+        """Guarda el producto salvo que haya habido escrituras desde `generation`."""
+        if generation is not None and generation != self.generation():
+            return
+        self.backend.set(f"product:{product.id}", product)
+
+    def get_page(self, params, generation: str):
+        return self.backend.get(self._page_key(params, generation))
+
+    def set_page(self, params, page, generation: str):
+        # Con la generación leída antes de la consulta: si cambió, la página queda
+        # bajo una clave que ya nadie busca
+        self.backend.set(self._page_key(params, generation), page)
+
+    def invalidate_product(self, *product_ids):
+        for product_id in product_ids:
+            self.backend.delete(f"product:{product_id}")
+        self.invalidate_lists()
+
+    def invalidate_lists(self):
+        self.backend.set_meta(GENERATION_KEY, uuid.uuid4().hex)
+
+    def generation(self) -> str:
+        generation = self.backend.get_meta(GENERATION_KEY)
+        if generation is None:
+            # Si la generación se perdió (backend nuevo o vaciado) empezamos una nueva:
+            # las páginas antiguas no pueden volver a coincidir
+            generation = uuid.uuid4().hex
+            self.backend.set_meta(GENERATION_KEY, generation)
+        return generation
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+    @staticmethod
+    def _page_key(params, generation: str) -> str:
+        digest = hashlib.sha1(params.model_dump_json().encode()).hexdigest()
+        return f"products:list:{generation}:{digest}"
+
+
+product_cache = ProductCache(LRUCache(settings.PRODUCT_CACHE_MAXSIZE, settings.PRODUCT_CACHE_TTL))
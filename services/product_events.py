@@ -0,0 +1,48 @@
+from core.broadcast import BroadcastHub, Message, SlowConsumerError, SubscriptionClosed
+from core.config import settings
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+STOCK = "stock"
+
+# Eventos de cambios de productos para /products/stream. Es un hub en proceso:
+# cada worker solo difunde las escrituras que atiende él mismo.
+product_events = BroadcastHub(
+    queue_size=settings.STREAM_QUEUE_SIZE,
+    policy=settings.STREAM_SLOW_CONSUMER_POLICY,
+)
+
+
+def product_event(event_type: str, product_id: int, data: dict | None = None) -> dict:
+    event = {"type": event_type, "id": product_id}
+    if data is not None:
+        event["data"] = data
+    return event
+
+
+def _sse(message: Message) -> str:
+    # data es JSON en una sola línea; seq sirve de id para Last-Event-ID
+    return f"id: {message.seq}\nevent: {message.type}\ndata: {message.data}\n\n"
+
+
+async def sse_stream(hub: BroadcastHub = product_events, keepalive: float = settings.STREAM_KEEPALIVE_SECONDS):
+    """Eventos del hub en formato text/event-stream.
+
+    La suscripción se abre al empezar a enviar el cuerpo y se cierra al terminar el
+    generador (también cuando el cliente se desconecta).
+    Envía un comentario cada `keepalive` segundos sin eventos para que los proxies no
+    corten la conexión; si el hub cierra la suscripción por lentitud lo avisa con un
+    evento `error` y termina.
+    """
+    async with hub.subscribe() as subscription:
+        yield ": connected\n\n"
+        while True:
+            try:
+                message = await subscription.get(timeout=keepalive)
+            except SlowConsumerError:
+                yield 'event: error\ndata: {"detail":"slow consumer"}\n\n'
+                return
+            except SubscriptionClosed:
+                return
+            yield _sse(message) if message is not None else ": keepalive\n\n"
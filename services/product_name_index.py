@@ -0,0 +1,15 @@
+from core.prefix_index import PrefixIndex
+from repositories.product_repo import AsyncProductRepository
+
+# Nombres de producto para el autocompletado; se carga en el arranque (main.lifespan)
+# y AsyncProductService lo mantiene al día en cada alta, renombrado o baja.
+# Cada worker tiene su copia: los cambios hechos por otro proceso llegan al recargar.
+product_name_index = PrefixIndex()
+
+
+async def load_product_names(repo: AsyncProductRepository, index: PrefixIndex = product_name_index) -> int:
+    items = []
+    async for rows in repo.iter_name_rows():
+        items.extend(rows)
+    index.load(items)
+    return len(index)
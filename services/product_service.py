@@ -1,41 +1,373 @@
-from repositories.product_repo import ProductRepository
+import csv
+import io
+import json
+from pydantic import ValidationError
+from repositories.product_repo import AsyncProductRepository, EXPORT_COLUMNS, search_terms
 from models.product import Product
+from core.config import settings
+from core.pagination import encode_cursor, decode_cursor
+from schemas.product import (
+    ProductCreate, ProductOut, ProductBatchUpdate, ProductBatchItemResult, ProductBatchResult, ProductChanges,
+    ProductLookupResult, parse_fields, product_field_set,
+)
+from core.prefix_index import PrefixIndex
+from services.product_cache import ProductCache, product_cache
+from services.product_name_index import product_name_index
+from core.broadcast import BroadcastHub
+from services.product_events import product_events, product_event, CREATED, UPDATED, DELETED, STOCK
 
-class ProductService:
-    def __init__(self, repo: ProductRepository):
+
+class VersionConflictError(Exception):
+    """El producto cambió desde la versión que el cliente indicó (If-Match)."""
+
+    def __init__(self, product_id):
+        super().__init__(f"Product {product_id} was modified by another request")
+        self.product_id = product_id
+
+
+class InsufficientStockError(Exception):
+    """El ajuste dejaría el stock en negativo."""
+
+    def __init__(self, product_id, delta):
+        super().__init__(f"Insufficient stock for product {product_id} to apply delta {delta}")
+        self.product_id = product_id
+        self.delta = delta
+
+
+def _validation_detail(error: ValidationError):
+    return error.errors(include_url=False, include_context=False)
+
+
+def _batch_result(results):
+    failed = sum(1 for r in results if r.status in ("invalid", "not_found"))
+    return ProductBatchResult(succeeded=len(results) - failed, failed=failed, results=results)
+
+
+def _prepare_create_batch(items):
+    """Valida cada elemento por separado; devuelve (results, filas válidas, posiciones)."""
+    results = [None] * len(items)
+    rows, positions = [], []
+    for index, item in enumerate(items):
+        try:
+            data = ProductCreate.model_validate(item)
+        except ValidationError as e:
+            results[index] = ProductBatchItemResult(index=index, status="invalid", detail=_validation_detail(e))
+            continue
+        rows.append(data.model_dump())
+        positions.append(index)
+    return results, rows, positions
+
+
+def _prepare_update_batch(items):
+    results = [None] * len(items)
+    rows, positions = [], []
+    for index, item in enumerate(items):
+        try:
+            data = ProductBatchUpdate.model_validate(item)
+        except ValidationError as e:
+            results[index] = ProductBatchItemResult(index=index, status="invalid", detail=_validation_detail(e))
+            continue
+        # Igual que en update_product: None solo borra image_url
+        values = {
+            key: value for key, value in data.model_dump(exclude_unset=True).items()
+            if value is not None or key == "image_url"
+        }
+        if len(values) == 1:
+            results[index] = ProductBatchItemResult(index=index, id=data.id, status="invalid",
+                                                    detail="No fields to update")
+            continue
+        rows.append(values)
+        positions.append(index)
+    return results, rows, positions
+
+
+def _resolve_update_batch(results, rows, positions, existing):
+    """Marca cada fila como updated/not_found y devuelve las que hay que aplicar."""
+    to_update = []
+    for index, row in zip(positions, rows):
+        if row["id"] in existing:
+            to_update.append(row)
+            results[index] = ProductBatchItemResult(index=index, id=row["id"], status="updated")
+        else:
+            results[index] = ProductBatchItemResult(index=index, id=row["id"], status="not_found")
+    return to_update
+
+
+def _delete_batch_result(product_ids, existing):
+    return _batch_result([
+        ProductBatchItemResult(index=index, id=product_id,
+                               status="deleted" if product_id in existing else "not_found")
+        for index, product_id in enumerate(product_ids)
+    ])
+
+
+def _page_result(params, rows):
+    """Devuelve (productos, next_cursor); next_cursor es None en la última página."""
+    items = rows[:params.limit]
+    next_cursor = None
+    if len(rows) > params.limit:
+        last = items[-1]
+        next_cursor = encode_cursor(params.sort, getattr(last, params.sort.lstrip("-")), last.id)
+    return items, next_cursor
+
+
+CHANGES_CURSOR = "changes"
+
+
+def _product_outs(rows, model=ProductOut):
+    # Desde un dict: la validación por atributos es más lenta sobre filas Core
+    return [model.model_validate(row._asdict()) for row in rows]
+
+
+def _field_set(fields):
+    """ProductFieldSet de ?fields= (ya en forma canónica) o None para el producto completo."""
+    return product_field_set(parse_fields(fields)) if fields else None
+
+
+def _changes_after(since):
+    return decode_cursor(since, CHANGES_CURSOR) if since else None
+
+
+def _changes_result(after, products, deleted, limit):
+    """Mezcla productos y lápidas por (change_seq, id) y genera el siguiente token.
+
+    Cada lista trae hasta limit + 1 filas, así que si entre las dos superan `limit`
+    queda algo por devolver.
+    """
+    entries = sorted(
+        [(p.change_seq, p.id, p) for p in products] + [(seq, product_id, None) for seq, product_id in deleted],
+        key=lambda entry: entry[:2],
+    )
+    page = entries[:limit]
+    last = page[-1][:2] if page else (after or (0, 0))
+    return ProductChanges(
+        items=_product_outs(p for _, _, p in page if p is not None),
+        deleted=[product_id for _, product_id, p in page if p is None],
+        next_token=encode_cursor(CHANGES_CURSOR, last[0], last[1]),
+        has_more=len(entries) > limit,
+    )
+
+
+def _lookup_result(product_ids, found):
+    """Respuesta de lookup en el orden pedido; `found` es {id: producto}."""
+    ordered = list(dict.fromkeys(product_ids))
+    return ProductLookupResult(
+        items=[found[product_id] for product_id in ordered if product_id in found],
+        missing=[product_id for product_id in ordered if product_id not in found],
+    )
+
+
+def _update_values(data):
+    # Manejar tanto diccionarios como objetos Pydantic
+    update_data = data.model_dump(exclude_unset=True) if hasattr(data, 'model_dump') else data
+
+    # Solo los campos proporcionados; None solo si viene explícitamente en el diccionario.
+    # id, version y change_seq no se pueden fijar desde fuera.
+    return {
+        key: value for key, value in update_data.items()
+        if hasattr(Product, key) and key not in ("id", "version", "change_seq")
+        and (value is not None or key in data)
+    }
+
+
+class _ExportEncoder:
+    """Convierte lotes de filas en bytes NDJSON o CSV."""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.fields = [column.key for column in EXPORT_COLUMNS]
+        if fmt == "csv":
+            self.buffer = io.StringIO()
+            self.writer = csv.writer(self.buffer)
+
+    def header(self) -> bytes:
+        if self.fmt != "csv":
+            return b""
+        self.writer.writerow(self.fields)
+        return self._drain()
+
+    def encode(self, rows) -> bytes:
+        if self.fmt == "csv":
+            self.writer.writerows(rows)
+            return self._drain()
+        return "".join(
+            json.dumps(dict(zip(self.fields, row)), separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode()
+
+    def _drain(self) -> bytes:
+        data = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+class AsyncProductService:
+    """Lógica de productos sobre AsyncProductRepository.
+
+    Las lecturas pasan por la caché de productos y cada escritura invalida
+    exactamente lo que cambia (el producto y las páginas de listado), actualiza
+    el índice de nombres del autocompletado y publica el cambio en /products/stream.
+    """
+
+    def __init__(self, repo: AsyncProductRepository, cache: ProductCache = product_cache,
+                 names: PrefixIndex = product_name_index, events: BroadcastHub = product_events):
         self.repo = repo
+        self.cache = cache
+        self.names = names
+        self.events = events
 
-    def create_product(self, data):
-        # data es un Pydantic model (ProductCreate)
-        product = Product(**data.model_dump())  # <-- reemplazamos dict() por model_dump()
-        return self.repo.create(product)
+    def _publish(self, event_type, product_id, data=None):
+        self.events.publish(product_event(event_type, product_id, data))
 
-    def get_products(self):
-        return self.repo.get_all()
+    async def create_product(self, data):
+        product = Product(**data.model_dump())
+        product = await self.repo.create(product)
+        self.cache.invalidate_lists()
+        self.names.set(product.id, product.name)
+        self._publish(CREATED, product.id, ProductOut.model_validate(product).model_dump(mode="json"))
+        return product
 
-    def get_product(self, product_id):
-        return self.repo.get_by_id(product_id)
+    async def create_products_batch(self, items):
+        results, rows, positions = _prepare_create_batch(items)
+        ids = await self.repo.bulk_create(rows) if rows else []
+        for index, product_id in zip(positions, ids):
+            results[index] = ProductBatchItemResult(index=index, id=product_id, status="created")
+        if ids:
+            self.cache.invalidate_lists()
+            self.names.set_many((product_id, row["name"]) for product_id, row in zip(ids, rows))
+            for product_id, row in zip(ids, rows):
+                self._publish(CREATED, product_id, {"id": product_id, **row})
+        return _batch_result(results)
 
-    def update_product(self, product_id, data):
-        product = self.repo.get_by_id(product_id)
-        if not product:
+    async def update_products_batch(self, items):
+        results, rows, positions = _prepare_update_batch(items)
+        existing = await self.repo.get_existing_ids(row["id"] for row in rows) if rows else set()
+        to_update = _resolve_update_batch(results, rows, positions, existing)
+        if to_update:
+            await self.repo.bulk_update(to_update)
+            self.cache.invalidate_product(*(row["id"] for row in to_update))
+            self.names.set_many((row["id"], row["name"]) for row in to_update if "name" in row)
+            for row in to_update:
+                # Solo se conocen los campos enviados, no la versión resultante
+                self._publish(UPDATED, row["id"], row)
+        return _batch_result(results)
+
+    async def delete_products_batch(self, product_ids):
+        existing = await self.repo.get_existing_ids(product_ids)
+        if existing:
+            await self.repo.bulk_delete(existing)
+            self.cache.invalidate_product(*existing)
+            self.names.remove_many(existing)
+            for product_id in sorted(existing):
+                self._publish(DELETED, product_id)
+        return _delete_batch_result(product_ids, existing)
+
+    async def get_products_page(self, params):
+        after = decode_cursor(params.cursor, params.sort) if params.cursor else None
+        generation = self.cache.generation()
+        page = self.cache.get_page(params, generation)
+        if page is None:
+            # Con ?fields= solo se leen esas columnas y los elementos son del modelo reducido
+            field_set = _field_set(params.fields)
+            rows = await self.repo.get_page_rows(params, after, limit=params.limit + 1,
+                                                 fields=field_set.columns if field_set else None)
+            items, next_cursor = _page_result(params, rows)
+            page = (_product_outs(items, field_set.model if field_set else ProductOut), next_cursor)
+            self.cache.set_page(params, page, generation)
+        return page
+
+    async def lookup_products(self, product_ids):
+        """Varios productos por id: primero la caché y el resto en consultas IN por lotes."""
+        found = {}
+        pending = []
+        for product_id in dict.fromkeys(product_ids):
+            product = self.cache.get_product(product_id)
+            if product is None:
+                pending.append(product_id)
+            else:
+                found[product_id] = product
+        if pending:
+            generation = self.cache.generation()
+            for product in _product_outs(await self.repo.get_rows_by_ids(pending)):
+                self.cache.set_product(product, generation)
+                found[product.id] = product
+        return _lookup_result(product_ids, found)
+
+    async def get_changes(self, since: str | None, limit: int):
+        after = _changes_after(since)
+        products, deleted = await self.repo.get_changes(after, limit + 1, include_deleted=after is not None)
+        return _changes_result(after, products, deleted, limit)
+
+    async def search_products(self, query: str, limit: int):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        rows = await self.repo.search_rows(terms, limit, settings.SEARCH_RANK_WINDOW)
+        return _product_outs(rows)
+
+    async def export_products(self, fmt: str = "ndjson", batch_size: int = 1000):
+        encoder = _ExportEncoder(fmt)
+        header = encoder.header()
+        if header:
+            yield header
+        async for rows in self.repo.iter_export_rows(batch_size):
+            yield encoder.encode(rows)
+
+    async def get_product(self, product_id, fields: tuple[str, ...] | None = None):
+        """ProductOut del producto (desde la caché si está) o None.
+
+        Con `fields` devuelve el modelo reducido de product_field_set: sale de la caché si
+        el producto completo está en ella y si no se leen solo esas columnas (y no se cachea).
+        """
+        if fields:
+            field_set = product_field_set(fields)
+            cached = self.cache.get_product(product_id)
+            if cached is not None:
+                return field_set.model.model_validate(cached.model_dump())
+            row = await self.repo.get_row(product_id, field_set.columns)
+            return field_set.model.model_validate(row._asdict()) if row is not None else None
+        product = self.cache.get_product(product_id)
+        if product is None:
+            generation = self.cache.generation()
+            row = await self.repo.get_row(product_id)
+            if row is None:
+                return None
+            product = ProductOut.model_validate(row._asdict())
+            self.cache.set_product(product, generation)
+        return product
+
+    async def update_product(self, product_id, data, expected_versions=None):
+        values = _update_values(data)
+        if not values:
+            return await self.repo.get_by_id(product_id)
+        product = await self.repo.update_fields(product_id, values, expected_versions)
+        if product is None:
+            if expected_versions is not None and await self.repo.get_existing_ids([product_id]):
+                raise VersionConflictError(product_id)
             return None
-            
-        # Manejar tanto diccionarios como objetos Pydantic
-        update_data = data.model_dump(exclude_unset=True) if hasattr(data, 'model_dump') else data
-        
-        # Actualizar solo los campos proporcionados
-        for key, value in update_data.items():
-            if hasattr(product, key):
-                # Solo actualizar si el valor no es None (a menos que sea explícitamente None en el diccionario)
-                if value is not None or key in data:
-                    setattr(product, key, value)
-                    
-        return self.repo.update(product)
-
-    def delete_product(self, product_id):
-        product = self.repo.get_by_id(product_id)
+        self.cache.invalidate_product(product_id)
+        if "name" in values:
+            self.names.set(product_id, product.name)
+        self._publish(UPDATED, product_id, ProductOut.model_validate(product).model_dump(mode="json"))
+        return product
+
+    async def adjust_stock(self, product_id, delta: int):
+        row = await self.repo.adjust_quantity(product_id, delta)
+        if row is None:
+            if await self.repo.get_existing_ids([product_id]):
+                raise InsufficientStockError(product_id, delta)
+            return None
+        self.cache.invalidate_product(product_id)
+        self._publish(STOCK, product_id, dict(row._mapping))
+        return row
+
+    async def delete_product(self, product_id):
+        product = await self.repo.get_by_id(product_id)
         if not product:
             return False
-        self.repo.delete(product)
+        await self.repo.delete(product)
+        self.cache.invalidate_product(product_id)
+        self.names.remove(product_id)
+        self._publish(DELETED, product_id)
         return True
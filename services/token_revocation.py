@@ -0,0 +1,106 @@
+import time
+from datetime import datetime, timedelta, timezone
+from core.cache import CacheBackend, LRUCache
+from core.config import settings
+from core.revocation import RevocationList
+from core.security import TokenClaims
+from repositories.revoked_token_repo import AsyncRevokedTokenRepository
+
+# Margen al pedir revocaciones nuevas, por relojes desfasados entre procesos
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def _epoch(value: datetime) -> float:
+    # SQLite devuelve fechas sin zona: se guardan siempre en UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class TokenRevocationService:
+    """Revocación de tokens por jti con la decisión habitual tomada en memoria.
+
+    La tabla revoked_tokens es la fuente de verdad. Al arrancar se cargan los jti
+    vigentes en un RevocationList y cada `sync_interval` segundos se añaden los que
+    hayan revocado otros procesos; solo los positivos del Bloom consultan la BD.
+    """
+
+    def __init__(self, revocations: RevocationList, cleared: CacheBackend, sync_interval: float):
+        self.revocations = revocations
+        # Falsos positivos del Bloom ya comprobados contra la BD
+        self.cleared = cleared
+        self.sync_interval = sync_interval
+        self._synced_at = None
+        self._next_sync = 0.0
+        self._syncing = False
+        self.db_lookups = 0
+
+    async def load(self, repo: AsyncRevokedTokenRepository):
+        """Purga las filas caducadas y reconstruye el filtro desde la BD."""
+        now = datetime.now(timezone.utc)
+        await repo.purge_expired(now)
+        rows = await repo.get_active(now)
+        self.revocations.rebuild((jti, _epoch(expires_at)) for jti, expires_at in rows)
+        self.cleared.clear()
+        self._mark_synced(now)
+
+    async def sync(self, repo: AsyncRevokedTokenRepository):
+        """Incorpora las revocaciones hechas por otros procesos desde la última sincronización."""
+        if self.revocations.saturated or self._synced_at is None:
+            await self.load(repo)
+            return
+        now = datetime.now(timezone.utc)
+        for jti, expires_at in await repo.get_revoked_since(self._synced_at - SYNC_OVERLAP):
+            self.revocations.add(jti, _epoch(expires_at))
+        self.revocations.prune()
+        self._mark_synced(now)
+
+    def _mark_synced(self, now: datetime):
+        self._synced_at = now
+        self._next_sync = time.monotonic() + self.sync_interval
+
+    async def revoke(self, repo: AsyncRevokedTokenRepository, claims: TokenClaims):
+        expires_at = datetime.fromtimestamp(claims.expires_at, timezone.utc)
+        await repo.add(claims.jti, claims.user_id, expires_at)
+        self.revocations.add(claims.jti, claims.expires_at)
+        self.cleared.delete(claims.jti)
+
+    async def is_revoked(self, repo: AsyncRevokedTokenRepository, jti: str) -> bool:
+        if time.monotonic() >= self._next_sync and not self._syncing:
+            self._syncing = True
+            try:
+                await self.sync(repo)
+            finally:
+                self._syncing = False
+
+        revoked = self.revocations.check(jti)
+        if revoked is not None:
+            return revoked
+        if self.cleared.get(jti) is not None:
+            return False
+
+        self.db_lookups += 1
+        expires_at = await repo.get_expires_at(jti)
+        if expires_at is None:
+            self.cleared.set(jti, True)
+            return False
+        self.revocations.confirm(jti, _epoch(expires_at))
+        return True
+
+    def reset(self):
+        self.revocations.rebuild([])
+        self.cleared.clear()
+        self._synced_at = None
+        self._next_sync = 0.0
+        self.db_lookups = 0
+
+    def stats(self) -> dict:
+        return {**self.revocations.stats(), "db_lookups": self.db_lookups,
+                "cleared": self.cleared.stats()}
+
+
+token_revocation = TokenRevocationService(
+    RevocationList(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE),
+    LRUCache(maxsize=10_000, ttl=settings.REVOCATION_SYNC_SECONDS),
+    settings.REVOCATION_SYNC_SECONDS,
+)
@@ -4,14 +4,27 @@ import os
 # Asegura que la raíz del proyecto esté en sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# bcrypt barato y sin pool de procesos: se lee en Settings al importar la app
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("INTERNAL_API_TOKEN", "test-ops-token")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from main import app
 from db.base import Base
-from db.session import get_db
+from db.session import get_db, get_async_db
+from core.rate_limit import rate_limit_backend
+from core.config import settings
+from core.security import token_verifier
+from services.product_cache import product_cache
+from services.product_name_index import product_name_index
+from services.token_revocation import token_revocation
 
 # 👉 Usar SQLite en archivo local (para que sobreviva varias conexiones en un mismo test)
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -21,6 +34,11 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Misma base de datos para las rutas asíncronas. NullPool porque TestClient puede
+# usar un event loop distinto en cada petición y las conexiones no se comparten.
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 
 # Fixture que reinicia la DB para cada test
 @pytest.fixture(scope="function")
@@ -28,6 +46,12 @@ def db_session():
     # Elimina y recrea las tablas antes de cada test
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    # Los ids se reutilizan entre tests: la caché de productos no debe sobrevivir
+    product_cache.clear()
+    product_name_index.clear()
+    token_verifier.clear()
+    token_revocation.reset()
+    rate_limit_backend.reset()
 
     session = TestingSessionLocal()
     try:
@@ -42,5 +66,38 @@ def client(db_session):
     def override_get_db():
         yield db_session
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     return TestClient(app)
+
+
+PRODUCT_DEFAULTS = {"name": "Product", "description": "d", "price": 1.0, "quantity": 1}
+
+
+# Crea productos con POST /products/batch y devuelve sus ids en el mismo orden.
+# Cada elemento es un nombre o un dict de campos; los kwargs se aplican a todos:
+#   create_products("A", {"name": "B", "price": 2.0}, quantity=0)
+@pytest.fixture
+def create_products(client):
+    def create(*items, **fields):
+        rows = [
+            {**PRODUCT_DEFAULTS, **fields, **({"name": item} if isinstance(item, str) else item)}
+            for item in items
+        ]
+        response = client.post("/products/batch", json=rows)
+        assert response.status_code == 200, response.text
+        results = response.json()["results"]
+        assert all(result["status"] == "created" for result in results), results
+        return [result["id"] for result in results]
+
+    return create
+
+
+# Cabecera Authorization para /internal/*
+@pytest.fixture
+def auth_headers():
+    return {"Authorization": f"Bearer {settings.INTERNAL_API_TOKEN}"}
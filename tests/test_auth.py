@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from jose import jwt
+from passlib.context import CryptContext
+
+from core.config import settings
+from core.security import InvalidTokenError, create_access_token, decode_access_token, token_verifier
+from models.user import User
+from services.password_hasher import PasswordHasher, pwd_context
+
+
+@pytest.fixture
+def registered_user(client):
+    """Register a user and return the credentials used"""
+    credentials = {"username": "alice", "email": "alice@example.com", "password": "s3cret-pass"}
+    response = client.post("/auth/register", json=credentials)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    return credentials
+
+
+def test_register_returns_token_and_user(client):
+    """Test registering a new user"""
+    response = client.post("/auth/register", json={
+        "username": "bob", "email": "bob@example.com", "password": "another-pass"
+    })
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["token_type"] == "bearer"
+    assert data["access_token"]
+    assert data["user"]["username"] == "bob"
+    assert "password" not in data["user"]
+
+
+def test_login_success(client, registered_user):
+    """Test logging in with valid credentials"""
+    response = client.post("/auth/login", json={
+        "email": registered_user["email"], "password": registered_user["password"]
+    })
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["user"]["email"] == registered_user["email"]
+
+
+def test_login_invalid_credentials(client, registered_user):
+    """Test logging in with a wrong password or unknown email"""
+    response = client.post("/auth/login", json={
+        "email": registered_user["email"], "password": "wrong"
+    })
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = client.post("/auth/login", json={
+        "email": "nobody@example.com", "password": "whatever"
+    })
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_rehashes_outdated_hash(client, db_session, registered_user):
+    """Test that a hash with an outdated bcrypt cost is replaced on login"""
+    outdated = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash(registered_user["password"])
+    user = db_session.query(User).filter(User.email == registered_user["email"]).one()
+    user.hashed_password = outdated
+    db_session.commit()
+
+    response = client.post("/auth/login", json={
+        "email": registered_user["email"], "password": registered_user["password"]
+    })
+    assert response.status_code == status.HTTP_200_OK
+
+    db_session.expire_all()
+    stored = db_session.query(User).filter(User.email == registered_user["email"]).one().hashed_password
+    assert stored != outdated
+    assert not pwd_context.needs_update(stored)
+    assert pwd_context.verify(registered_user["password"], stored)
+
+
+def test_password_hasher_process_pool():
+    """Test hashing and verification through the process pool"""
+    hasher = PasswordHasher(workers=1)
+
+    async def roundtrip():
+        hashed = await hasher.hash("pool-pass")
+        return hashed, await hasher.verify_and_update("pool-pass", hashed), \
+            await hasher.verify_and_update("wrong", hashed)
+
+    try:
+        hashed, ok, wrong = asyncio.run(roundtrip())
+    finally:
+        hasher.shutdown()
+
+    assert hashed.startswith("$2b$04$")
+    assert ok == (True, None)
+    assert wrong == (False, None)
+
+
+def test_me_resolves_claims_from_token(client, registered_user):
+    """Test that /auth/me returns the token claims and repeat requests hit the cache"""
+    login = client.post("/auth/login", json={
+        "email": registered_user["email"], "password": registered_user["password"]
+    }).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+
+    hits = token_verifier.stats()["hits"]
+    for _ in range(3):
+        response = client.get("/auth/me", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"id": login["user"]["id"], "username": registered_user["username"]}
+    assert token_verifier.stats()["hits"] == hits + 2
+
+
+def test_me_rejects_missing_or_invalid_token(client):
+    """Test 401 without a token, with a tampered one and with an expired one"""
+    response = client.get("/auth/me")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.headers["www-authenticate"] == "Bearer"
+
+    token = create_access_token({"sub": "mallory", "uid": 1})
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token[:-2]}xx"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    expired = jwt.encode({"sub": "mallory", "uid": 1, "exp": 1}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {expired}"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_decode_access_token_requires_subject():
+    """Test that tokens without a subject are rejected"""
+    with pytest.raises(InvalidTokenError):
+        decode_access_token(create_access_token({"uid": 1}))
+    assert decode_access_token(create_access_token({"sub": "carol", "uid": 7})).user_id == 7
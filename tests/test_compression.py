@@ -0,0 +1,133 @@
+import asyncio
+import zlib
+
+import pytest
+from fastapi import status
+
+from core.compression import CompressionMiddleware, negotiate
+
+LONG_DESCRIPTION = "A fairly long description " * 8
+
+
+def test_negotiate():
+    """Test Accept-Encoding parsing with q-values, wildcards and server preference"""
+    encodings = ("zstd", "gzip")
+    assert negotiate("gzip, deflate", encodings) == "gzip"
+    assert negotiate("gzip;q=0.5, zstd", encodings) == "zstd"
+    assert negotiate("gzip;q=1, zstd;q=0.8", encodings) == "gzip"
+    assert negotiate("*", encodings) == "zstd"
+    assert negotiate("*, zstd;q=0", encodings) == "gzip"
+    assert negotiate("identity", encodings) is None
+    assert negotiate("", encodings) is None
+
+
+def test_large_list_is_compressed(client, create_products):
+    """Test that a large JSON list is gzipped, varies on Accept-Encoding and tags its ETag"""
+    create_products(*(f"Product {i}" for i in range(30)), description=LONG_DESCRIPTION)
+    plain = client.get("/products/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    response = client.get("/products/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(plain.content)
+    assert response.json() == plain.json()
+    assert response.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    # If-None-Match acepta el ETag de la respuesta comprimida
+    revalidated = client.get("/products/", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+    assert revalidated.headers["etag"] == response.headers["etag"]
+    assert "Accept-Encoding" in revalidated.headers["vary"]
+
+    # Quien guardó la respuesta sin comprimir recibe su propio ETag
+    revalidated = client.get("/products/", headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]})
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+    assert revalidated.headers["etag"] == plain.headers["etag"]
+
+
+def test_small_response_is_not_compressed(client, create_products):
+    """Test that responses under the threshold keep their body and strong ETag"""
+    create_products("Product 0", description=LONG_DESCRIPTION)
+    response = client.get("/products/1", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"1-1"'
+
+
+def test_compressed_product_etag_is_accepted_by_if_match(client, create_products):
+    """Test that the ETag of a gzipped product can be sent back in If-Match"""
+    (product_id,) = create_products("Café", description="ñ" * 500)
+    response = client.get(f"/products/{product_id}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    assert etag == f'"{product_id}-1-gzip"'
+
+    updated = client.put(f"/products/{product_id}", data={"quantity": 5}, headers={"If-Match": etag})
+    assert updated.status_code == status.HTTP_200_OK, updated.text
+
+    stale = client.put(f"/products/{product_id}", data={"quantity": 6}, headers={"If-Match": etag})
+    assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert client.put(f"/products/{product_id}", data={"quantity": 6},
+                      headers={"If-Match": f"W/{etag}"}).status_code == status.HTTP_412_PRECONDITION_FAILED
+
+
+def test_streamed_export_is_compressed(client, create_products):
+    """Test that a streamed export is compressed chunk by chunk"""
+    create_products(*(f"Product {i}" for i in range(50)), description=LONG_DESCRIPTION)
+    plain = client.get("/products/export", headers={"Accept-Encoding": "identity"})
+    response = client.get("/products/export", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == plain.content
+
+
+def _run(app, accept_encoding="gzip"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def _app(content_type, chunks):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+
+def test_event_stream_and_binary_types_pass_through():
+    """Test that SSE and non-text content types are never compressed"""
+    for content_type in (b"text/event-stream", b"image/png"):
+        chunks = [b"x" * 4096, b"y" * 4096]
+        messages = _run(CompressionMiddleware(_app(content_type, chunks), minimum_size=10))
+        assert all(name != b"content-encoding" for name, _ in messages[0]["headers"])
+        assert [m["body"] for m in messages[1:]] == chunks
+
+
+def test_streaming_chunks_are_flushed():
+    """Test that each streamed chunk is decodable as soon as it is sent"""
+    chunks = [b'{"row": 1}\n' * 50, b'{"row": 2}\n' * 50, b""]
+    messages = _run(CompressionMiddleware(_app(b"application/x-ndjson", chunks), minimum_size=10))
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(messages[1]["body"]) == chunks[0]
+    assert decoder.decompress(messages[2]["body"]) == chunks[1]
+    decoder.decompress(messages[3]["body"])
+    assert decoder.eof
+
+
+def test_zstd_when_available():
+    """Test that zstd is chosen when installed and preferred by the client"""
+    zstandard = pytest.importorskip("zstandard")
+    body = b'{"name": "x"}' * 500
+    messages = _run(CompressionMiddleware(_app(b"application/json", [body])), accept_encoding="zstd, gzip")
+    assert (b"content-encoding", b"zstd") in messages[0]["headers"]
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(messages[1]["body"]) == body
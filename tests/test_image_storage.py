@@ -0,0 +1,164 @@
+import io
+import os
+import re
+import pytest
+from fastapi import status
+
+from repositories.product_repo import ProductRepository
+from scripts.image_gc import collect
+from services.image_storage import image_storage
+from services.image_variants import image_variants
+
+FAN_OUT_URL = re.compile(r"^/static/images/([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})\.png$")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png(content):
+    return PNG_SIGNATURE + content
+
+
+def _create(client, name, content, content_type="image/png", filename="image.png"):
+    return client.post(
+        "/products/",
+        data={"name": name, "description": "Image storage test", "price": 5.0, "quantity": 1},
+        files={"image": (filename, io.BytesIO(content), content_type)},
+    )
+
+
+@pytest.fixture
+def isolated_store(tmp_path, monkeypatch):
+    # El recolector recorre todo el almacén: que no toque static/images
+    monkeypatch.setattr(image_storage, "root", tmp_path / "images")
+    monkeypatch.setattr(image_variants, "root", tmp_path / "variants")
+    image_storage.root.mkdir()
+
+
+def _age(url, seconds=7200):
+    path = image_storage.path_from_url(url)
+    mtime = path.stat().st_mtime - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_image_stored_under_hash_fan_out(client):
+    """Test that uploads are stored under ab/cd/<sha256>.<ext>"""
+    response = _create(client, "Hashed", _png(b"hashed image bytes"), filename="../../evil.png")
+
+    assert response.status_code == status.HTTP_200_OK, response.text
+    image_url = response.json()["image_url"]
+    assert FAN_OUT_URL.match(image_url)
+    assert image_storage.path_from_url(image_url).read_bytes() == _png(b"hashed image bytes")
+
+
+def test_identical_uploads_are_deduplicated(client, db_session, isolated_store):
+    """Test that the same content is stored once and shared"""
+    first = _create(client, "First", _png(b"same bytes"), filename="a.png").json()
+    second = _create(client, "Second", _png(b"same bytes"), filename="b.png").json()
+
+    assert first["image_url"] == second["image_url"]
+
+    # Replacing the image of one product must not delete the shared file
+    response = client.put(
+        f"/products/{first['id']}",
+        files={"image": ("c.png", io.BytesIO(_png(b"different bytes")), "image/png")},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    _age(second["image_url"])
+    collect(ProductRepository(db_session), grace_seconds=3600)
+    assert image_storage.path_from_url(second["image_url"]).exists()
+
+
+def test_replaced_image_is_collected_when_unused(client, db_session, isolated_store):
+    """Test that a replaced image stays until the collector finds it unreferenced"""
+    product = _create(client, "Solo", _png(b"solo original bytes")).json()
+    old_path = image_storage.path_from_url(product["image_url"])
+
+    response = client.put(
+        f"/products/{product['id']}",
+        files={"image": ("new.png", io.BytesIO(_png(b"solo new bytes")), "image/png")},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert old_path.exists()
+
+    # Dentro del margen de gracia no se toca
+    assert collect(ProductRepository(db_session), grace_seconds=3600) == []
+    _age(product["image_url"])
+    assert collect(ProductRepository(db_session), grace_seconds=3600, dry_run=True) == [old_path.stem]
+    assert old_path.exists()
+
+    assert collect(ProductRepository(db_session), grace_seconds=3600) == [old_path.stem]
+    assert not old_path.exists()
+    assert image_storage.path_from_url(response.json()["image_url"]).exists()
+
+
+def test_deduplicated_upload_is_protected_from_collection(client, db_session, isolated_store):
+    """Test that re-uploading an unreferenced file renews it before its product is saved"""
+    product = _create(client, "Orphan", _png(b"orphaned bytes")).json()
+    client.put(f"/products/{product['id']}",
+               files={"image": ("other.png", io.BytesIO(_png(b"other bytes")), "image/png")})
+    _age(product["image_url"])
+
+    # Otra subida del mismo contenido lo deduplica y renueva su fecha
+    again = _create(client, "Again", _png(b"orphaned bytes")).json()
+    assert again["image_url"] == product["image_url"]
+    client.delete(f"/products/{again['id']}")
+
+    assert collect(ProductRepository(db_session), grace_seconds=3600) == []
+    assert image_storage.path_from_url(product["image_url"]).exists()
+
+
+def test_image_size_limit(client, monkeypatch):
+    """Test that oversized uploads are rejected"""
+    monkeypatch.setattr(image_storage, "max_bytes", 1024)
+
+    response = _create(client, "Too big", _png(b"x" * 2048))
+
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert client.get("/products/").json() == []
+
+
+def test_image_content_type_limit(client):
+    """Test that non-image content types are rejected on create and update"""
+    response = _create(client, "Svg", b"<svg/>", content_type="image/svg+xml", filename="x.svg")
+    assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    product = _create(client, "Ok", _png(b"fine")).json()
+    response = client.put(
+        f"/products/{product['id']}",
+        files={"image": ("notes.txt", io.BytesIO(b"text"), "text/plain")},
+    )
+    assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+
+def test_image_type_comes_from_content(client):
+    """Test that the declared content type is not trusted for the stored extension"""
+    response = _create(client, "Fake", b"<html>not an image</html>")
+    assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    # Un JPEG declarado como PNG se guarda como .jpg
+    response = _create(client, "Jpeg", b"\xff\xd8\xff\xe0 jpeg bytes")
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.json()["image_url"].endswith(".jpg")
+
+
+def test_import_file_keeps_the_original(isolated_store):
+    """Test that importing copies into the store and leaves the source for the caller"""
+    source = image_storage.root / "legacy.png"
+    source.write_bytes(_png(b"legacy bytes"))
+
+    url = image_storage.import_file(source)
+
+    assert FAN_OUT_URL.match(url)
+    assert image_storage.path_from_url(url).read_bytes() == _png(b"legacy bytes")
+    assert source.read_bytes() == _png(b"legacy bytes")
+    assert image_storage.import_file(source) == url
+    assert list((image_storage.root / ".tmp").iterdir()) == []
+
+
+@pytest.mark.parametrize("url", [
+    "/static/images/../../etc/passwd",
+    "/elsewhere/ab/cd/file.png",
+    None,
+])
+def test_path_from_url_rejects_foreign_paths(url):
+    """Test that URLs outside the image store never resolve to a path"""
+    assert image_storage.path_from_url(url) is None
@@ -0,0 +1,77 @@
+import io
+from fastapi import status
+from PIL import Image
+
+from services.image_variants import image_variants
+
+
+def _png(width, height, color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _create(client, content):
+    response = client.post(
+        "/products/",
+        data={"name": "Pictured", "description": "Has an image", "price": 3.0, "quantity": 1},
+        files={"image": ("photo.png", io.BytesIO(content), "image/png")},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    return response.json()
+
+
+def test_product_exposes_variant_urls(client):
+    """Test thumbnail and medium URLs are derived from the stored image"""
+    product = _create(client, _png(40, 30, (1, 2, 3)))
+
+    digest = product["image_url"].rsplit("/", 1)[-1].split(".")[0]
+    assert product["thumbnail_url"] == f"/images/thumb/{digest}{image_variants.extension}"
+    assert product["medium_url"] == f"/images/medium/{digest}{image_variants.extension}"
+
+    listed = client.get("/products/").json()[0]
+    assert listed["thumbnail_url"] == product["thumbnail_url"]
+
+
+def test_product_without_image_has_no_variants(client):
+    """Test variant URLs are null when the product has no image"""
+    response = client.post(
+        "/products/",
+        data={"name": "Plain", "description": "No image", "price": 1.0, "quantity": 1},
+    )
+    assert response.json()["thumbnail_url"] is None
+    assert response.json()["medium_url"] is None
+
+
+def test_variant_generated_on_first_request(client):
+    """Test a missing variant is generated lazily and cached on disk"""
+    product = _create(client, _png(1600, 900, (10, 120, 240)))
+    digest = product["image_url"].rsplit("/", 1)[-1].split(".")[0]
+    for variant in ("thumb", "medium"):
+        image_variants.path_for(digest, variant).unlink(missing_ok=True)
+
+    response = client.get(product["thumbnail_url"])
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == image_variants.media_type
+    assert "immutable" in response.headers["cache-control"]
+    with Image.open(io.BytesIO(response.content)) as thumb:
+        assert max(thumb.size) == 128
+    assert image_variants.path_for(digest, "thumb").exists()
+
+    medium = client.get(product["medium_url"])
+    with Image.open(io.BytesIO(medium.content)) as image:
+        assert image.size == (512, 288)
+    assert len(response.content) < len(medium.content)
+
+
+def test_variant_errors(client):
+    """Test unknown variants, unknown hashes and undecodable originals"""
+    digest = "0" * 64
+    extension = image_variants.extension
+    assert client.get(f"/images/huge/{digest}{extension}").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(f"/images/thumb/{digest}{extension}").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(f"/images/thumb/{digest}.gif").status_code == status.HTTP_404_NOT_FOUND
+
+    product = _create(client, b"\x89PNG\r\n\x1a\n but not really a png")
+    assert client.get(product["thumbnail_url"]).status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,138 @@
+import asyncio
+from collections import namedtuple
+import pytest
+from fastapi import status
+
+from core.cache import LRUCache
+from schemas.product import ProductListParams
+from services.product_cache import ProductCache
+from services.product_service import AsyncProductService
+
+Row = namedtuple("Row", "id name description price quantity image_url version updated_at")
+
+
+def test_lru_cache_eviction_and_ttl(monkeypatch):
+    """Test size bound, LRU order, TTL expiry and counters"""
+    now = [100.0]
+    monkeypatch.setattr("core.cache.time.monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=2, ttl=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # "b" is the least recently used
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    now[0] += 11
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+
+
+def test_get_product_is_served_from_cache(client, auth_headers, create_products):
+    """Test repeated reads hit the cache"""
+    (product_id,) = create_products("Cached")
+    client.get(f"/products/{product_id}")
+    before = client.get("/internal/cache", headers=auth_headers).json()
+
+    response = client.get(f"/products/{product_id}")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["name"] == "Cached"
+    after = client.get("/internal/cache", headers=auth_headers).json()
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+
+@pytest.mark.parametrize("write", ["put", "patch_batch"])
+def test_updates_invalidate_product_and_lists(client, write, create_products):
+    """Test writes are visible immediately on cached reads"""
+    (product_id,) = create_products("Before")
+    assert client.get(f"/products/{product_id}").json()["name"] == "Before"
+    assert client.get("/products/").json()[0]["name"] == "Before"
+
+    if write == "put":
+        response = client.put(f"/products/{product_id}", data={"name": "After"})
+    else:
+        response = client.patch("/products/batch", json=[{"id": product_id, "name": "After"}])
+    assert response.status_code == status.HTTP_200_OK
+
+    assert client.get(f"/products/{product_id}").json()["name"] == "After"
+    assert client.get("/products/").json()[0]["name"] == "After"
+
+
+def test_create_and_delete_invalidate_lists(client, create_products):
+    """Test list pages reflect creates and deletes"""
+    (first,) = create_products("First")
+    assert len(client.get("/products/").json()) == 1
+
+    create_products("Second")
+    assert len(client.get("/products/").json()) == 2
+
+    client.get(f"/products/{first}")
+    assert client.delete(f"/products/{first}").status_code == status.HTTP_200_OK
+    assert client.get(f"/products/{first}").status_code == status.HTTP_404_NOT_FOUND
+    assert [p["name"] for p in client.get("/products/").json()] == ["Second"]
+
+
+class _RacingRepo:
+    """Repositorio falso: otra petición escribe el producto mientras dura cada lectura."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.version = 1
+
+    async def _read(self):
+        row = Row(1, f"v{self.version}", "Racing", 1.0, 1, None, self.version, None)
+        await asyncio.sleep(0)
+        self.version += 1
+        self.cache.invalidate_product(1)
+        return row
+
+    async def get_page_rows(self, params, after=None, limit=None, fields=None):
+        return [await self._read()]
+
+    async def get_row(self, product_id, fields=None):
+        return await self._read()
+
+    async def get_rows_by_ids(self, product_ids):
+        return [await self._read()]
+
+
+@pytest.mark.parametrize("read", ["page", "product", "lookup"])
+def test_reads_overlapping_a_write_are_not_cached(read):
+    """Test a value read before a concurrent write commits is not served afterwards"""
+    cache = ProductCache(LRUCache())
+    service = AsyncProductService(_RacingRepo(cache), cache=cache)
+
+    async def name():
+        if read == "page":
+            items, _ = await service.get_products_page(ProductListParams())
+            return items[0].name
+        if read == "product":
+            return (await service.get_product(1)).name
+        return (await service.lookup_products([1])).items[0].name
+
+    async def scenario():
+        # La primera lectura ve v1, pero v2 se confirma antes de que termine
+        assert await name() == "v1"
+        assert await name() == "v2"
+
+    asyncio.run(scenario())
+
+
+def test_list_generation_is_not_counted_in_stats():
+    """Test the list generation lives outside the LRU counters"""
+    cache = ProductCache(LRUCache())
+    generation = cache.generation()
+    assert cache.get_page(ProductListParams(), generation) is None
+    cache.invalidate_lists()
+    assert cache.generation() != generation
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (0, 1, 0)
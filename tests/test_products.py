@@ -1,9 +1,12 @@
 import io
 import pytest
 
+# Solo se aceptan subidas cuyo contenido empieza por la firma de un tipo de imagen
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
 def test_create_product_with_image(client):
     # Simular un archivo en memoria
-    file_content = b"fake image content"
+    file_content = PNG_SIGNATURE + b"fake image content"
     file = io.BytesIO(file_content)
     file.name = "test_image.png"
 
@@ -30,7 +33,7 @@ def test_create_product_with_image(client):
 
 def test_list_products_includes_image(client):
     # Primero creamos un producto
-    file_content = b"another fake image"
+    file_content = PNG_SIGNATURE + b"another fake image"
     file = io.BytesIO(file_content)
     file.name = "list_test.png"
 
@@ -63,7 +66,7 @@ def test_list_products_includes_image(client):
 
 def test_update_product(client):
     # Primero creamos un producto para actualizar
-    file_content = b"original image"
+    file_content = PNG_SIGNATURE + b"original image"
     file = io.BytesIO(file_content)
     file.name = "original.png"
 
@@ -82,7 +85,7 @@ def test_update_product(client):
     original_image_url = create_response.json()["image_url"]
 
     # Test 1: Actualización completa (incluyendo nueva imagen)
-    new_file_content = b"new image content"
+    new_file_content = PNG_SIGNATURE + b"new image content"
     new_file = io.BytesIO(new_file_content)
     new_file.name = "updated.png"
 
@@ -0,0 +1,76 @@
+from fastapi import status
+
+from core.prefix_index import BULK_THRESHOLD, PrefixIndex
+
+
+def _suggest(client, prefix, limit=10):
+    response = client.get("/products/autocomplete", params={"prefix": prefix, "limit": limit})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    return response.json()
+
+
+def test_prefix_index_search_and_updates():
+    """Test ordering, normalisation, renames and removals"""
+    index = PrefixIndex()
+    index.load([(1, "Café Latte"), (2, "Cafetera"), (3, "camiseta"), (4, "Cafe  latte")])
+
+    assert index.search("cafe", 10) == [(1, "Café Latte"), (4, "Cafe  latte"), (2, "Cafetera")]
+    assert index.search("CAFE L", 1) == [(1, "Café Latte")]
+
+    index.set(3, "Cafecito")
+    index.remove(1)
+    assert [item_id for item_id, _ in index.search("caf", 10)] == [4, 3, 2]
+    assert index.search("cam", 10) == []
+    assert index.search("  ", 10) == []
+    assert len(index) == 3
+
+
+def test_prefix_index_bulk_changes_match_single_changes():
+    """Test that batch updates produce the same index as one-by-one updates"""
+    names = [(i, f"item {i % 7} {i}") for i in range(BULK_THRESHOLD * 2)]
+    single, bulk = PrefixIndex(), PrefixIndex()
+    for item_id, name in names:
+        single.set(item_id, name)
+    bulk.set_many(names)
+    assert bulk.search("item", 500) == single.search("item", 500)
+
+    removed = range(0, BULK_THRESHOLD * 2, 2)
+    for item_id in removed:
+        single.remove(item_id)
+    bulk.remove_many(removed)
+    assert bulk.search("item", 500) == single.search("item", 500)
+    assert len(bulk) == len(single) == BULK_THRESHOLD
+
+
+def test_autocomplete_follows_writes(client, create_products):
+    """Test that creates, renames and deletes update suggestions without a reload"""
+    monitor24, monitor27, mouse = create_products("Monitor 24", "Monitor 27", "Mouse")
+
+    assert _suggest(client, "mo") == [
+        {"id": monitor24, "name": "Monitor 24"},
+        {"id": monitor27, "name": "Monitor 27"},
+        {"id": mouse, "name": "Mouse"},
+    ]
+    assert [s["id"] for s in _suggest(client, "mon", limit=1)] == [monitor24]
+
+    client.put(f"/products/{mouse}", data={"name": "Keyboard"})
+    client.delete(f"/products/{monitor24}")
+    assert [s["id"] for s in _suggest(client, "mo")] == [monitor27]
+    assert _suggest(client, "key") == [{"id": mouse, "name": "Keyboard"}]
+
+
+def test_autocomplete_rejects_blank_prefix(client, create_products):
+    """Test that a prefix that normalizes to nothing is rejected instead of matching everything"""
+    create_products("Lamp")
+    for prefix in (" ", "  \t", "\u0301"):
+        response = client.get("/products/autocomplete", params={"prefix": prefix})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_autocomplete_memory_is_reported(client, auth_headers, create_products):
+    """Test the internal footprint endpoint"""
+    create_products("Lamp")
+
+    stats = client.get("/internal/autocomplete", headers=auth_headers).json()
+    assert stats["entries"] == 1
+    assert stats["memory_bytes"] > 0
@@ -0,0 +1,68 @@
+from fastapi import status
+
+
+def _product(name, price=10.0, quantity=1):
+    return {"name": name, "description": f"Description of {name}", "price": price, "quantity": quantity}
+
+
+def test_batch_create(client):
+    """Test that valid items are created and invalid ones are reported"""
+    response = client.post("/products/batch", json=[
+        _product("First"),
+        _product("Broken", price=-1),
+        _product("Second", quantity=0),
+    ])
+
+    assert response.status_code == status.HTTP_200_OK, response.text
+    data = response.json()
+    assert data["succeeded"] == 2
+    assert data["failed"] == 1
+    assert [r["status"] for r in data["results"]] == ["created", "invalid", "created"]
+    assert data["results"][1]["detail"]
+
+    products = client.get("/products/").json()
+    assert [p["name"] for p in products] == ["First", "Second"]
+    assert [p["id"] for p in products] == [data["results"][0]["id"], data["results"][2]["id"]]
+
+
+def test_batch_update(client):
+    """Test per-item results for a batch update"""
+    created = client.post("/products/batch", json=[_product("A"), _product("B")]).json()["results"]
+    first, second = created[0]["id"], created[1]["id"]
+
+    response = client.patch("/products/batch", json=[
+        {"id": first, "quantity": 42},
+        {"id": second, "name": "B2", "price": 3.5},
+        {"id": 9999, "quantity": 1},
+        {"id": first, "price": 0},
+        {"id": second},
+    ])
+
+    assert response.status_code == status.HTTP_200_OK, response.text
+    statuses = [r["status"] for r in response.json()["results"]]
+    assert statuses == ["updated", "updated", "not_found", "invalid", "invalid"]
+
+    assert client.get(f"/products/{first}").json()["quantity"] == 42
+    updated = client.get(f"/products/{second}").json()
+    assert updated["name"] == "B2"
+    assert updated["price"] == 3.5
+    assert updated["description"] == "Description of B"
+
+
+def test_batch_delete(client):
+    """Test deleting several products in one request"""
+    created = client.post("/products/batch", json=[_product("A"), _product("B"), _product("C")]).json()["results"]
+    ids = [r["id"] for r in created]
+
+    response = client.request("DELETE", "/products/batch", json={"ids": [ids[0], 9999, ids[2]]})
+
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert [r["status"] for r in response.json()["results"]] == ["deleted", "not_found", "deleted"]
+    assert [p["id"] for p in client.get("/products/").json()] == [ids[1]]
+
+
+def test_batch_limits(client):
+    """Test empty and oversized batches are rejected"""
+    assert client.post("/products/batch", json=[]).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    too_many = [_product(f"P{i}") for i in range(1001)]
+    assert client.post("/products/batch", json=too_many).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,109 @@
+from fastapi import status
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+
+from models.product import Product
+from repositories.product_repo import _changes_statements
+
+
+def _changes(client, since=None, limit=None):
+    params = {key: value for key, value in {"since": since, "limit": limit}.items() if value is not None}
+    response = client.get("/products/changes", params=params)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    return response.json()
+
+
+def test_changes_initial_sync_and_delta(client, create_products):
+    """Test that after the initial sync only changed and deleted products are returned"""
+    a, b, c = create_products("A", "B", "C")
+    initial = _changes(client)
+    assert [item["id"] for item in initial["items"]] == [a, b, c]
+    assert initial["deleted"] == [] and initial["has_more"] is False
+
+    empty = _changes(client, initial["next_token"])
+    assert empty["items"] == [] and empty["deleted"] == []
+    assert empty["next_token"] == initial["next_token"]
+
+    client.put(f"/products/{a}", data={"price": 9.5})
+    client.post(f"/products/{c}/stock/adjust", json={"delta": 2})
+    client.delete(f"/products/{b}")
+    (d,) = create_products("D")
+
+    delta = _changes(client, initial["next_token"])
+    assert [item["id"] for item in delta["items"]] == [a, c, d]
+    assert delta["items"][0]["price"] == 9.5
+    assert delta["deleted"] == [b]
+    assert _changes(client, delta["next_token"])["items"] == []
+
+
+def test_changes_batch_delete_writes_tombstones(client, create_products):
+    """Test that batch deletes are reported and not repeated on the next sync"""
+    ids = create_products("A", "B", "C")
+    token = _changes(client)["next_token"]
+    client.request("DELETE", "/products/batch", json={"ids": ids[:2]})
+
+    delta = _changes(client, token)
+    assert delta["items"] == []
+    assert sorted(delta["deleted"]) == ids[:2]
+    assert _changes(client, delta["next_token"])["deleted"] == []
+
+
+def test_changes_reused_id_is_not_reported_deleted(client, create_products):
+    """Test that a product created with the id of a deleted one is only reported live"""
+    ids = create_products("A", "B")
+    token = _changes(client)["next_token"]
+    client.delete(f"/products/{ids[1]}")
+    (reused,) = create_products("C")
+    assert reused == ids[1]
+
+    delta = _changes(client, token)
+    assert [item["id"] for item in delta["items"]] == [reused]
+    assert delta["deleted"] == []
+
+    # Lo mismo por POST /products/ (un solo INSERT)
+    client.delete(f"/products/{reused}")
+    response = client.post("/products/", data={"name": "D", "description": "d", "price": 1.0, "quantity": 1})
+    assert response.json()["id"] == reused
+    assert _changes(client, token)["deleted"] == []
+
+
+def test_changes_pagination(client, create_products):
+    """Test that has_more/next_token walk all changes exactly once"""
+    ids = create_products(*[f"P{i}" for i in range(7)])
+    token = _changes(client)["next_token"]
+    client.delete(f"/products/{ids[0]}")
+    for product_id in ids[1:4]:
+        client.put(f"/products/{product_id}", data={"quantity": 5})
+
+    seen_items, seen_deleted, pages = [], [], 0
+    while True:
+        page = _changes(client, token, limit=2)
+        seen_items += [item["id"] for item in page["items"]]
+        seen_deleted += page["deleted"]
+        token, pages = page["next_token"], pages + 1
+        if not page["has_more"]:
+            break
+    assert seen_deleted == [ids[0]]
+    assert seen_items == ids[1:4]
+    assert pages == 2
+
+
+def test_changes_invalid_token(client, create_products):
+    """Test that a malformed or foreign token is rejected"""
+    create_products("A", "B")
+    assert client.get("/products/changes", params={"since": "not-a-token"}).status_code == 400
+    page_cursor = client.get("/products/", params={"limit": 1}).headers["x-next-cursor"]
+    assert client.get("/products/changes", params={"since": page_cursor}).status_code == 400
+
+
+def test_postgres_changes_use_xid_watermark_without_locks():
+    """Test that PostgreSQL writers take no lock and readers stop below the oldest running transaction"""
+    dialect = postgresql.dialect()
+    write = str(update(Product).values(name="x").compile(dialect=dialect))
+    assert "pg_current_xact_id()" in write
+    assert "lock" not in write.lower() and "nextval" not in write
+
+    products, tombstones = _changes_statements((5, 1), 10, watermark=42)
+    for stmt in (products, tombstones):
+        sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        assert "change_seq < 42" in sql
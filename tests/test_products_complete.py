@@ -3,10 +3,14 @@ import pytest
 from fastapi import status
 from typing import Dict, Any
 
+# Solo se aceptan subidas cuyo contenido empieza por la firma de un tipo de imagen
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
 @pytest.fixture
 def test_product(client) -> Dict[str, Any]:
     """Create a test product and return its data"""
-    file_content = b"test image content"
+    file_content = PNG_SIGNATURE + b"test image content"
     file = io.BytesIO(file_content)
     file.name = "test_product.png"
     
@@ -25,7 +29,7 @@ def test_product(client) -> Dict[str, Any]:
 def test_create_product_success(client):
     """Test creating a product with valid data"""
     # Arrange
-    file_content = b"test image content"
+    file_content = PNG_SIGNATURE + b"test image content"
     file = io.BytesIO(file_content)
     file.name = "test_image.png"
     
@@ -128,7 +132,7 @@ def test_update_product_partial(client, test_product):
 def test_update_product_with_image(client, test_product):
     """Test updating a product with a new image"""
     # Arrange
-    new_file_content = b"new image content"
+    new_file_content = PNG_SIGNATURE + b"new image content"
     new_file = io.BytesIO(new_file_content)
     new_file.name = "updated_image.png"
     
@@ -235,12 +239,12 @@ def test_create_product_with_invalid_image(client):
         },
         files={"image": ("test.txt", file, "text/plain")}
     )
-    # The API currently accepts any file type, so we'll just verify it's a success
-    assert response.status_code == status.HTTP_200_OK
+    # Only image content types are accepted
+    assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
     
     # Test with large image (simulated by large content)
     # Note: The API might accept large files depending on server configuration
-    large_content = b"x" * (2 * 1024 * 1024)  # 2MB - reasonable size for testing
+    large_content = JPEG_SIGNATURE + b"x" * (2 * 1024 * 1024)  # 2MB - reasonable size for testing
     file = io.BytesIO(large_content)
     file.name = "large_image.jpg"
     
@@ -0,0 +1,110 @@
+from fastapi import status
+
+
+def test_get_product_etag_and_304(client, create_products):
+    """Test a matching If-None-Match returns 304 without a body"""
+    (product_id,) = create_products("Polled")
+    response = client.get(f"/products/{product_id}")
+    etag = response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+
+    cached = client.get(f"/products/{product_id}", headers={"If-None-Match": etag})
+
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    weak = client.get(f"/products/{product_id}", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert weak.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_update_changes_version_and_etag(client, create_products):
+    """Test every update bumps the version and invalidates the validator"""
+    (product_id,) = create_products("Polled")
+    response = client.get(f"/products/{product_id}")
+    assert response.json()["version"] == 1
+    etag = response.headers["ETag"]
+
+    updated = client.put(f"/products/{product_id}", data={"quantity": 9}).json()
+    assert updated["version"] == 2
+
+    response = client.get(f"/products/{product_id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["quantity"] == 9
+
+
+def test_if_modified_since(client, create_products):
+    """Test Last-Modified / If-Modified-Since revalidation"""
+    (product_id,) = create_products("Polled")
+    last_modified = client.get(f"/products/{product_id}").headers["Last-Modified"]
+
+    response = client.get(f"/products/{product_id}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    old = "Mon, 01 Jan 2001 00:00:00 GMT"
+    response = client.get(f"/products/{product_id}", headers={"If-Modified-Since": old})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_list_etag(client, create_products):
+    """Test list pages are revalidated and change when a row changes"""
+    product_id, _ = create_products("One", "Two")
+    etag = client.get("/products/").headers["ETag"]
+
+    assert client.get("/products/", headers={"If-None-Match": etag}).status_code == status.HTTP_304_NOT_MODIFIED
+    other_page = client.get("/products/", params={"limit": 1}, headers={"If-None-Match": etag})
+    assert other_page.status_code == status.HTTP_200_OK
+
+    client.put(f"/products/{product_id}", data={"name": "Uno"})
+    response = client.get("/products/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["name"] == "Uno"
+
+
+def test_list_ignores_if_modified_since(client, create_products):
+    """Test list pages carry no Last-Modified, since dropped rows would not move it"""
+    first, _ = create_products("Sold", "Kept")
+    response = client.get("/products/", params={"in_stock": "true"})
+    assert "Last-Modified" not in response.headers
+    since = client.get(f"/products/{first}").headers["Last-Modified"]
+
+    client.post(f"/products/{first}/stock/adjust", json={"delta": -1})
+    response = client.get("/products/", params={"in_stock": "true"}, headers={"If-Modified-Since": since})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [p["name"] for p in response.json()] == ["Kept"]
+
+
+def test_if_match_update(client, create_products):
+    """Test conditional updates with If-Match"""
+    (product_id,) = create_products("Polled")
+    etag = client.get(f"/products/{product_id}").headers["ETag"]
+
+    response = client.put(f"/products/{product_id}", data={"quantity": 7}, headers={"If-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+
+    # A second writer still holding the old ETag must not overwrite the change
+    stale = client.put(f"/products/{product_id}", data={"quantity": 1}, headers={"If-Match": etag})
+    assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert client.get(f"/products/{product_id}").json()["quantity"] == 7
+
+    response = client.put(f"/products/{product_id}", data={"quantity": 2}, headers={"If-Match": "*"})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_if_match_rejects_foreign_or_weak_etags(client, create_products):
+    """Test If-Match uses strong comparison against this product"""
+    (product_id,) = create_products("Polled")
+    (other_id,) = create_products("Other")
+    etag = client.get(f"/products/{product_id}").headers["ETag"]
+    other_etag = client.get(f"/products/{other_id}").headers["ETag"]
+
+    for header in (f"W/{etag}", other_etag, "garbage"):
+        response = client.put(f"/products/{product_id}", data={"name": "X"}, headers={"If-Match": header})
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    response = client.put(f"/products/{product_id}", data={"name": "X"}, headers={"If-Match": f'{other_etag}, {etag}'})
+    assert response.status_code == status.HTTP_200_OK
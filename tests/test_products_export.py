@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+from fastapi import status
+
+
+def test_export_ndjson(client, create_products):
+    """Test that the export streams one JSON object per line"""
+    created = create_products(*({"name": f"Product {i}", "price": 1.0 + i, "quantity": i} for i in range(3)))
+
+    response = client.get("/products/export")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == created
+    assert rows[1]["name"] == "Product 1"
+    assert rows[1]["price"] == 2.0
+
+
+def test_export_csv(client, create_products):
+    """Test the CSV export includes a header and every product"""
+    create_products({"name": "Widget, large", "price": 9.5, "quantity": 2}, {"name": "Gadget", "price": 3.0, "quantity": 0})
+
+    response = client.get("/products/export", params={"format": "csv"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "products.csv" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["name"] for row in rows] == ["Widget, large", "Gadget"]
+    assert rows[1]["quantity"] == "0"
+
+
+def test_export_empty_catalog(client):
+    """Test exporting an empty catalog"""
+    assert client.get("/products/export").text == ""
+    header = client.get("/products/export", params={"format": "csv"}).text
+    assert header.strip() == "id,name,description,price,quantity,image_url"
+
+
+def test_export_invalid_format(client):
+    """Test that unknown formats are rejected"""
+    response = client.get("/products/export", params={"format": "xml"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
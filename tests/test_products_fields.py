@@ -0,0 +1,91 @@
+from fastapi import status
+from sqlalchemy import event
+
+from repositories.product_repo import ProductRepository
+from schemas.product import ProductListParams, parse_fields, product_field_set
+
+# Descripción larga: la columna que ?fields= evita leer
+LONG_DESCRIPTION = "long text " * 40
+
+
+def test_list_products_sparse_fields(client, create_products):
+    """Test that only the requested fields are returned and pagination still works"""
+    create_products(
+        {"name": "A", "price": 3.0, "quantity": 1},
+        {"name": "B", "price": 1.0, "quantity": 2},
+        {"name": "C", "price": 2.0, "quantity": 3},
+        description=LONG_DESCRIPTION,
+    )
+
+    response = client.get("/products/", params={"fields": "quantity,id,name", "sort": "-price", "limit": 2})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.json() == [{"name": "A", "quantity": 1, "id": 1}, {"name": "C", "quantity": 3, "id": 3}]
+    assert response.headers["etag"]
+
+    # El cursor usa price aunque no se haya pedido
+    cursor = response.headers["x-next-cursor"]
+    response = client.get("/products/", params={"fields": "name", "sort": "-price", "limit": 2, "cursor": cursor})
+    assert response.json() == [{"name": "B"}]
+
+
+def test_get_product_sparse_fields(client, create_products):
+    """Test sparse fields on a single product, from the database and from the cache"""
+    (product_id,) = create_products("A", price=3.0, description=LONG_DESCRIPTION)
+
+    first = client.get(f"/products/{product_id}", params={"fields": "name,thumbnail_url"})
+    assert first.status_code == status.HTTP_200_OK, first.text
+    assert first.json() == {"name": "A", "thumbnail_url": None}
+    assert first.headers["etag"].startswith(f'"{product_id}-1-')
+
+    client.get(f"/products/{product_id}")  # deja el producto completo en caché
+    assert client.get(f"/products/{product_id}", params={"fields": "price"}).json() == {"price": 3.0}
+
+
+def test_projected_etag_does_not_validate_other_projections(client, create_products):
+    """Test that a ?fields= ETag never yields a 304 for the full or another projection"""
+    (product_id,) = create_products("A", price=3.0)
+    url = f"/products/{product_id}"
+    projected = client.get(url, params={"fields": "id"}).headers["etag"]
+    full = client.get(url).headers["etag"]
+    assert projected != full
+
+    assert client.get(url, headers={"If-None-Match": projected}).status_code == status.HTTP_200_OK
+    assert client.get(url, params={"fields": "name"}, headers={"If-None-Match": projected}).status_code == status.HTTP_200_OK
+    response = client.get(url, params={"fields": "id"}, headers={"If-None-Match": projected})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    projected_list = client.get("/products/", params={"fields": "id"}).headers["etag"]
+    assert client.get("/products/", headers={"If-None-Match": projected_list}).status_code == status.HTTP_200_OK
+    response = client.get("/products/", params={"fields": "id"}, headers={"If-None-Match": projected_list})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # If-Match solo mira id y versión
+    response = client.put(url, data={"quantity": 7}, headers={"If-Match": projected})
+    assert response.status_code == status.HTTP_200_OK, response.text
+
+
+def test_sparse_fields_validation(client, create_products):
+    """Test that unknown or empty field lists are rejected"""
+    (product_id,) = create_products("A", price=3.0, description=LONG_DESCRIPTION)
+    assert client.get("/products/", params={"fields": "name,secret"}).status_code == 422
+    assert client.get("/products/", params={"fields": " , "}).status_code == 422
+    response = client.get(f"/products/{product_id}", params={"fields": "hashed_password"})
+    assert response.status_code == 422
+    assert "hashed_password" in response.json()["detail"]
+
+
+def test_sparse_fields_projection(db_session):
+    """Test that unrequested columns are not read and field-set models are reused"""
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        field_set = product_field_set(parse_fields("name,id"))
+        ProductRepository(db_session).get_page_rows(ProductListParams(sort="quantity"), fields=field_set.columns)
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+    selected = statements[-1].split("FROM")[0]
+    assert "products.name" in selected and "products.quantity" in selected
+    assert "description" not in selected and "image_url" not in selected
+    assert product_field_set(parse_fields("id, name")) is field_set
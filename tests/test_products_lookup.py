@@ -0,0 +1,36 @@
+from fastapi import status
+from sqlalchemy import event
+
+from repositories.product_repo import ProductRepository
+
+
+def test_lookup_keeps_request_order_and_lists_missing(client, create_products):
+    """Test that products come back in request order, once each, with missing ids listed"""
+    a, b, c = create_products("A", "B", "C")
+    client.get(f"/products/{b}")  # uno de ellos ya en caché
+
+    response = client.post("/products/lookup", json={"ids": [c, 999, a, b, c, 1000]})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [c, a, b]
+    assert [item["name"] for item in body["items"]] == ["C", "A", "B"]
+    assert body["missing"] == [999, 1000]
+
+
+def test_lookup_validation(client):
+    """Test that an empty id list is rejected"""
+    assert client.post("/products/lookup", json={"ids": []}).status_code == 422
+
+
+def test_rows_by_ids_is_chunked(client, db_session, create_products):
+    """Test that large id sets are split into several IN queries"""
+    ids = create_products(*[f"P{i}" for i in range(7)])
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        rows = ProductRepository(db_session).get_rows_by_ids(ids + [999], chunk_size=3)
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+    assert sorted(row.id for row in rows) == ids
+    assert len([s for s in statements if s.startswith("SELECT")]) == 3
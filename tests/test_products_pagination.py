@@ -0,0 +1,113 @@
+import pytest
+from fastapi import status
+
+from repositories.product_repo import ProductRepository
+from schemas.product import ProductListParams
+
+
+@pytest.fixture
+def catalog(create_products):
+    """Create a small catalog with distinct names, prices and stock levels"""
+    rows = [
+        {"name": "Apple", "price": 1.5, "quantity": 10},
+        {"name": "Apricot", "price": 3.0, "quantity": 0},
+        {"name": "Banana", "price": 0.5, "quantity": 25},
+        {"name": "Blueberry", "price": 7.25, "quantity": 4},
+        {"name": "Cherry", "price": 5.0, "quantity": 0},
+    ]
+    return [{**row, "id": product_id} for row, product_id in zip(rows, create_products(*rows))]
+
+
+def _fetch_all(client, **params):
+    """Follow X-Next-Cursor until the last page and return all the ids"""
+    ids, pages = [], 0
+    cursor = None
+    while True:
+        query = dict(params)
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get("/products/", params=query)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        ids.extend(p["id"] for p in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids, pages
+
+
+def test_list_products_keyset_pages(client, catalog):
+    """Test that following the cursor visits every product exactly once"""
+    ids, pages = _fetch_all(client, limit=2)
+
+    assert ids == [p["id"] for p in catalog]
+    assert pages == 3
+
+
+def test_list_products_next_link_header(client, catalog):
+    """Test that the Link header points to the next page"""
+    response = client.get("/products/", params={"limit": 4})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'rel="next"' in response.headers["Link"]
+    assert response.headers["X-Next-Cursor"] in response.headers["Link"]
+
+    last = client.get("/products/", params={"limit": 10})
+    assert "X-Next-Cursor" not in last.headers
+
+
+def test_list_products_sorted_by_price_desc(client, catalog):
+    """Test descending sort with keyset pagination on a non-id column"""
+    ids, _ = _fetch_all(client, limit=2, sort="-price")
+
+    expected = [p["id"] for p in sorted(catalog, key=lambda p: p["price"], reverse=True)]
+    assert ids == expected
+
+
+def test_list_products_filters(client, catalog):
+    """Test name prefix, price range and stock filters"""
+    response = client.get("/products/", params={"name_prefix": "Ap"})
+    assert [p["name"] for p in response.json()] == ["Apple", "Apricot"]
+
+    response = client.get("/products/", params={"min_price": 1, "max_price": 5})
+    assert {p["name"] for p in response.json()} == {"Apple", "Apricot", "Cherry"}
+
+    response = client.get("/products/", params={"in_stock": False})
+    assert {p["name"] for p in response.json()} == {"Apricot", "Cherry"}
+
+    response = client.get("/products/", params={"min_quantity": 5, "sort": "quantity"})
+    assert [p["name"] for p in response.json()] == ["Apple", "Banana"]
+
+
+def test_list_products_name_prefix_is_literal(client, catalog):
+    """Test that LIKE wildcards in the prefix are escaped"""
+    response = client.get("/products/", params={"name_prefix": "%"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+
+def test_list_products_invalid_parameters(client, catalog):
+    """Test invalid cursors, mismatched sorts and out of range limits"""
+    response = client.get("/products/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    cursor = client.get("/products/", params={"limit": 1}).headers["X-Next-Cursor"]
+    response = client.get("/products/", params={"cursor": cursor, "sort": "name"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.get("/products/", params={"limit": 0})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = client.get("/products/", params={"min_price": 10, "max_price": 1})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_read_rows_skip_the_orm(db_session, catalog):
+    """Test that the read-only repository methods return Core rows, not tracked Product objects"""
+    repo = ProductRepository(db_session)
+    rows = repo.get_page_rows(ProductListParams(sort="-price", limit=2))
+    assert [row.name for row in rows] == ["Blueberry", "Cherry"]
+    assert rows[0]._fields == ("id", "name", "description", "price", "quantity", "image_url", "version", "updated_at")
+    assert repo.get_row(catalog[0]["id"]).name == "Apple"
+    assert repo.get_row(10_000) is None
+    assert len(db_session.identity_map) == 0
@@ -0,0 +1,63 @@
+from fastapi import status
+
+from core.config import settings
+
+
+def test_search_ranks_name_matches_first(client, create_products):
+    """Test that matches in the name rank above matches in the description"""
+    desc_only, name_match, _ = create_products(
+        {"name": "Leather wallet", "description": "Fits in any backpack pocket"},
+        {"name": "Hiking backpack", "description": "Forty litres, waterproof"},
+        {"name": "Desk lamp", "description": "LED, warm light"},
+    )
+
+    response = client.get("/products/search", params={"q": "backpack"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [p["id"] for p in response.json()] == [name_match, desc_only]
+
+
+def test_search_all_terms_and_prefix(client, create_products):
+    """Test that every term must match and the last one works as a prefix"""
+    lamp, lantern = create_products(
+        {"name": "Desk lamp", "description": "Warm LED light"},
+        {"name": "Camping lantern", "description": "Cold LED light, rechargeable"},
+    )
+
+    assert [p["id"] for p in client.get("/products/search", params={"q": "led warm"}).json()] == [lamp]
+    assert {p["id"] for p in client.get("/products/search", params={"q": "LED rech"}).json()} == {lantern}
+    assert client.get("/products/search", params={"q": "led \"OR\" -*"}).status_code == status.HTTP_200_OK
+    assert client.get("/products/search", params={"q": "***"}).json() == []
+
+
+def test_search_index_follows_writes(client, create_products):
+    """Test that updates and deletes are reflected by the triggers"""
+    product_id, = create_products({"name": "Red mug", "description": "Ceramic"})
+
+    client.put(f"/products/{product_id}", data={"name": "Blue mug"})
+    assert client.get("/products/search", params={"q": "red"}).json() == []
+    assert [p["id"] for p in client.get("/products/search", params={"q": "blue"}).json()] == [product_id]
+
+    client.delete(f"/products/{product_id}")
+    assert client.get("/products/search", params={"q": "mug"}).json() == []
+
+
+def test_search_validation(client):
+    """Test that an empty query or an out-of-range limit is rejected"""
+    assert client.get("/products/search", params={"q": ""}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    response = client.get("/products/search", params={"q": "x", "limit": 1000})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_search_rank_window_limits_scored_matches(client, monkeypatch, create_products):
+    """Test that only the most recent matches are ranked when a window is set"""
+    oldest, middle, newest = create_products(
+        {"name": "Kettle", "description": "Kettle kettle kettle"},
+        {"name": "Steel kettle", "description": "Boils water"},
+        {"name": "Tea set", "description": "Goes well with a kettle"},
+    )
+    # Por defecto se puntúan todas: el producto más antiguo sigue siendo el más relevante
+    assert settings.SEARCH_RANK_WINDOW == 0
+    assert client.get("/products/search", params={"q": "kettle"}).json()[0]["id"] == oldest
+
+    monkeypatch.setattr(settings, "SEARCH_RANK_WINDOW", 2)
+    assert [p["id"] for p in client.get("/products/search", params={"q": "kettle"}).json()] == [middle, newest]
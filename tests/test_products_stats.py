@@ -0,0 +1,55 @@
+from fastapi import status
+
+from models.inventory_summary import InventorySummary
+from repositories.inventory_summary_repo import InventorySummaryRepository
+from services.inventory_service import InventoryService
+
+
+def _stats(client):
+    response = client.get("/products/stats")
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_stats_empty(client):
+    """Test the aggregates of an empty catalogue"""
+    assert _stats(client) == {"product_count": 0, "units_on_hand": 0, "stock_value": 0.0, "out_of_stock_count": 0}
+
+
+def test_stats_follow_every_write_path(client, db_session, create_products):
+    """Test that creates, updates, stock adjustments and deletes keep the summary exact"""
+    first, second, third = create_products(
+        {"price": 2.5, "quantity": 4},
+        {"price": 10.0, "quantity": 0},
+        {"price": 1.0, "quantity": 3},
+    )
+    assert _stats(client) == {"product_count": 3, "units_on_hand": 7, "stock_value": 13.0, "out_of_stock_count": 1}
+
+    client.post(f"/products/{first}/stock/adjust", json={"delta": -4})
+    client.put(f"/products/{second}", data={"quantity": 2, "price": 5.0})
+    client.patch("/products/batch", json=[{"id": third, "price": 2.0}])
+    assert _stats(client) == {"product_count": 3, "units_on_hand": 5, "stock_value": 16.0, "out_of_stock_count": 1}
+
+    client.delete(f"/products/{second}")
+    client.request("DELETE", "/products/batch", json={"ids": [first]})
+    assert _stats(client) == {"product_count": 1, "units_on_hand": 3, "stock_value": 6.0, "out_of_stock_count": 0}
+
+    assert InventoryService(InventorySummaryRepository(db_session)).check() == {}
+
+
+def test_check_detects_drift_and_rebuild_fixes_it(client, db_session, create_products):
+    """Test the consistency check and the rebuild used by the maintenance script"""
+    create_products({"price": 3.0, "quantity": 2}, {"price": 4.0, "quantity": 0})
+    db_session.query(InventorySummary).update({InventorySummary.units_on_hand: 99})
+    db_session.commit()
+
+    service = InventoryService(InventorySummaryRepository(db_session))
+    differences = service.check()
+    assert set(differences) == {"units_on_hand"}
+    assert differences["units_on_hand"]["computed"] == 2
+
+    service.rebuild()
+    assert service.check() == {}
+    assert service.get_stats().model_dump() == {
+        "product_count": 2, "units_on_hand": 2, "stock_value": 6.0, "out_of_stock_count": 1,
+    }
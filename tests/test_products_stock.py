@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import status
+
+
+def test_adjust_stock(client, create_products):
+    """Test that deltas are applied and the new level and version are returned"""
+    (product_id,) = create_products("Hot SKU", quantity=10)
+
+    response = client.post(f"/products/{product_id}/stock/adjust", json={"delta": -4})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.json() == {"id": product_id, "quantity": 6, "version": 2}
+    assert response.headers["etag"] == f'"{product_id}-2"'
+
+    response = client.post(f"/products/{product_id}/stock/adjust", json={"delta": 3})
+    assert response.json()["quantity"] == 9
+    assert client.get(f"/products/{product_id}").json()["quantity"] == 9
+
+
+def test_adjust_stock_oversell(client, create_products):
+    """Test that a decrement below zero is rejected without changing the stock"""
+    (product_id,) = create_products("Hot SKU", quantity=2)
+
+    response = client.post(f"/products/{product_id}/stock/adjust", json={"delta": -3})
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert client.get(f"/products/{product_id}").json()["quantity"] == 2
+
+    response = client.post(f"/products/{product_id}/stock/adjust", json={"delta": -2})
+    assert response.json()["quantity"] == 0
+
+
+def test_adjust_stock_not_found_and_invalid(client, create_products):
+    """Test 404 for unknown products and 422 for a zero delta"""
+    response = client.post("/products/9999/stock/adjust", json={"delta": 1})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    (product_id,) = create_products("Hot SKU", quantity=10)
+    response = client.post(f"/products/{product_id}/stock/adjust", json={"delta": 0})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_adjust_stock_concurrent_decrements(client, create_products):
+    """Test that concurrent decrements never oversell or lose updates"""
+    (product_id,) = create_products("Hot SKU", quantity=10)
+
+    def decrement(_):
+        return client.post(f"/products/{product_id}/stock/adjust", json={"delta": -1}).status_code
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        codes = list(pool.map(decrement, range(15)))
+
+    assert codes.count(status.HTTP_200_OK) == 10
+    assert codes.count(status.HTTP_409_CONFLICT) == 5
+    assert client.get(f"/products/{product_id}").json()["quantity"] == 0
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from core.broadcast import DROP_OLDEST, BroadcastHub, SlowConsumerError
+from services.product_events import sse_stream
+
+
+def test_hub_fans_out_to_every_subscriber():
+    """Test that each subscriber receives every event in order with a shared seq"""
+    async def scenario():
+        hub = BroadcastHub(queue_size=8)
+        first, second = hub.subscribe(), hub.subscribe()
+        hub.publish({"type": "created", "id": 1})
+        hub.publish({"type": "deleted", "id": 1})
+        received = [[await sub.get(), await sub.get()] for sub in (first, second)]
+        assert received[0] == received[1]
+        assert [(m.seq, m.type) for m in received[0]] == [(1, "created"), (2, "deleted")]
+        assert json.loads(received[0][1].data) == {"seq": 2, "type": "deleted", "id": 1}
+        async with first:
+            pass
+        assert hub.stats()["subscribers"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_hub_disconnects_slow_consumer():
+    """Test that a full queue closes the subscription without blocking publish"""
+    async def scenario():
+        hub = BroadcastHub(queue_size=2)
+        slow, fast = hub.subscribe(), hub.subscribe()
+        for i in range(2):
+            hub.publish({"type": "stock", "id": i})
+            await fast.get()
+        hub.publish({"type": "stock", "id": 2})
+        await asyncio.sleep(0)  # la entrega se programa en el loop
+        with pytest.raises(SlowConsumerError):
+            await slow.get()
+        assert (await fast.get()).seq == 3
+        assert hub.stats()["subscribers"] == 1
+        assert hub.stats()["slow_consumers"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_hub_drop_oldest_policy():
+    """Test that drop_oldest keeps the subscriber and the newest events"""
+    async def scenario():
+        hub = BroadcastHub(queue_size=2, policy=DROP_OLDEST)
+        sub = hub.subscribe()
+        for i in range(5):
+            hub.publish({"type": "stock", "id": i})
+        assert [(await sub.get()).seq for _ in range(2)] == [4, 5]
+        assert sub.dropped == 3
+        assert len(hub) == 1
+
+    asyncio.run(scenario())
+
+
+def test_hub_publish_from_another_thread():
+    """Test that events published outside the subscriber's loop are delivered"""
+    async def scenario():
+        hub = BroadcastHub()
+        sub = hub.subscribe()
+        thread = threading.Thread(target=hub.publish, args=({"type": "created", "id": 7},))
+        thread.start()
+        message = await sub.get(timeout=2)
+        thread.join()
+        assert message is not None and message.type == "created"
+
+    asyncio.run(scenario())
+
+
+def test_sse_stream_format():
+    """Test the SSE framing, keepalive comments and the slow consumer error event"""
+    async def scenario():
+        hub = BroadcastHub(queue_size=1)
+        stream = sse_stream(hub, keepalive=0.01)
+        assert await stream.__anext__() == ": connected\n\n"
+        assert await stream.__anext__() == ": keepalive\n\n"
+        hub.publish({"type": "deleted", "id": 3})
+        assert await stream.__anext__() == (
+            'id: 1\nevent: deleted\ndata: {"seq":1,"type":"deleted","id":3}\n\n'
+        )
+        hub.publish({"type": "deleted", "id": 4})
+        hub.publish({"type": "deleted", "id": 5})
+        assert (await stream.__anext__()).startswith("event: error\n")
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        assert len(hub) == 0
+
+    asyncio.run(scenario())
+
+
+def test_websocket_stream_receives_product_changes(client, create_products):
+    """Test that create, stock, update and delete requests are pushed to the WebSocket"""
+    with client.websocket_connect("/products/stream") as ws:
+        (product_id,) = create_products("Streamed", price=2.5, quantity=4)
+        created = ws.receive_json()
+        assert created["type"] == "created" and created["id"] == product_id
+        assert created["data"]["name"] == "Streamed"
+
+        client.post(f"/products/{product_id}/stock/adjust", json={"delta": -1})
+        stock = ws.receive_json()
+        assert stock["type"] == "stock"
+        assert stock["data"] == {"id": product_id, "quantity": 3, "version": 2}
+        assert stock["seq"] > created["seq"]
+
+        client.patch("/products/batch", json=[{"id": product_id, "price": 3.0}])
+        assert ws.receive_json()["data"] == {"id": product_id, "price": 3.0}
+
+        client.delete(f"/products/{product_id}")
+        assert ws.receive_json() == {"seq": stock["seq"] + 2, "type": "deleted", "id": product_id}
@@ -0,0 +1,84 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from core.config import settings
+from core.rate_limit import MemoryRateLimitBackend, RateLimit
+from repositories.user_repo import AsyncUserRepository
+
+
+def test_token_bucket_burst_and_refill(monkeypatch):
+    """Test that a burst is allowed, then requests wait for the refill"""
+    clock = [1000.0]
+    monkeypatch.setattr("core.rate_limit.time.monotonic", lambda: clock[0])
+    limit = RateLimit(MemoryRateLimitBackend(), "test", per_minute=60, burst=3)
+
+    assert [limit.hit("k") for _ in range(3)] == [0, 0, 0]
+    assert limit.hit("k") == 1
+    assert limit.hit("other") == 0
+
+    clock[0] += 1.0
+    assert limit.hit("k") == 0
+    assert limit.hit("k") == 1
+
+
+def test_idle_buckets_are_evicted(monkeypatch):
+    """Test that the periodic sweep drops keys whose bucket is full again"""
+    clock = [1000.0]
+    monkeypatch.setattr("core.rate_limit.time.monotonic", lambda: clock[0])
+    backend = MemoryRateLimitBackend(sweep_interval=10, max_keys=1000)
+    limit = RateLimit(backend, "test", per_minute=60, burst=2)
+
+    for i in range(50):
+        limit.hit(f"ip-{i}")
+    assert backend.stats()["keys"] == 50
+
+    clock[0] += 11
+    limit.hit("fresh")
+    stats = backend.stats()
+    assert stats["keys"] == 1
+    assert stats["evictions"] == 50
+
+
+def test_login_throttled_per_email_before_db_work(client, monkeypatch):
+    """Test that rejected logins return 429 without querying the user"""
+    lookups = []
+    original = AsyncUserRepository.get_by_email
+
+    async def counting_get_by_email(self, email):
+        lookups.append(email)
+        return await original(self, email)
+
+    monkeypatch.setattr(AsyncUserRepository, "get_by_email", counting_get_by_email)
+    credentials = {"email": "victim@example.com", "password": "guess"}
+
+    for _ in range(settings.LOGIN_BURST_PER_EMAIL):
+        assert client.post("/auth/login", json=credentials).status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = client.post("/auth/login", json={**credentials, "email": "VICTIM@example.com"})
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers["retry-after"]) >= 1
+    assert len(lookups) == settings.LOGIN_BURST_PER_EMAIL
+
+
+def test_login_throttled_per_ip(client):
+    """Test that one client cycling through emails hits the per-IP limit"""
+    codes = [
+        client.post("/auth/login", json={"email": f"user{i}@example.com", "password": "x"}).status_code
+        for i in range(settings.LOGIN_BURST_PER_IP + 1)
+    ]
+
+    assert codes[:-1] == [status.HTTP_401_UNAUTHORIZED] * settings.LOGIN_BURST_PER_IP
+    assert codes[-1] == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_throttled_ip_does_not_drain_email_bucket(client):
+    """Test that attempts rejected per IP are not charged to the targeted email"""
+    for i in range(settings.LOGIN_BURST_PER_IP):
+        client.post("/auth/login", json={"email": f"user{i}@example.com", "password": "x"})
+    for _ in range(settings.LOGIN_BURST_PER_EMAIL * 2):
+        response = client.post("/auth/login", json={"email": "victim@example.com", "password": "x"})
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    other_ip = TestClient(client.app, client=("203.0.113.7", 50000))
+    response = other_ip.post("/auth/login", json={"email": "victim@example.com", "password": "x"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
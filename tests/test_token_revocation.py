@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import status
+
+from core.revocation import BloomFilter
+from core.security import decode_access_token
+from models.revoked_token import RevokedToken
+from services.token_revocation import token_revocation
+
+
+def _login(client, email="dana@example.com", username="dana"):
+    client.post("/auth/register", json={"username": username, "email": email, "password": "dana-pass"})
+    response = client.post("/auth/login", json={"email": email, "password": "dana-pass"})
+    return response.json()["access_token"]
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test membership and a false-positive rate close to the configured one"""
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        bloom.add(f"jti-{i}")
+
+    assert all(bloom.might_contain(f"jti-{i}") for i in range(2000))
+    false_positives = sum(bloom.might_contain(f"other-{i}") for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_logout_revokes_only_current_token(client):
+    """Test that a logged-out token is rejected while other sessions keep working"""
+    first = _login(client)
+    second = client.post("/auth/login", json={"email": "dana@example.com", "password": "dana-pass"}).json()["access_token"]
+
+    assert client.get("/auth/me", headers=_auth(first)).status_code == status.HTTP_200_OK
+    response = client.post("/auth/logout", headers=_auth(first))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = client.get("/auth/me", headers=_auth(first))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["detail"] == "Token has been revoked"
+    assert client.get("/auth/me", headers=_auth(second)).status_code == status.HTTP_200_OK
+    assert token_revocation.db_lookups == 0
+
+
+def test_revoke_other_token(client):
+    """Test revoking another token of the same user and refusing foreign tokens"""
+    mine = _login(client)
+    other_device = client.post("/auth/login", json={"email": "dana@example.com", "password": "dana-pass"}).json()["access_token"]
+    foreign = _login(client, email="eve@example.com", username="eve")
+
+    response = client.post("/auth/revoke", json={"token": foreign}, headers=_auth(mine))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    response = client.post("/auth/revoke", json={"token": other_device}, headers=_auth(mine))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert client.get("/auth/me", headers=_auth(other_device)).status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.get("/auth/me", headers=_auth(mine)).status_code == status.HTTP_200_OK
+
+    response = client.post("/auth/revoke", json={"token": "not-a-token"}, headers=_auth(mine))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+def test_bloom_positive_falls_through_to_database(client, db_session):
+    """Test that a token revoked elsewhere is confirmed with one DB lookup"""
+    token = _login(client)
+    claims = decode_access_token(token)
+    assert client.get("/auth/me", headers=_auth(token)).status_code == status.HTTP_200_OK
+
+    # Revocado por otro proceso: está en la tabla y en el Bloom, no en el conjunto exacto
+    expires_at = datetime.fromtimestamp(claims.expires_at, timezone.utc)
+    db_session.add(RevokedToken(jti=claims.jti, user_id=claims.user_id, expires_at=expires_at))
+    db_session.commit()
+    token_revocation.revocations.rebuild([(claims.jti, claims.expires_at)])
+
+    for _ in range(2):
+        assert client.get("/auth/me", headers=_auth(token)).status_code == status.HTTP_401_UNAUTHORIZED
+    assert token_revocation.db_lookups == 1
+
+
+def test_load_rebuilds_from_table_and_purges_expired(client, db_session):
+    """Test that loading the deny-list keeps active revocations and drops expired rows"""
+    token = _login(client)
+    now = datetime.now(timezone.utc)
+    db_session.add_all([
+        RevokedToken(jti="active", expires_at=now + timedelta(minutes=5)),
+        RevokedToken(jti="expired", expires_at=now - timedelta(minutes=5)),
+    ])
+    db_session.commit()
+
+    # Como al arrancar: la primera petición autenticada carga la tabla
+    token_revocation.reset()
+    assert client.get("/auth/me", headers=_auth(token)).status_code == status.HTTP_200_OK
+
+    assert token_revocation.revocations.check("active") is None
+    assert token_revocation.revocations.check("unknown") is False
+    assert [row.jti for row in db_session.query(RevokedToken)] == ["active"]